@@ -33,11 +33,18 @@ def generate_text_from_ngrams(source_text: str, n: int = 4, min_words: int = 40,
     else:
         current = "".join(random.choices("abcdefghijklmnopqrstuvwxyz ", k=n - 1))
 
-    # build until we have enough words
-    while len(current.split(" ")) < target_words:
-        prompt = current[-(n - 1) :]
+    # build until we have enough words; the word count (len(current.split(" ")))
+    # and the output list are updated per character, keeping this linear
+    out = list(current)
+    words = current.count(" ") + 1
+    prompt = current[-(n - 1) :]
+    while words < target_words:
         nxt = generate_next_char(prompt, counts)
-        current += nxt
+        out.append(nxt)
+        if nxt == " ":
+            words += 1
+        prompt = (prompt + nxt)[-(n - 1) :]
+    current = "".join(out)
 
     # post-process: collapse multiple spaces and strip
     generated = " ".join([w for w in current.split(" ") if w != ""]).strip()
@@ -1,5 +1,12 @@
+import json
 import random
-from typing import Dict, List
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+# Filled in while generating, for the --profile report
+PROFILE_STATS: Dict[str, int] = {"fallbacks": 0}
 
 # --- Core LLM Functions ---
 
@@ -67,6 +74,7 @@ def generate_next_char(prompt: str, counts: Dict[str, int]) -> str:
 
     # Fallback case: If the model has never seen this prompt before
     if not next_options:
+        PROFILE_STATS["fallbacks"] += 1
         # Fallback to a random choice of common characters/spaces
         fallback_chars = list("abcdefghijklmnopqrstuvwxyz ")
         return random.choice(fallback_chars)
@@ -94,23 +102,47 @@ def generate_text(seed_text: str, counts: Dict[str, int], n: int, max_length: in
     Returns:
         The generated text string.
     """
-    # Initialize the generated text with the seed
-    generated_text = seed_text
+    # Collect characters in a list and join once at the end, instead of
+    # building a new string for every appended character
+    generated_chars = list(seed_text)
     
     # The prompt length is n-1
     prompt_len = n - 1
+    prompt = seed_text[-prompt_len:]
 
     for _ in range(max_length - len(seed_text)):
-        # 1. Get the current prompt (the last n-1 characters of the generated text)
-        prompt = generated_text[-prompt_len:]
-        
-        # 2. Generate the next character based on the prompt
+        # 1. Generate the next character based on the prompt
+        #    (the last n-1 characters of the generated text)
         next_char = generate_next_char(prompt, counts)
         
-        # 3. Append the character to the generated text
-        generated_text += next_char
+        # 2. Append the character to the generated text
+        generated_chars.append(next_char)
+
+        # 3. Slide the prompt window
+        prompt = (prompt + next_char)[-prompt_len:]
         
-    return generated_text
+    return "".join(generated_chars)
+
+
+def run_stage(report: Dict[str, Any], name: str, func: Callable, *args, **kwargs):
+    """
+    Runs `func(*args, **kwargs)` and, if `report` is not None, records its
+    wall time and peak traced memory (via `tracemalloc`) under
+    `report["stages"][name]`.
+
+    Returns:
+        Whatever `func` returns.
+    """
+    if report is None:
+        return func(*args, **kwargs)
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    report["stages"][name] = {"seconds": round(seconds, 6), "peak_bytes": tracemalloc.get_traced_memory()[1]}
+    return result
 
 
 # --- Driver Program (main.py) ---
@@ -140,6 +172,9 @@ if __name__ == "__main__":
     random_start_index = random.randint(0, len(SONG_LYRICS_DATASET) - N_GRAM_N)
     SEED_TEXT = SONG_LYRICS_DATASET[random_start_index:random_start_index+N_GRAM_N - 1] 
 
+    # --profile: also write per-stage timings and memory as JSON to stderr
+    PROFILE_REPORT = {"stages": {}} if "--profile" in sys.argv[1:] else None
+
     print("--- 🎶 Toy Character N-gram LLM Generator (main.py) ---")
     print(f"Dataset Size: {len(SONG_LYRICS_DATASET)} characters")
     print(f"N-gram Size (n): {N_GRAM_N}")
@@ -147,12 +182,15 @@ if __name__ == "__main__":
 
     # Step 1: Count all N-grams in the dataset
     print("1. Counting N-grams...")
-    ngram_counts = count_char_n_grams(SONG_LYRICS_DATASET, n=N_GRAM_N)
+    ngram_counts = run_stage(PROFILE_REPORT, "count", count_char_n_grams, SONG_LYRICS_DATASET, n=N_GRAM_N)
     print(f"   -> Found {len(ngram_counts)} unique {N_GRAM_N}-grams.")
 
     # Step 2: Generate the text
     print(f"2. Generating Text (Seed: '{SEED_TEXT}')...")
-    generated_output = generate_text(
+    generated_output = run_stage(
+        PROFILE_REPORT,
+        "generate",
+        generate_text,
         seed_text=SEED_TEXT, 
         counts=ngram_counts, 
         n=N_GRAM_N, 
@@ -162,4 +200,21 @@ if __name__ == "__main__":
     # Step 3: Print the result
     print("\n--- 📝 Generated Song Lyrics ---")
     print(generated_output)
-    print("-----------------------------------")
\ No newline at end of file
+    print("-----------------------------------")
+
+    if PROFILE_REPORT is not None:
+        tracemalloc.stop()
+        stages = PROFILE_REPORT["stages"]
+        generated_chars = len(generated_output) - len(SEED_TEXT)
+        PROFILE_REPORT.update(
+            total_seconds=round(sum(stage["seconds"] for stage in stages.values()), 6),
+            peak_bytes=max(stage["peak_bytes"] for stage in stages.values()),
+            n=N_GRAM_N,
+            corpus_chars=len(SONG_LYRICS_DATASET),
+            unique_ngrams=len(ngram_counts),
+            generated_chars=generated_chars,
+            chars_per_second=round(generated_chars / stages["generate"]["seconds"], 1),
+            fallbacks=PROFILE_STATS["fallbacks"],
+            fallback_rate=round(PROFILE_STATS["fallbacks"] / max(generated_chars, 1), 6),
+        )
+        print(json.dumps(PROFILE_REPORT, indent=2), file=sys.stderr)
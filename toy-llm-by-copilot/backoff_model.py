@@ -0,0 +1,169 @@
+"""Multi-order n-gram model with backoff
+
+Provides:
+
+- `count_char_n_grams_multi(text, max_n)`: counts the n-grams of every
+  order 1..max_n in a single pass over `text`.
+- `BackoffModel`: one `NGramModel` per order. A prompt is answered from the
+  longest suffix of it that was seen in training, falling back to shorter
+  contexts down to the unigram distribution, so generation never has to
+  invent a random letter for an unseen context.
+"""
+
+from typing import Dict, Optional, Tuple
+import random
+
+from ngram_model import NGramModel
+from sampler import AliasSampler
+
+
+STUPID_BACKOFF_ALPHA = 0.4
+
+
+def count_char_n_grams_multi(text: str, max_n: int = 3) -> Dict[int, Dict[str, int]]:
+    """Count character n-grams of every order 1..`max_n` in one scan.
+
+    Parameters
+    - text (str): The input string in which to count n-grams.
+    - max_n (int): The highest order to count. Defaults to 3.
+
+    Returns
+    - dict[int, dict[str, int]]: Maps each order `k` to the dictionary
+      `count_char_n_grams(text, k)` would return (same keys, counts and
+      key order).
+
+    Behavior
+    - Walks the start positions of `text` once; at each position the
+      n-grams of every order starting there are counted together.
+    - Raises `TypeError`/`ValueError` for an invalid `max_n`, like
+      `count_char_n_grams` does for `n`.
+    """
+
+    if not isinstance(max_n, int):
+        raise TypeError("max_n must be an integer")
+    if max_n <= 0:
+        raise ValueError("max_n must be a positive integer")
+
+    tables = [dict() for _ in range(max_n)]
+    length = len(text)
+    for i in range(length):
+        top = min(max_n, length - i)
+        for k in range(top):
+            table = tables[k]
+            ngram = text[i:i + k + 1]
+            table[ngram] = table.get(ngram, 0) + 1
+
+    return {k + 1: tables[k] for k in range(max_n)}
+
+
+class BackoffModel:
+    """Character model that backs off to the longest context seen.
+
+    Parameters
+    - models (dict[int, NGramModel]): One model per order 1..max_n.
+
+    Attributes
+    - max_n (int): The highest order; full contexts are `max_n-1` chars.
+    - models (dict[int, NGramModel]): The per-order models.
+
+    Behavior
+    - `lookup(prompt)` tries the last `max_n-1` characters of `prompt`,
+      then ever shorter suffixes, and returns the first context that has
+      observed continuations. Each order costs one dict lookup.
+    - `next_letter_frequency` and `sampler` answer from that context, so
+      the model can be used wherever an `NGramModel` is expected.
+    - `score(prompt, ch)` gives the stupid-backoff score of `ch`.
+    """
+
+    def __init__(self, models: Dict[int, NGramModel]) -> None:
+        if not models:
+            raise ValueError("models must not be empty")
+        max_n = max(models)
+        if sorted(models) != list(range(1, max_n + 1)):
+            raise ValueError("models must cover every order from 1 to max_n")
+        self.max_n = max_n
+        self.models = models
+
+    @property
+    def n(self) -> int:
+        return self.max_n
+
+    @classmethod
+    def from_counts(cls, counts_by_order: Dict[int, Dict[str, int]]) -> "BackoffModel":
+        """Build from the output of `count_char_n_grams_multi`."""
+
+        return cls({k: NGramModel.from_counts(counts, k) for k, counts in counts_by_order.items()})
+
+    @classmethod
+    def from_text(cls, text: str, max_n: int = 3) -> "BackoffModel":
+        """Count every order of `text` in one pass and build the model."""
+
+        counts_by_order = count_char_n_grams_multi(text, max_n)
+        return cls({k: NGramModel.from_counts(counts, k, tail=text) for k, counts in counts_by_order.items()})
+
+    def lookup(self, prompt: str) -> Tuple[int, str, Optional[Dict[str, int]]]:
+        """Return `(order, context, distribution)` for the longest seen
+        suffix of `prompt`; the distribution is None only if the model was
+        trained on empty text."""
+
+        longest = min(len(prompt), self.max_n - 1)
+        for k in range(longest, -1, -1):
+            context = prompt[len(prompt) - k:]
+            dist = self.models[k + 1].table.get(context)
+            if dist:
+                return k + 1, context, dist
+        return 1, "", None
+
+    def next_letter_frequency(self, prompt: str) -> Dict[str, int]:
+        """Return the next-character frequencies of the longest seen
+        context ending `prompt`, as a new dictionary."""
+
+        _, _, dist = self.lookup(prompt)
+        return dict(dist) if dist else {}
+
+    def sampler(self, prompt: str) -> Optional[AliasSampler]:
+        """Return the cached sampler of the longest seen context ending
+        `prompt`."""
+
+        order, context, dist = self.lookup(prompt)
+        if dist is None:
+            return None
+        return self.models[order].sampler(context)
+
+    def update(self, new_text: str) -> Dict[int, Dict[str, int]]:
+        """Append `new_text` to every order; returns the added counts per
+        order (see `NGramModel.update`)."""
+
+        return {k: model.update(new_text) for k, model in self.models.items()}
+
+    def random_context(self, rng=random) -> Optional[str]:
+        """Draw a full-length context from the highest-order model."""
+
+        return self.models[self.max_n].random_context(rng)
+
+    def score(self, prompt: str, ch: str, alpha: float = STUPID_BACKOFF_ALPHA) -> float:
+        """Return the stupid-backoff score of `ch` following `prompt`.
+
+        Uses the relative frequency at the longest context where `ch` was
+        seen after it, multiplied by `alpha` once per order backed off.
+        Scores are not normalized probabilities.
+        """
+
+        longest = min(len(prompt), self.max_n - 1)
+        factor = 1.0
+        for k in range(longest, -1, -1):
+            dist = self.models[k + 1].table.get(prompt[len(prompt) - k:])
+            if dist and ch in dist:
+                return factor * dist[ch] / sum(dist.values())
+            factor *= alpha
+        return 0.0
+
+
+if __name__ == "__main__":
+    text = "Lee has a dog. Jane has a dog. Soomi has a cat."
+    model = BackoffModel.from_text(text, max_n=6)
+
+    for prompt in (" has a ", "xx a ", "zzzzz"):
+        order, context, _ = model.lookup(prompt)
+        print(f"Prompt {prompt!r}: order {order}, context {context!r}")
+        print("  Next-letter frequencies:", model.next_letter_frequency(prompt))
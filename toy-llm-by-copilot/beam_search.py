@@ -0,0 +1,207 @@
+"""Beam search and most-likely continuations for character models
+
+Provides `beam_search(model, prompt, length, beam_width)`, which keeps the
+`beam_width` most probable continuations of `prompt` as it extends them
+one character at a time, and `most_likely`, its greedy (`beam_width=1`)
+special case, for deterministic completions such as finishing a lyric line.
+
+Next-character distributions come from the model's `next_letter_frequency`
+(so a prompt shorter than `n-1` matches every context starting with it,
+as everywhere else) and are turned into log-probability vectors, sorted
+best first, by a `ContextCache`. Beams that share a context, in one search
+or across searches given the same cache, reuse one vector; the cache is a
+bounded LRU and counts its hits and misses.
+"""
+
+from collections import OrderedDict
+import heapq
+import math
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+DEFAULT_CACHE_SIZE = 1 << 14
+
+
+class ContextCache:
+    """LRU cache of `context -> (chars, log_probs)`, sorted by descending
+    probability.
+
+    Parameters
+    - model: Any model with `n` and `next_letter_frequency(prompt)`.
+    - maxsize (int): Most contexts kept; the least recently used one is
+      evicted first.
+
+    Behavior
+    - Unseen contexts are cached too, as empty vectors.
+    - `hits`, `misses` and `hit_rate` describe the lookups so far.
+    """
+
+    def __init__(self, model, maxsize: int = DEFAULT_CACHE_SIZE) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be a positive integer")
+        self.model = model
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[Tuple[str, ...], Tuple[float, ...]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, context: str) -> Tuple[Tuple[str, ...], Tuple[float, ...]]:
+        entry = self._entries.get(context)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(context)
+            return entry
+        self.misses += 1
+        dist = self.model.next_letter_frequency(context)
+        total = sum(dist.values())
+        ranked = sorted(dist.items(), key=lambda item: (-item[1], item[0]))
+        entry = (
+            tuple(ch for ch, _ in ranked),
+            tuple(math.log(cnt / total) for _, cnt in ranked),
+        )
+        self._entries[context] = entry
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return entry
+
+
+class Beam(NamedTuple):
+    """A continuation and its natural-log probability under the model.
+
+    `finished` is True when it ended early: on a stop character, or on a
+    context with no observed continuation.
+    """
+
+    text: str
+    log_prob: float
+    finished: bool = False
+
+    @property
+    def score(self) -> float:
+        """Mean log-probability per character, so beams of different
+        lengths compare fairly."""
+
+        return self.log_prob / len(self.text) if self.text else 0.0
+
+
+def beam_search(
+    model,
+    prompt: str,
+    length: int,
+    beam_width: int = 4,
+    stop_chars: str = "",
+    cache: Optional[ContextCache] = None,
+    stats: Optional[Dict[str, int]] = None,
+) -> List[Beam]:
+    """Return up to `beam_width` continuations of `prompt`, best first.
+
+    Parameters
+    - model: Any model with `n` and `next_letter_frequency(prompt)`.
+    - prompt (str): The text to continue; its last `n-1` characters are the
+      first context.
+    - length (int): Characters to generate per beam (at most).
+    - beam_width (int): Continuations kept after each step.
+    - stop_chars (str): Characters that finish a beam (included in it),
+      e.g. `"\\n"` to complete a single line.
+    - cache (ContextCache, optional): Share one between searches on the same
+      model to keep its vectors; a new one is made per call by default.
+    - stats (dict, optional): Receives `expanded` (beams extended).
+
+    Behavior
+    - Beams are ranked by `Beam.score`; with no stop characters and a model
+      that never dead-ends, all beams have the same length, so this is the
+      plain total log-probability order.
+    - Each step looks at no more than `beam_width` candidates per beam, since
+      only those can be among the `beam_width` best.
+    - Raises `ValueError` when `length` is negative or `beam_width` is not
+      positive.
+    """
+
+    if length < 0:
+        raise ValueError("length must be non-negative")
+    if beam_width <= 0:
+        raise ValueError("beam_width must be a positive integer")
+    if cache is None:
+        cache = ContextCache(model)
+    if stats is None:
+        stats = {}
+    stats.setdefault("expanded", 0)
+    keep = model.n - 1
+
+    active = [Beam("", 0.0)]
+    finished: List[Beam] = []
+    for _ in range(length):
+        candidates = []
+        for beam in active:
+            history = prompt + beam.text
+            chars, log_probs = cache.get(history[-keep:] if keep else "")
+            stats["expanded"] += 1
+            if not chars:
+                finished.append(beam._replace(finished=True))
+                continue
+            for ch, lp in zip(chars[:beam_width], log_probs[:beam_width]):
+                candidates.append(Beam(beam.text + ch, beam.log_prob + lp, ch in stop_chars))
+        active = []
+        for beam in heapq.nlargest(beam_width, candidates, key=lambda b: b.log_prob):
+            (finished if beam.finished else active).append(beam)
+        if not active:
+            break
+    return heapq.nlargest(beam_width, finished + active, key=lambda b: b.score)
+
+
+def most_likely(model, prompt: str, length: int, stop_chars: str = "", cache: Optional[ContextCache] = None) -> str:
+    """Return the greedy continuation of `prompt`: the most probable next
+    character at every step (ties go to the smallest character)."""
+
+    beams = beam_search(model, prompt, length, 1, stop_chars, cache)
+    return beams[0].text if beams else ""
+
+
+def main() -> None:
+    import argparse
+    import time
+
+    from main import load_text, train_model
+
+    parser = argparse.ArgumentParser(description="Complete prompts with beam search over a character model")
+    parser.add_argument("--file", "-f", help="Training text (default: as main.py)")
+    parser.add_argument("--model", "-m", help="Model file written by main.py --save-model (instead of --file)")
+    parser.add_argument("--n", "-n", type=int, default=5, help="n for n-grams (default: 5)")
+    parser.add_argument("--prompt", "-p", action="append", required=True, help="Text to complete (repeatable)")
+    parser.add_argument("--length", "-l", type=int, default=40, help="Characters to generate (default: 40)")
+    parser.add_argument("--beam-width", "-b", type=int, default=4, help="Beams kept per step (default: 4)")
+    parser.add_argument("--line", action="store_true", help="Stop each beam at the end of the line")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE, help="Contexts kept in the LRU cache")
+    args = parser.parse_args()
+
+    if args.model:
+        from model_io import load_model
+
+        model = load_model(args.model)
+    else:
+        model = train_model(load_text(args.file), args.n)
+
+    cache = ContextCache(model, args.cache_size)
+    stats: Dict[str, int] = {}
+    start = time.perf_counter()
+    for prompt in args.prompt:
+        print(f"Prompt: {prompt!r}")
+        for beam in beam_search(model, prompt, args.length, args.beam_width, "\n" if args.line else "", cache, stats):
+            print(f"  {beam.score:8.4f}  {beam.text!r}")
+    seconds = time.perf_counter() - start
+    print(
+        f"Beams expanded: {stats['expanded']} ({stats['expanded'] / seconds:,.0f}/s); "
+        f"cache: {cache.hits} hits, {cache.misses} misses, hit rate {cache.hit_rate:.1%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
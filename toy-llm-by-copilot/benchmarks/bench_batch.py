@@ -0,0 +1,60 @@
+"""Throughput of batched vs one-at-a-time generation
+
+Times `generate_batch` producing `--samples` texts of `--length` characters
+against the same number of characters from the per-character loop in
+`main.generate_from_model`, and reports characters per second.
+
+Run from the `toy-llm-by-copilot` directory:
+
+    python benchmarks/bench_batch.py --samples 10000 --length 200
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from generate_batch import compile_model, generate_batch
+from main import generate_from_model
+from ngram_model import NGramModel
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark batched generation")
+    parser.add_argument("--file", "-f", default="frankenstein.txt", help="Training text (default: frankenstein.txt)")
+    parser.add_argument("--n", "-n", type=int, default=5, help="n for n-grams (default: 5)")
+    parser.add_argument("--samples", type=int, default=10000, help="Samples per batch (default: 10000)")
+    parser.add_argument("--length", type=int, default=200, help="Characters per sample (default: 200)")
+    args = parser.parse_args()
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        text = f.read()
+    model = NGramModel.from_text(text, args.n)
+
+    start = time.perf_counter()
+    compiled = compile_model(model)
+    compile_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    generate_batch(compiled, args.samples, args.length, seed=0)
+    batch_s = time.perf_counter() - start
+    total = args.samples * args.length
+
+    # the loop is timed on a slice of the work and extrapolated
+    loop_samples = max(1, min(args.samples, 200))
+    start = time.perf_counter()
+    for _ in range(loop_samples):
+        generate_from_model(model, min_len=args.length, max_len=args.length)
+    loop_s = (time.perf_counter() - start) * args.samples / loop_samples
+
+    print(f"Corpus: {args.file}, n={args.n}, {args.samples} samples x {args.length} chars")
+    print(f"compile_model: {compile_s:.3f} s")
+    print(f"{'method':<22}{'seconds':>10}{'Mchars/s':>10}")
+    print(f"{'generate_batch':<22}{batch_s:>10.3f}{total / batch_s / 1e6:>10.2f}")
+    print(f"{'per-character loop':<22}{loop_s:>10.3f}{total / loop_s / 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark: slicing loop vs bytes/mmap n-gram counting
+
+For each n, compares
+- `loop`: reading the file as `str` and counting with `count_char_n_grams`
+  (one `text[i:i+n]` slice per position),
+- `bytes`: `count_char_n_grams_bytes(path)`, which maps the file and packs
+  integer keys from its UTF-8 bytes, creating strings for distinct
+  n-grams only,
+
+reporting wall time (best of `--repeat`, file read included), the
+tracemalloc peak, and the `str` objects each creates: one per position
+(plus the decoded text) for the loop, one per distinct n-gram for bytes.
+
+Run from the `toy-llm-by-copilot` directory:
+
+    python benchmarks/bench_bytes_counts.py --file frankenstein.txt
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from count_char_n_grams import count_char_n_grams
+from count_char_n_grams_bytes import count_char_n_grams_bytes
+
+
+def count_loop(path: str, n: int) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return count_char_n_grams(f.read(), n)
+
+
+def measure(fn, path: str, n: int, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(path, n)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn(path, n)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark bytes/mmap n-gram counting")
+    parser.add_argument("--file", "-f", default="frankenstein.txt", help="Training text (default: frankenstein.txt)")
+    parser.add_argument("--max-n", type=int, default=8, help="Largest n to time (default: 8)")
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of repetitions (default: 3)")
+    args = parser.parse_args()
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        chars = len(f.read())
+    print(f"Corpus: {args.file} ({chars:,} chars, {os.path.getsize(args.file):,} bytes)")
+    print(
+        f"{'n':>3}{'loop s':>9}{'bytes s':>9}{'speedup':>9}"
+        f"{'loop peak KB':>14}{'bytes peak KB':>15}{'loop strs':>11}{'bytes strs':>12}"
+    )
+    for n in range(1, args.max_n + 1):
+        loop_s, loop_peak, expected = measure(count_loop, args.file, n, args.repeat)
+        bytes_s, bytes_peak, counts = measure(count_char_n_grams_bytes, args.file, n, args.repeat)
+        if counts != expected:
+            raise SystemExit(f"mismatch at n={n}")
+        print(
+            f"{n:>3}{loop_s:>9.3f}{bytes_s:>9.3f}{loop_s / bytes_s:>9.1f}"
+            f"{loop_peak / 1024:>14,.0f}{bytes_peak / 1024:>15,.0f}{chars - n + 2:>11,}{len(counts):>12,}"
+        )
+
+
+if __name__ == "__main__":
+    main()
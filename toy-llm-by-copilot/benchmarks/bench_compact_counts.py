@@ -0,0 +1,76 @@
+"""Benchmark: memory of dict counts vs CompactCounts
+
+Builds the n-gram counts of a corpus for each n as the usual
+`dict[str, int]` (`count_char_n_grams`) and as `CompactCounts`, and reports
+the memory each retains (measured with `tracemalloc`) together with the
+time of a batch of lookups.
+
+Run from the `toy-llm-by-copilot` directory:
+
+    python benchmarks/bench_compact_counts.py --file frankenstein.txt
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from compact_counts import CompactCounts
+from count_char_n_grams import count_char_n_grams
+
+
+def retained(fn, *args):
+    """Return `(result, bytes still allocated after building it)`."""
+
+    gc.collect()
+    tracemalloc.start()
+    result = fn(*args)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def time_lookups(counts, keys) -> float:
+    start = time.perf_counter()
+    for key in keys:
+        counts[key]
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare dict and CompactCounts memory")
+    parser.add_argument("--file", "-f", default="frankenstein.txt", help="Training text (default: frankenstein.txt)")
+    parser.add_argument("--min-n", type=int, default=3, help="Smallest n (default: 3)")
+    parser.add_argument("--max-n", type=int, default=8, help="Largest n (default: 8)")
+    parser.add_argument("--lookups", type=int, default=100_000, help="Random lookups to time (default: 100000)")
+    args = parser.parse_args()
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        text = f.read()
+
+    rng = random.Random(0)
+    print(f"Corpus: {args.file} ({len(text):,} chars)")
+    print(f"{'n':>3}{'n-grams':>10}{'dict MB':>10}{'compact MB':>12}{'B/entry':>9}{'ratio':>7}{'dict us':>9}{'cmp us':>8}")
+    for n in range(args.min_n, args.max_n + 1):
+        counts, dict_bytes = retained(count_char_n_grams, text, n)
+        compact, compact_bytes = retained(CompactCounts.from_text, text, n)
+        if compact != counts:
+            raise SystemExit(f"mismatch at n={n}")
+        keys = rng.choices(list(counts), k=args.lookups)
+        dict_us = time_lookups(counts, keys) / len(keys) * 1e6
+        compact_us = time_lookups(compact, keys) / len(keys) * 1e6
+        print(
+            f"{n:>3}{len(counts):>10,}{dict_bytes / 2**20:>10.2f}{compact_bytes / 2**20:>12.2f}"
+            f"{compact_bytes / len(counts):>9.1f}{dict_bytes / compact_bytes:>7.1f}{dict_us:>9.2f}{compact_us:>8.2f}"
+        )
+        del counts, compact, keys
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Benchmark: long-generation throughput with decoding modes
+
+Generates `--chars` characters from one trained model under each decoding
+mode and reports characters per second:
+
+- `plain`: the model's own `AliasSampler`.
+- `temperature`, `top-k`, `top-p`, `combined`: `DecodingModel`, which sorts
+  and cumulative-sums each context once and then bisects per draw.
+- `... (re-sort)`: the same modes done naively, sorting and reshaping the
+  context's distribution on every character before `random.choices`.
+
+Run from the `toy-llm-by-copilot` directory:
+
+    python benchmarks/bench_decoding.py --file frankenstein.txt --n 4 --chars 200000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from decoding import DecodingModel
+from generation import MaxChars, iter_generate
+from ngram_model import NGramModel
+
+
+MODES = {
+    "plain": {},
+    "temperature 0.7": {"temperature": 0.7},
+    "top-k 5": {"top_k": 5},
+    "top-p 0.9": {"top_p": 0.9},
+    "combined": {"temperature": 0.7, "top_k": 10, "top_p": 0.9},
+}
+
+
+class ResortModel:
+    """Decoding without precomputation: reshape the distribution per draw."""
+
+    def __init__(self, model, temperature=1.0, top_k=None, top_p=None):
+        self.model, self.n = model, model.n
+        self.temperature, self.top_k, self.top_p = temperature, top_k, top_p
+
+    def random_context(self, rng=random):
+        return self.model.random_context(rng)
+
+    def draw(self, dist, rng):
+        ranked = sorted(dist.items(), key=lambda item: (-item[1], item[0]))[: self.top_k]
+        top = ranked[0][1]
+        weights = [(w / top) ** (1 / self.temperature) for _, w in ranked]
+        if self.top_p is not None:
+            total, running = sum(weights), 0.0
+            for i, w in enumerate(weights):
+                running += w
+                if running >= self.top_p * total:
+                    weights = weights[: i + 1]
+                    break
+        return rng.choices([ch for ch, _ in ranked[: len(weights)]], weights=weights)[0]
+
+
+def chars_per_second(model, chars: int, seed: int) -> float:
+    rng = random.Random(seed)
+    if isinstance(model, ResortModel):
+        # route each draw through the per-character re-sort
+        table, window = model.model.table, model.random_context(rng)
+        start = time.perf_counter()
+        for _ in range(chars):
+            dist = table.get(window)
+            ch = model.draw(dist, rng) if dist else rng.choice("abcdefghijklmnopqrstuvwxyz")
+            window = (window + ch)[1:] if model.n > 1 else ""
+        return chars / (time.perf_counter() - start)
+    start = time.perf_counter()
+    for _ in iter_generate(model, stop=[MaxChars(chars)], rng=rng):
+        pass
+    return chars / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark decoding modes")
+    parser.add_argument("--file", "-f", default="frankenstein.txt", help="Training text (default: frankenstein.txt)")
+    parser.add_argument("--n", "-n", type=int, default=4, help="n for n-grams (default: 4)")
+    parser.add_argument("--chars", type=int, default=200_000, help="Characters per mode (default: 200000)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args()
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        text = f.read()
+    model = NGramModel.from_text(text, args.n)
+
+    print(f"Corpus: {args.file} ({len(text)} chars), n={args.n}, {len(model)} contexts, {args.chars} chars per mode")
+    print(f"{'mode':<30}{'chars/s':>12}")
+    for name, settings in MODES.items():
+        decoder = DecodingModel(model, **settings) if settings else model
+        print(f"{name:<30}{chars_per_second(decoder, args.chars, args.seed):>12,.0f}")
+        if settings:
+            naive = ResortModel(model, **settings)
+            print(f"{name + ' (re-sort)':<30}{chars_per_second(naive, args.chars, args.seed):>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
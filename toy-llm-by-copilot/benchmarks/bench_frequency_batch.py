@@ -0,0 +1,74 @@
+"""Benchmark: per-prompt next_letter_frequency vs the batch query
+
+Draws prompts of every length below `n` from the corpus and times
+answering all of them with one `next_letter_frequency` call each (on the
+counts dict and on an `NGramModel`) against one
+`next_letter_frequency_batch` call on a prebuilt `NextLetterIndex`, and
+checks that all three agree.
+
+Run from the `toy-llm-by-copilot` directory:
+
+    python benchmarks/bench_frequency_batch.py --file frankenstein.txt
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from count_char_n_grams import count_char_n_grams
+from next_letter_frequency import next_letter_frequency
+from next_letter_frequency_batch import NextLetterIndex, next_letter_frequency_batch
+from ngram_model import NGramModel
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare per-prompt and batch next-letter queries")
+    parser.add_argument("--file", "-f", default="frankenstein.txt", help="Training text (default: frankenstein.txt)")
+    parser.add_argument("--n", type=int, default=5, help="n-gram length (default: 5)")
+    parser.add_argument("--prompts", type=int, default=2000, help="Prompts to query (default: 2000)")
+    parser.add_argument("--dict-prompts", type=int, default=100, help="Prompts for the slow dict scan (default: 100)")
+    args = parser.parse_args()
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        text = f.read()
+
+    rng = random.Random(0)
+    starts = [rng.randrange(len(text) - args.n) for _ in range(args.prompts)]
+    prompts = [text[s:s + rng.randrange(args.n)] for s in starts]
+    counts = count_char_n_grams(text, args.n)
+    model = NGramModel.from_counts(counts)
+    index, index_s = timed(NextLetterIndex, counts)
+
+    batch, batch_s = timed(next_letter_frequency_batch, prompts, index)
+    _, warm_s = timed(next_letter_frequency_batch, prompts, index)
+    sparse, sparse_s = timed(next_letter_frequency_batch, prompts, index, True)
+    per_model, model_s = timed(lambda: [next_letter_frequency(p, model) for p in prompts])
+    few = prompts[: args.dict_prompts]
+    per_dict, dict_s = timed(lambda: [next_letter_frequency(p, counts) for p in few])
+    if any(batch.row(i) != expected for i, expected in enumerate(per_model)):
+        raise SystemExit("batch and NGramModel disagree")
+    if any(sparse.row(i) != expected for i, expected in enumerate(per_dict)):
+        raise SystemExit("batch and dict disagree")
+
+    print(f"Corpus: {args.file} ({len(text):,} chars), n={args.n}, {len(counts):,} n-grams, vocab {len(index.vocab)}")
+    print(f"{'method':<28}{'us/prompt':>10}")
+    print(f"{'dict scan (per prompt)':<28}{dict_s / len(few) * 1e6:>10.1f}")
+    print(f"{'NGramModel (per prompt)':<28}{model_s / len(prompts) * 1e6:>10.1f}")
+    print(f"{'batch dense (cold)':<28}{batch_s / len(prompts) * 1e6:>10.1f}")
+    print(f"{'batch dense (warm)':<28}{warm_s / len(prompts) * 1e6:>10.1f}")
+    print(f"{'batch sparse (warm)':<28}{sparse_s / len(prompts) * 1e6:>10.1f}")
+    print(f"index build: {index_s:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Benchmark: slicing-loop vs NumPy n-gram counting
+
+Times `count_char_n_grams` (the `text[i:i+n]` loop every toy-llm variant
+uses) against `count_char_n_grams_numpy` in both its compact array form and
+its `dict` form, and checks the two backends agree.
+
+Run from the `toy-llm-by-copilot` directory:
+
+    python benchmarks/bench_numpy_counts.py --file frankenstein.txt
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from count_char_n_grams import count_char_n_grams
+from count_char_n_grams_numpy import count_char_n_grams_numpy
+
+
+def best_of(repeat: int, fn, *args, **kwargs):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark NumPy n-gram counting")
+    parser.add_argument("--file", "-f", default="frankenstein.txt", help="Training text (default: frankenstein.txt)")
+    parser.add_argument("--max-n", type=int, default=8, help="Largest n to time (default: 8)")
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of repetitions (default: 3)")
+    args = parser.parse_args()
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        text = f.read()
+
+    print(f"Corpus: {args.file} ({len(text):,} chars)")
+    print(f"{'n':>3}{'loop s':>10}{'arrays s':>10}{'dict s':>10}{'x arrays':>10}{'x dict':>10}")
+    for n in range(1, args.max_n + 1):
+        loop, expected = best_of(args.repeat, count_char_n_grams, text, n)
+        arrays, _ = best_of(args.repeat, count_char_n_grams_numpy, text, n, as_dict=False)
+        as_dict, counts = best_of(args.repeat, count_char_n_grams_numpy, text, n)
+        if counts != expected:
+            raise SystemExit(f"mismatch at n={n}")
+        print(f"{n:>3}{loop:>10.3f}{arrays:>10.3f}{as_dict:>10.3f}{loop / arrays:>10.1f}{loop / as_dict:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
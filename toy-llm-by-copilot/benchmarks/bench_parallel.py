@@ -0,0 +1,52 @@
+"""Speedup curve for multiprocess n-gram counting
+
+Builds a large corpus by concatenating a text file `--copies` times, then
+times `count_char_n_grams_parallel` for 1..`--max-workers` processes and
+prints the speedup over the serial `count_char_n_grams`. Every parallel
+result is checked against the serial one.
+
+Run from the `toy-llm-by-copilot` directory:
+
+    python benchmarks/bench_parallel.py --copies 50 --max-workers 8
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from count_char_n_grams import count_char_n_grams
+from count_char_n_grams_parallel import count_char_n_grams_parallel
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark parallel n-gram counting")
+    parser.add_argument("--file", "-f", default="frankenstein.txt", help="Text to replicate (default: frankenstein.txt)")
+    parser.add_argument("--copies", type=int, default=50, help="Number of concatenated copies (default: 50)")
+    parser.add_argument("--n", "-n", type=int, default=6, help="n for n-grams (default: 6)")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1, help="Largest worker count to time")
+    args = parser.parse_args()
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        text = f.read() * args.copies
+
+    start = time.perf_counter()
+    expected = count_char_n_grams(text, args.n)
+    serial = time.perf_counter() - start
+
+    print(f"Corpus: {args.copies} x {args.file} = {len(text):,} chars, n={args.n}, cpus={os.cpu_count()}")
+    print(f"{'workers':>8}{'seconds':>10}{'speedup':>10}")
+    print(f"{'serial':>8}{serial:>10.2f}{1.0:>10.2f}")
+    for workers in range(1, args.max_workers + 1):
+        start = time.perf_counter()
+        counts = count_char_n_grams_parallel(text, args.n, workers=workers)
+        elapsed = time.perf_counter() - start
+        if counts != expected:
+            raise SystemExit(f"mismatch with {workers} workers")
+        print(f"{workers:>8}{elapsed:>10.2f}{serial / elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Micro-benchmark: next-character draws per second
+
+Compares the per-call samplers used by the toy-llm variants against the
+precomputed samplers in `sampler.py`, drawing repeatedly from the same
+context distribution:
+
+- `random.choices`: rebuilds key and weight lists on every draw
+  (`toy-llm`, `toy-llm-by-copilot/main.py`).
+- `population list`: repeats each character `count` times and picks one
+  (`test-toy-llm`).
+- `CumulativeSampler` and `AliasSampler`: built once, then drawn from.
+
+Run from the `toy-llm-by-copilot` directory:
+
+    python benchmarks/bench_samplers.py --file frankenstein.txt --n 3
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from count_char_n_grams import count_char_n_grams
+from ngram_model import NGramModel
+from sampler import AliasSampler, CumulativeSampler
+
+
+def draw_random_choices(options):
+    chars = list(options.keys())
+    weights = list(options.values())
+    return random.choices(chars, weights=weights, k=1)[0]
+
+
+def draw_population(options):
+    population = []
+    for char, count in options.items():
+        population.extend([char] * count)
+    return random.choice(population)
+
+
+def draws_per_second(draw, seconds: float) -> float:
+    draws = 0
+    batch = 1000
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < seconds:
+        for _ in range(batch):
+            draw()
+        draws += batch
+        elapsed = time.perf_counter() - start
+    return draws / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark next-character samplers")
+    parser.add_argument("--file", "-f", default="frankenstein.txt", help="Training text (default: frankenstein.txt)")
+    parser.add_argument("--n", "-n", type=int, default=3, help="n for n-grams (default: 3)")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Time budget per sampler (default: 1.0)")
+    args = parser.parse_args()
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        text = f.read()
+    model = NGramModel.from_counts(count_char_n_grams(text, args.n), args.n)
+
+    # the busiest context is the worst case for the population-list sampler
+    context, options = max(model.table.items(), key=lambda item: sum(item[1].values()))
+    alias = AliasSampler(options)
+    cumulative = CumulativeSampler(options)
+
+    print(f"Corpus: {args.file} ({len(text)} chars), n={args.n}")
+    print(f"Context: {context!r} with {len(options)} candidates, total count {sum(options.values())}")
+    print()
+    print(f"{'sampler':<20}{'draws/s':>14}")
+    results = [
+        ("random.choices", lambda: draw_random_choices(options)),
+        ("population list", lambda: draw_population(options)),
+        ("CumulativeSampler", cumulative.sample),
+        ("AliasSampler", alias.sample),
+    ]
+    for name, draw in results:
+        print(f"{name:<20}{draws_per_second(draw, args.seconds):>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
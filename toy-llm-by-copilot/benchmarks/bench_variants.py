@@ -0,0 +1,215 @@
+"""Cross-variant benchmark of the toy-llm implementations
+
+Imports `count_char_n_grams`, `next_letter_frequency` and
+`generate_next_char` from every toy-llm variant in the repository
+(`toy-llm`, `toy-llm-by-copilot`, `test-toy-llm`, `test-toy-llm-vscode-agent`,
+plus this directory's `NGramModel` as a reference backend) and runs each on
+real and synthetic corpora for a range of n. For every (variant, corpus, n)
+it records:
+
+- `train_s`, `train_peak_bytes`: time and tracemalloc peak of counting,
+- `us_per_char`: mean `generate_next_char` latency while generating,
+- `counts_match`, `freq_match`: whether the counts and the next-letter
+  frequencies of sampled prompts equal the reference,
+- `tvd`: total variation distance between `draws` sampled next characters
+  and the reference distribution of the most frequent context (near 0,
+  within sampling noise, for a correctly weighted sampler).
+
+Results are written as JSON so runs can be compared over time. Slow
+variants generate on a time budget per cell rather than being skipped.
+
+Run from the `toy-llm-by-copilot` directory:
+
+    python benchmarks/bench_variants.py --out bench_variants.json
+"""
+
+import argparse
+import contextlib
+import importlib
+import importlib.util
+import io
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, NamedTuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+COPILOT = os.path.dirname(HERE)
+ROOT = os.path.dirname(COPILOT)
+sys.path.append(COPILOT)
+
+from ngram_model import NGramModel
+
+
+VARIANT_DIRS = ("toy-llm", "toy-llm-by-copilot", "test-toy-llm-vscode-agent")
+MODULES = ("count_char_n_grams", "next_letter_frequency", "generate_next_char")
+CORPORA = {
+    "lyrics.txt": os.path.join(ROOT, "toy-llm", "lyrics.txt"),
+    "my_way.txt": os.path.join(COPILOT, "my_way.txt"),
+    "frankenstein.txt": os.path.join(COPILOT, "frankenstein.txt"),
+}
+
+
+class Variant(NamedTuple):
+    name: str
+    count: Callable
+    frequency: Callable
+    generate: Callable
+    # turns the counts into what `generate` expects
+    prepare: Callable
+
+
+@contextlib.contextmanager
+def isolated_imports(directory: str):
+    """Import from `directory` without clashing with same-named modules of
+    other variants: new modules are dropped from `sys.modules` afterwards
+    and anything printed on import is swallowed."""
+
+    saved_path = list(sys.path)
+    saved_modules = dict(sys.modules)
+    for name in MODULES:
+        sys.modules.pop(name, None)
+    sys.path.insert(0, directory)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        sys.path[:] = saved_path
+        for name in list(sys.modules):
+            if name not in saved_modules:
+                del sys.modules[name]
+        sys.modules.update(saved_modules)
+
+
+def load_variants() -> List[Variant]:
+    variants = []
+    for dirname in VARIANT_DIRS:
+        with isolated_imports(os.path.join(ROOT, dirname)):
+            mods = [importlib.import_module(name) for name in MODULES]
+        count, freq, gen = (getattr(mod, name) for mod, name in zip(mods, MODULES))
+        variants.append(Variant(dirname, count, freq, gen, lambda counts: counts))
+
+    # test-toy-llm keeps everything in main.py behind a __main__ guard
+    path = os.path.join(ROOT, "test-toy-llm", "main.py")
+    with isolated_imports(os.path.dirname(path)):
+        spec = importlib.util.spec_from_file_location("_test_toy_llm_main", path)
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)
+    variants.append(
+        Variant("test-toy-llm", mod.count_char_n_grams, mod.next_letter_frequency, mod.generate_next_char, lambda c: c)
+    )
+
+    copilot = next(v for v in variants if v.name == "toy-llm-by-copilot")
+    variants.append(copilot._replace(name="toy-llm-by-copilot[NGramModel]", prepare=NGramModel.from_counts))
+    return variants
+
+
+def synthetic_corpora(size: int) -> Dict[str, str]:
+    rng = random.Random(0)
+    alphabet = "abcdefghijklmnopqrstuvwxyz "
+    words = ["lee", "has", "a", "dog", "jane", "soomi", "cat", "the", "and", "my", "way"]
+    return {
+        "synthetic-uniform": "".join(rng.choice(alphabet) for _ in range(size)),
+        "synthetic-words": " ".join(rng.choice(words) for _ in range(size // 4))[:size],
+    }
+
+
+def measure(variant: Variant, text: str, n: int, reference: Dict[str, int], args, rng: random.Random) -> dict:
+    start = time.perf_counter()
+    counts = variant.count(text, n)
+    train_s = time.perf_counter() - start
+    tracemalloc.start()
+    variant.count(text, n)
+    train_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    model = NGramModel.from_counts(reference, n)
+    prepared = variant.prepare(counts)
+    prompts = [model.random_context(rng) for _ in range(args.prompts)]
+    freq_match = all(variant.frequency(p, counts) == model.next_letter_frequency(p) for p in prompts)
+
+    # generation: slide the prompt over the variant's own output
+    prompt = prompts[0]
+    steps = 0
+    deadline = time.perf_counter() + args.budget
+    start = time.perf_counter()
+    while steps < args.chars and (steps < 3 or time.perf_counter() < deadline):
+        prompt = (prompt + variant.generate(prompt, prepared))[-(n - 1):] if n > 1 else ""
+        steps += 1
+    us_per_char = (time.perf_counter() - start) / steps * 1e6
+
+    # sampling equivalence on the most frequent context; the variant gets
+    # only that context's n-grams, so even scanning samplers draw quickly
+    context = max(model.table, key=lambda c: sum(model.table[c].values()))
+    expected = model.table[context]
+    total = sum(expected.values())
+    subset = variant.prepare({context + ch: cnt for ch, cnt in expected.items()})
+    seen: Dict[str, int] = {}
+    for _ in range(args.draws):
+        ch = variant.generate(context, subset)
+        seen[ch] = seen.get(ch, 0) + 1
+    tvd = 0.5 * sum(abs(seen.get(ch, 0) / args.draws - expected.get(ch, 0) / total) for ch in set(seen) | set(expected))
+
+    return {
+        "variant": variant.name,
+        "n": n,
+        "unique_ngrams": len(counts),
+        "train_s": round(train_s, 6),
+        "train_peak_bytes": train_peak,
+        "us_per_char": round(us_per_char, 3),
+        "counts_match": counts == reference,
+        "freq_match": freq_match,
+        "tvd": round(tvd, 4),
+        "draws": args.draws,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark every toy-llm variant")
+    parser.add_argument("--min-n", type=int, default=2, help="Smallest n (default: 2)")
+    parser.add_argument("--max-n", type=int, default=10, help="Largest n (default: 10)")
+    parser.add_argument("--synthetic-size", type=int, default=100_000, help="Synthetic corpus chars (default: 100000)")
+    parser.add_argument("--corpus", action="append", help="Only run these corpora (repeatable)")
+    parser.add_argument("--chars", type=int, default=200, help="Characters to generate per cell (default: 200)")
+    parser.add_argument("--draws", type=int, default=2000, help="Draws for the sampling check (default: 2000)")
+    parser.add_argument("--prompts", type=int, default=20, help="Prompts for the frequency check (default: 20)")
+    parser.add_argument("--budget", type=float, default=1.0, help="Seconds of generation per cell (default: 1)")
+    parser.add_argument("--out", "-o", default="bench_variants.json", help="JSON output (default: bench_variants.json)")
+    args = parser.parse_args()
+
+    corpora = {}
+    for name, path in CORPORA.items():
+        with open(path, "r", encoding="utf-8") as f:
+            corpora[name] = f.read()
+    corpora.update(synthetic_corpora(args.synthetic_size))
+    if args.corpus:
+        corpora = {name: corpora[name] for name in args.corpus}
+
+    variants = load_variants()
+    rng = random.Random(0)
+    results = []
+    print(f"{'corpus':<18}{'n':>3} {'variant':<33}{'train ms':>10}{'peak KB':>10}{'us/char':>11}{'match':>7}{'tvd':>7}")
+    for corpus, text in corpora.items():
+        for n in range(args.min_n, args.max_n + 1):
+            reference = NGramModel.from_text(text, n)
+            reference_counts = {c + ch: cnt for c, dist in reference.table.items() for ch, cnt in dist.items()}
+            for variant in variants:
+                random.seed(0)
+                row = dict(corpus=corpus, chars=len(text), **measure(variant, text, n, reference_counts, args, rng))
+                results.append(row)
+                match = "yes" if row["counts_match"] and row["freq_match"] else "NO"
+                print(
+                    f"{corpus:<18}{n:>3} {variant.name:<33}{row['train_s'] * 1e3:>10.2f}"
+                    f"{row['train_peak_bytes'] / 1024:>10.0f}{row['us_per_char']:>11.2f}{match:>7}{row['tvd']:>7.3f}"
+                )
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2)
+    print(f"Results written to: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
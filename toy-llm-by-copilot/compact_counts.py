@@ -0,0 +1,180 @@
+"""Array-backed n-gram counts
+
+Provides `CompactCounts`, a read-only `Mapping[str, int]` with the same
+contents as a `count_char_n_grams` dictionary, stored as two parallel
+NumPy arrays instead of one `str` object per n-gram:
+
+- `codes` (uint64): each n-gram packed in base `len(vocab)`, sorted,
+- `counts` (uint32): the count of each code.
+
+That is 12 bytes per distinct n-gram against roughly 100+ for a dict entry.
+Lookups binary-search `codes`; because the first character is the most
+significant digit, all n-grams sharing a prefix form one contiguous range,
+which `next_letter_frequency` reads with two binary searches.
+"""
+
+from bisect import bisect_left
+from collections.abc import ItemsView, Mapping, ValuesView
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from count_char_n_grams_numpy import MAX_CODE, PackedCounts, count_char_n_grams_numpy, decode_codes
+
+
+# codes decoded per block while iterating, to bound the temporary strings
+ITER_BLOCK = 1 << 16
+
+
+class _CompactItems(ItemsView):
+    def __iter__(self):
+        counts = self._mapping.counts
+        for start, keys in self._mapping._iter_blocks():
+            yield from zip(keys, counts[start:start + len(keys)].tolist())
+
+
+class _CompactValues(ValuesView):
+    def __iter__(self):
+        return iter(self._mapping.counts.tolist())
+
+
+class CompactCounts(Mapping):
+    """n-gram counts in sorted packed-code arrays.
+
+    Parameters
+    - vocab (str): The sorted distinct characters; a character's index in
+      `vocab` is its digit in a code.
+    - n (int): The n-gram length.
+    - codes (np.ndarray): Sorted, distinct n-gram codes.
+    - counts (np.ndarray): The count of each code; stored as uint32.
+
+    Behavior
+    - Supports `[]`, `get`, `in`, `len`, iteration (in sorted n-gram order),
+      `keys`/`values`/`items` and `==` with any mapping, so it can be passed
+      wherever a counts dictionary is read (e.g. `NGramModel.from_counts`,
+      `save_model`).
+    - Raises `ValueError` if a count does not fit in uint32.
+    """
+
+    def __init__(self, vocab: str, n: int, codes: np.ndarray, counts: np.ndarray) -> None:
+        if len(codes) != len(counts):
+            raise ValueError("codes and counts must have the same length")
+        if len(counts) and int(counts.max()) > np.iinfo(np.uint32).max:
+            raise ValueError("counts do not fit in uint32")
+        self.vocab = vocab
+        self.n = n
+        self.codes = np.ascontiguousarray(codes, dtype=np.uint64)
+        self.counts = np.ascontiguousarray(counts, dtype=np.uint32)
+        self._base = max(len(vocab), 1)
+        self._char_id = {ch: i for i, ch in enumerate(vocab)}
+        # plain memoryviews: bisecting them beats np.searchsorted on scalars
+        self._code_view = memoryview(self.codes).cast("B").cast("Q")
+        self._count_view = memoryview(self.counts).cast("B").cast("I")
+
+    @classmethod
+    def from_packed(cls, packed: PackedCounts) -> "CompactCounts":
+        """Wrap the arrays of `count_char_n_grams_numpy(..., as_dict=False)`."""
+
+        return cls(packed.vocab, packed.n, packed.codes, packed.counts)
+
+    @classmethod
+    def from_text(cls, text: str, n: int = 3) -> "CompactCounts":
+        """Count the n-grams of `text` straight into arrays."""
+
+        return cls.from_packed(count_char_n_grams_numpy(text, n, as_dict=False))
+
+    @classmethod
+    def from_counts(cls, counts: Dict[str, int], n: Optional[int] = None) -> "CompactCounts":
+        """Convert an n-gram counts dictionary."""
+
+        if n is None:
+            if not counts:
+                raise ValueError("n is required when counts is empty")
+            n = len(next(iter(counts)))
+        vocab = "".join(sorted(set().union(*counts))) if counts else ""
+        compact = cls(vocab, n, np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.uint32))
+        if compact._base ** n > MAX_CODE:
+            raise ValueError(f"{n}-grams over {compact._base} symbols do not fit in 64-bit codes")
+        pairs = sorted((compact._encode(ngram), cnt) for ngram, cnt in counts.items() if len(ngram) == n)
+        if len(pairs) != len(counts):
+            raise ValueError(f"all n-grams must have length {n}")
+        codes = np.array([code for code, _ in pairs], dtype=np.uint64)
+        return cls(vocab, n, codes, np.array([cnt for _, cnt in pairs], dtype=np.int64))
+
+    def nbytes(self) -> int:
+        """Return the size of the code and count arrays in bytes."""
+
+        return self.codes.nbytes + self.counts.nbytes
+
+    def _encode(self, chars: str) -> Optional[int]:
+        code = 0
+        for ch in chars:
+            digit = self._char_id.get(ch)
+            if digit is None:
+                return None
+            code = code * self._base + digit
+        return code
+
+    def _iter_blocks(self) -> Iterator[Tuple[int, list]]:
+        for start in range(0, len(self.codes), ITER_BLOCK):
+            yield start, decode_codes(self.codes[start:start + ITER_BLOCK], self.n, self.vocab)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __iter__(self) -> Iterator[str]:
+        for _, keys in self._iter_blocks():
+            yield from keys
+
+    def __getitem__(self, ngram: str) -> int:
+        code = self._encode(ngram) if isinstance(ngram, str) and len(ngram) == self.n else None
+        if code is not None:
+            i = bisect_left(self._code_view, code)
+            if i < len(self._code_view) and self._code_view[i] == code:
+                return self._count_view[i]
+        raise KeyError(ngram)
+
+    def items(self) -> ItemsView:
+        return _CompactItems(self)
+
+    def values(self) -> ValuesView:
+        return _CompactValues(self)
+
+    def prefix_range(self, prefix: str) -> Tuple[int, int]:
+        """Return the index range `[lo, hi)` of the n-grams starting with
+        `prefix` (empty if `prefix` is longer than `n`)."""
+
+        if len(prefix) > self.n:
+            return 0, 0
+        code = self._encode(prefix)
+        if code is None:
+            return 0, 0
+        scale = self._base ** (self.n - len(prefix))
+        lo = bisect_left(self._code_view, code * scale)
+        return lo, bisect_left(self._code_view, (code + 1) * scale, lo)
+
+    def next_letter_frequency(self, prompt: str) -> Dict[str, int]:
+        """Return the next-character frequencies following `prompt`, with
+        the semantics of the `next_letter_frequency` function (an empty
+        prompt gives the last character of every n-gram)."""
+
+        plen = len(prompt)
+        if plen >= self.n:
+            return {}
+        lo, hi = self.prefix_range(prompt)
+        if lo == hi:
+            return {}
+        position = self.n - 1 if plen == 0 else plen
+        divisor = np.uint64(self._base ** (self.n - 1 - position))
+        digits = (self.codes[lo:hi] // divisor) % np.uint64(self._base)
+        totals = np.bincount(digits.astype(np.intp), weights=self.counts[lo:hi], minlength=len(self.vocab))
+        nonzero = np.flatnonzero(totals)
+        return {self.vocab[i]: int(totals[i]) for i in nonzero.tolist()}
+
+
+if __name__ == "__main__":
+    text = "Lee has a dog. Jane has a dog. Soomi has a cat."
+    counts = CompactCounts.from_text(text, 4)
+    print("Distinct 4-grams:", len(counts), "in", counts.nbytes(), "bytes")
+    print("' a d' count:", counts[" a d"])
+    print("Next-letter frequencies:", counts.next_letter_frequency(" a "))
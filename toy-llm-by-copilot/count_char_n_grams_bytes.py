@@ -0,0 +1,113 @@
+"""Character n-gram counter over raw UTF-8 bytes
+
+Provides `count_char_n_grams_bytes(data, n)`, which counts the same
+n-grams as `count_char_n_grams` straight from UTF-8 `bytes`, a
+`memoryview` or a memory-mapped file, without decoding the text to a
+`str` or slicing out any n-gram:
+
+1. the bytes are viewed as a `uint8` array (no copy for an `mmap`) and
+   decoded to code points with vectorized masks and shifts: character
+   starts are the bytes that are not `10xxxxxx` continuation bytes,
+2. each n-gram becomes one integer key, built for all positions at once
+   with the shifted-array packing of `count_char_n_grams_numpy`,
+3. only the distinct keys are turned into strings at the end.
+
+The slicing loop creates one `str` per position; this creates one per
+distinct n-gram.
+"""
+
+import mmap
+import os
+from typing import Tuple, Union
+
+import numpy as np
+
+from count_char_n_grams_numpy import PackedCounts, count_ids, encode_code_points
+
+
+Data = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+# payload bits of a lead byte, by character length in bytes
+_LEAD_MASKS = np.array([0, 0x7F, 0x1F, 0x0F, 0x07], dtype=np.uint32)
+
+
+def encode_utf8(data: Data) -> Tuple[str, np.ndarray]:
+    """Return `(vocab, ids)` as `encode_text(data.decode("utf-8"))` would.
+
+    Raises `ValueError` when the byte structure is not UTF-8 (stray or
+    missing continuation bytes, invalid lead bytes). Overlong encodings and
+    surrogates are not rejected.
+    """
+
+    arr = np.frombuffer(data, dtype=np.uint8)
+    if len(arr) == 0 or arr.max() < 0x80:
+        return encode_code_points(arr)
+
+    starts = np.flatnonzero((arr & 0xC0) != 0x80)
+    lead = arr[starts]
+    length = 1 + (lead >= 0xC0).astype(np.uint8) + (lead >= 0xE0) + (lead >= 0xF0)
+    if (
+        len(starts) == 0
+        or starts[0] != 0
+        or np.any(np.diff(starts, append=len(arr)) != length)
+        or np.any((lead >= 0x80) & (lead < 0xC2))
+        or np.any(lead > 0xF4)
+    ):
+        raise ValueError("data is not valid UTF-8")
+
+    points = lead & _LEAD_MASKS[length]
+    for k in range(1, 4):
+        longer = np.flatnonzero(length > k)
+        points[longer] = (points[longer] << 6) | (arr[starts[longer] + k] & 0x3F)
+    return encode_code_points(points)
+
+
+def count_char_n_grams_bytes(
+    data: Union[Data, str, "os.PathLike[str]"], n: int = 3, as_dict: bool = True
+) -> Union[dict[str, int], PackedCounts]:
+    """Count the character n-grams of UTF-8 encoded `data`.
+
+    Parameters
+    - data: `bytes`/`bytearray`/`memoryview`/`mmap` holding UTF-8 text, or a
+      path to a UTF-8 file, which is memory-mapped.
+    - n (int): The length of each n-gram in characters. Defaults to 3.
+    - as_dict (bool): Return a `dict[str, int]` (default) or `PackedCounts`.
+
+    Returns
+    - dict[str, int] | PackedCounts: Equal to
+      `count_char_n_grams(data.decode("utf-8"), n)`, keys in sorted order
+      (as `count_char_n_grams_numpy`).
+
+    Behavior
+    - Raises the same `TypeError`/`ValueError` as `count_char_n_grams` for
+      invalid `n`, `ValueError` for invalid UTF-8, and `ValueError` when
+      the n-grams do not fit in 64-bit keys (see `count_char_n_grams_numpy`).
+    - A file's bytes are counted as they are: unlike `open(path, "r")`,
+      `\\r\\n` line endings are not translated to `\\n`.
+    """
+
+    if not isinstance(n, int):
+        raise TypeError("n must be an integer")
+    if n <= 0:
+        raise ValueError("n must be a positive integer")
+
+    if isinstance(data, (str, os.PathLike)):
+        with open(data, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return count_char_n_grams_bytes(b"", n, as_dict)
+            error = None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                try:
+                    vocab, ids = encode_utf8(mm)
+                except ValueError as exc:
+                    # raised once the map is closed: the traceback holds views of it
+                    error = str(exc)
+        if error is not None:
+            raise ValueError(error)
+        return count_ids(vocab, ids, n, as_dict)
+    return count_ids(*encode_utf8(data), n, as_dict)
+
+
+if __name__ == "__main__":
+    sample = "KocseaKocsea café"
+    print("Counts:", count_char_n_grams_bytes(sample.encode("utf-8"), 4))
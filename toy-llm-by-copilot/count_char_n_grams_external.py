@@ -0,0 +1,259 @@
+"""Out-of-core character n-gram counter (external sort-merge)
+
+Provides `count_char_n_grams_external(source, path, n, memory_limit)`,
+which counts the n-grams of a corpus of any size straight into a model
+file (see `model_io`), keeping memory under `memory_limit` throughout:
+
+1. the text is read in overlapping chunks sized from the limit; each
+   chunk's n-grams are counted with NumPy and spilled to a temporary
+   "run" file as `(key, count)` records sorted by key, where the key is
+   the n-gram as UTF-32-BE (whose byte order is the string order),
+2. the runs are k-way merged with `heapq.merge`, reading each run in
+   fixed-size blocks and summing equal keys; when there are too many runs
+   for one block per run to fit, runs are first merged in groups,
+3. the merged stream is written with `model_io.write_model_file_bounded`.
+
+The streaming counter (`count_char_n_grams_stream`) holds every distinct
+n-gram in a dict; here only one chunk, or one block per merged run, is in
+memory at a time. The file is byte-identical to
+`save_model(count_char_n_grams(text, n), path)`.
+"""
+
+import argparse
+import heapq
+import os
+import tempfile
+from typing import IO, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from count_char_n_grams_numpy import MAX_CODE, pack_n_grams
+from count_char_n_grams_stream import iter_overlapping_chunks
+from model_io import write_model_file_bounded
+
+
+DEFAULT_MEMORY_LIMIT = 256 << 20
+
+# rough peak bytes per character while a chunk is encoded, packed and sorted
+CHUNK_BYTES_PER_CHAR = 64
+# rough bytes per record held as Python objects during a merge, plus 4 per character
+MERGE_RECORD_BYTES = 192
+# fewest records read from a run at a time; more runs than fit are merged in passes
+MIN_BLOCK_RECORDS = 256
+
+Source = Union[str, "os.PathLike[str]", IO[str]]
+
+
+class ExternalCountStats(NamedTuple):
+    """What an external count did.
+
+    Fields
+    - ngrams (int): Distinct n-grams written.
+    - total (int): Total number of n-grams in the text.
+    - runs (int): Sorted runs spilled while counting.
+    - merge_passes (int): Merge passes over the data, the final one
+      included (0 when there was nothing to merge).
+    - chunk_size (int): Characters counted per chunk.
+    """
+
+    ngrams: int
+    total: int
+    runs: int
+    merge_passes: int
+    chunk_size: int
+
+
+def _record_dtype(n: int) -> np.dtype:
+    return np.dtype([("key", ">u4", (n,)), ("count", "<u8")])
+
+
+def _chunk_records(chunk: str, n: int) -> np.ndarray:
+    """Return the distinct n-grams of `chunk` and their counts as records
+    sorted by key."""
+
+    points = np.frombuffer(chunk.encode("utf-32-le"), dtype="<u4")
+    m = len(points) - n + 1
+    if m <= 0:
+        return np.zeros(0, dtype=_record_dtype(n))
+    # sorting, unlike encode_text's presence table, costs memory in
+    # proportion to the chunk rather than to the largest code point
+    vocab, ids = np.unique(points, return_inverse=True)
+    if len(vocab) ** n <= MAX_CODE:
+        # code order is key order: digits are vocab indices in code point order
+        codes, counts = np.unique(pack_n_grams(ids.astype(np.uint64), n, len(vocab)), return_counts=True)
+        base = np.uint64(len(vocab))
+        digits = np.empty((len(codes), n), dtype=np.intp)
+        for j in range(n - 1, -1, -1):
+            digits[:, j] = codes % base
+            codes //= base
+        keys = vocab[digits]
+    else:
+        windows = np.lib.stride_tricks.sliding_window_view(points, n)
+        windows = windows[np.lexsort(windows.T[::-1])]
+        starts = np.flatnonzero(np.r_[True, np.any(windows[1:] != windows[:-1], axis=1)])
+        keys = windows[starts]
+        counts = np.diff(np.r_[starts, m])
+    records = np.empty(len(keys), dtype=_record_dtype(n))
+    records["key"] = keys
+    records["count"] = counts
+    return records
+
+
+def _read_run(path: str, n: int, block: int) -> Iterator[Tuple[bytes, int]]:
+    dtype = _record_dtype(n)
+    with open(path, "rb") as f:
+        while True:
+            records = np.fromfile(f, dtype=dtype, count=block)
+            if not len(records):
+                return
+            keys = np.ascontiguousarray(records["key"]).view(f"V{4 * n}").ravel().tolist()
+            yield from zip(keys, records["count"].tolist())
+
+
+def _merge_runs(paths: List[str], n: int, block: int) -> Iterator[Tuple[bytes, int]]:
+    """Yield `(key, count)` for every distinct key of `paths`, in order."""
+
+    key, total = None, 0
+    for k, cnt in heapq.merge(*(_read_run(path, n, block) for path in paths)):
+        if k != key:
+            if key is not None:
+                yield key, total
+            key, total = k, 0
+        total += cnt
+    if key is not None:
+        yield key, total
+
+
+def _write_run(path: str, n: int, items: Iterable[Tuple[bytes, int]], block: int) -> None:
+    dtype = _record_dtype(n)
+    buffered: List[Tuple[bytes, int]] = []
+
+    def flush() -> None:
+        records = np.empty(len(buffered), dtype=dtype)
+        records["key"] = np.frombuffer(b"".join(k for k, _ in buffered), dtype=">u4").reshape(-1, n)
+        records["count"] = [cnt for _, cnt in buffered]
+        records.tofile(f)
+        buffered.clear()
+
+    with open(path, "wb") as f:
+        for item in items:
+            buffered.append(item)
+            if len(buffered) >= block:
+                flush()
+        flush()
+
+
+def count_char_n_grams_external(
+    source: Source,
+    path: str,
+    n: int = 3,
+    memory_limit: int = DEFAULT_MEMORY_LIMIT,
+    tmp_dir: Optional[str] = None,
+) -> ExternalCountStats:
+    """Count the character n-grams of `source` into the model file `path`.
+
+    Parameters
+    - source: A path (read as UTF-8 text) or an open text file object.
+    - path (str): Destination model file; overwritten if it exists.
+    - n (int): The length of each n-gram. Defaults to 3.
+    - memory_limit (int): Bytes of working memory to stay under; sets the
+      chunk size, the merge fan-in and the read/write block sizes.
+      Defaults to 256 MB. File buffers add a fixed few hundred KB, so
+      limits below about 1 MB are exceeded.
+    - tmp_dir (str, optional): Where to spill runs and file sections
+      (default: the system temporary directory). Needs about twice the
+      final model's size in free space.
+
+    Returns
+    - ExternalCountStats: Counts of n-grams, runs and merge passes.
+
+    Behavior
+    - The file is identical to `save_model(count_char_n_grams(text, n),
+      path)` and loads with `model_io.load_model`.
+    - Raises the same `TypeError`/`ValueError` as `count_char_n_grams` for
+      invalid `n`, and `ValueError` for a non-positive `memory_limit`.
+    """
+
+    if not isinstance(n, int):
+        raise TypeError("n must be an integer")
+    if n <= 0:
+        raise ValueError("n must be a positive integer")
+    if not isinstance(memory_limit, int):
+        raise TypeError("memory_limit must be an integer")
+    if memory_limit <= 0:
+        raise ValueError("memory_limit must be a positive integer")
+
+    chunk_size = max(n, memory_limit // (CHUNK_BYTES_PER_CHAR + 12 * n))
+    record_bytes = MERGE_RECORD_BYTES + 4 * n
+    # half of the limit for the blocks being merged, a quarter for the output buffer
+    merge_budget = memory_limit // 2
+    fan_in = max(2, merge_budget // (MIN_BLOCK_RECORDS * record_bytes))
+    out_block = max(1, memory_limit // 4 // record_bytes)
+
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as spill:
+        runs: List[str] = []
+        total = 0
+        for chunk in iter_overlapping_chunks(source, n, chunk_size):
+            records = _chunk_records(chunk, n)
+            if len(records):
+                runs.append(os.path.join(spill, f"run-{len(runs):06d}.bin"))
+                records.tofile(runs[-1])
+                total += int(records["count"].sum())
+            del records
+        num_runs = len(runs)
+
+        passes = 0
+        while len(runs) > fan_in:
+            merged: List[str] = []
+            block = max(1, merge_budget // (fan_in * record_bytes))
+            for i in range(0, len(runs), fan_in):
+                group = runs[i:i + fan_in]
+                merged.append(os.path.join(spill, f"pass{passes}-{len(merged):06d}.bin"))
+                _write_run(merged[-1], n, _merge_runs(group, n, block), out_block)
+                for run in group:
+                    os.remove(run)
+            runs = merged
+            passes += 1
+
+        ngrams = 0
+
+        def entries() -> Iterator[Tuple[str, str, int]]:
+            nonlocal ngrams
+            block = max(1, merge_budget // (max(len(runs), 1) * record_bytes))
+            for key, cnt in _merge_runs(runs, n, block):
+                ngrams += 1
+                yield key[:-4].decode("utf-32-be"), chr(int.from_bytes(key[-4:], "big")), cnt
+
+        with open(path, "wb") as f:
+            write_model_file_bounded(f, n, entries(), out_block, spill)
+        if runs:
+            passes += 1
+
+    return ExternalCountStats(ngrams, total, num_runs, passes, chunk_size)
+
+
+def main() -> None:
+    from sketch_model import parse_memory_budget
+
+    parser = argparse.ArgumentParser(description="Count n-grams of a large corpus into a model file in bounded memory")
+    parser.add_argument("file", help="UTF-8 input text")
+    parser.add_argument("model", help="Model file to write (load with main.py --model)")
+    parser.add_argument("--n", "-n", type=int, default=4, help="n for n-grams (default: 4)")
+    parser.add_argument(
+        "--memory-limit",
+        type=parse_memory_budget,
+        default=DEFAULT_MEMORY_LIMIT,
+        help="Working memory to stay under, e.g. 64MB (default: 256MB)",
+    )
+    parser.add_argument("--tmp-dir", help="Directory for temporary runs (default: system temp)")
+    args = parser.parse_args()
+
+    stats = count_char_n_grams_external(args.file, args.model, args.n, args.memory_limit, args.tmp_dir)
+    print(
+        f"{stats.total} n-grams, {stats.ngrams} distinct; {stats.runs} runs of {stats.chunk_size} chars, "
+        f"{stats.merge_passes} merge passes; model written to: {args.model}"
+    )
+
+
+if __name__ == "__main__":
+    main()
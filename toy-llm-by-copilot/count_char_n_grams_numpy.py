@@ -0,0 +1,180 @@
+"""Vectorized character n-gram counter (NumPy backend)
+
+Provides `count_char_n_grams_numpy(text, n)`, a drop-in alternative to
+`count_char_n_grams` with no Python-level loop over text positions:
+
+1. the text is encoded as an integer array over its sorted character
+   vocabulary,
+2. every n-gram is packed into one `uint64` code in base `len(vocab)` by
+   combining `n` shifted views of that array,
+3. the codes are counted with `np.bincount` when the code space is small,
+   otherwise with `np.unique(..., return_counts=True)`.
+
+The result is either the usual `dict[str, int]` or, with
+`as_dict=False`, the compact `PackedCounts` arrays.
+"""
+
+from typing import List, NamedTuple, Tuple, Union
+
+import numpy as np
+
+
+MAX_CODE = 1 << 64
+# code spaces up to this size are counted with np.bincount instead of sorting
+BINCOUNT_LIMIT = 1 << 22
+
+
+class PackedCounts(NamedTuple):
+    """n-gram counts as sorted packed integer codes.
+
+    Fields
+    - vocab (str): The sorted distinct characters; a character's index in
+      `vocab` is its digit in a code.
+    - n (int): The n-gram length.
+    - codes (np.ndarray[uint64]): Sorted, distinct n-gram codes. The first
+      character of an n-gram is the most significant digit.
+    - counts (np.ndarray[int64]): The count of each code.
+    """
+
+    vocab: str
+    n: int
+    codes: np.ndarray
+    counts: np.ndarray
+
+    def decode(self) -> List[str]:
+        """Return the n-gram string of every code, in code order."""
+
+        return decode_codes(self.codes, self.n, self.vocab)
+
+    def to_dict(self) -> dict[str, int]:
+        """Return the counts as a `dict[str, int]` in code order."""
+
+        return dict(zip(self.decode(), self.counts.tolist()))
+
+
+def encode_text(text: str) -> Tuple[str, np.ndarray]:
+    """Encode `text` as indices into its sorted character vocabulary.
+
+    Returns
+    - (vocab, ids): `vocab` is a string of the distinct characters in
+      code point order; `ids` is a `uint64` array with `vocab[ids[i]] ==
+      text[i]`.
+    """
+
+    return encode_code_points(np.frombuffer(text.encode("utf-32-le"), dtype="<u4"))
+
+
+def encode_code_points(code_points: np.ndarray) -> Tuple[str, np.ndarray]:
+    """Like `encode_text`, for an array of code points."""
+
+    if len(code_points) == 0:
+        return "", np.zeros(0, dtype=np.uint64)
+    # a presence table over code points avoids sorting the whole text
+    present = np.zeros(int(code_points.max()) + 1, dtype=bool)
+    present[code_points] = True
+    uniq = np.flatnonzero(present)
+    lookup = np.cumsum(present, dtype=np.uint64) - np.uint64(1)
+    vocab = "".join(map(chr, uniq.tolist()))
+    return vocab, lookup[code_points]
+
+
+def packed_codes_fit(vocab_size: int, n: int) -> bool:
+    """Return whether every n-gram over `vocab_size` characters has a
+    64-bit packed code."""
+
+    return max(vocab_size, 1) ** n <= MAX_CODE
+
+
+def pack_n_grams(ids: np.ndarray, n: int, base: int) -> np.ndarray:
+    """Return the packed code of the n-gram starting at each position.
+
+    Raises `ValueError` if `base ** n` does not fit in 64 bits.
+    """
+
+    if not packed_codes_fit(base, n):
+        raise ValueError(f"{n}-grams over {base} symbols do not fit in 64-bit codes")
+    m = len(ids) - n + 1
+    if m <= 0:
+        return np.zeros(0, dtype=np.uint64)
+    base_u = np.uint64(base)
+    codes = ids[:m].astype(np.uint64, copy=True)
+    for j in range(1, n):
+        codes *= base_u
+        codes += ids[j:j + m]
+    return codes
+
+
+def decode_codes(codes: np.ndarray, n: int, vocab: str) -> List[str]:
+    """Turn packed codes back into n-gram strings."""
+
+    if len(codes) == 0:
+        return []
+    base = np.uint64(max(len(vocab), 1))
+    digits = np.empty((len(codes), n), dtype=np.uint64)
+    rest = codes.copy()
+    for j in range(n - 1, -1, -1):
+        digits[:, j] = rest % base
+        rest //= base
+    if "\0" in vocab:
+        # fixed-width unicode arrays drop trailing NULs; join in Python
+        return ["".join(vocab[d] for d in row) for row in digits.tolist()]
+    chars = np.array(list(vocab), dtype="<U1")
+    return np.ascontiguousarray(chars[digits]).view(f"<U{n}").ravel().tolist()
+
+
+def count_char_n_grams_numpy(text: str, n: int = 3, as_dict: bool = True) -> Union[dict[str, int], PackedCounts]:
+    """Count character n-grams in `text` with vectorized NumPy operations.
+
+    Parameters
+    - text (str): The input string in which to count n-grams.
+    - n (int): The length of each n-gram. Defaults to 3.
+    - as_dict (bool): Return a `dict[str, int]` (default) or the compact
+      `PackedCounts` arrays.
+
+    Returns
+    - dict[str, int] | PackedCounts: The same counts as
+      `count_char_n_grams(text, n)`. Dictionary keys are in sorted order
+      rather than first-occurrence order.
+
+    Behavior
+    - Raises the same `TypeError`/`ValueError` as `count_char_n_grams` for
+      invalid `n`.
+    - Raises `ValueError` when `len(vocab) ** n` exceeds 64 bits (for
+      ASCII-like text, roughly n > 9); use `count_char_n_grams` then.
+    """
+
+    if not isinstance(n, int):
+        raise TypeError("n must be an integer")
+    if n <= 0:
+        raise ValueError("n must be a positive integer")
+
+    return count_ids(*encode_text(text), n, as_dict)
+
+
+def count_ids(vocab: str, ids: np.ndarray, n: int, as_dict: bool = True) -> Union[dict[str, int], PackedCounts]:
+    """Count the n-grams of text already encoded by `encode_text`."""
+
+    base = max(len(vocab), 1)
+    codes = pack_n_grams(ids, n, base)
+    if base ** n <= BINCOUNT_LIMIT:
+        counts = np.bincount(codes.astype(np.intp))
+        uniq = np.flatnonzero(counts).astype(np.uint64)
+        counts = counts[uniq]
+    else:
+        uniq, counts = np.unique(codes, return_counts=True)
+    packed = PackedCounts(vocab, n, uniq, counts.astype(np.int64))
+    if as_dict:
+        return packed.to_dict()
+    return packed
+
+
+if __name__ == "__main__":
+    sample = "KocseaKocsea"
+    n = 4
+    print("Sample:", sample)
+    print("n:", n)
+    print("Counts:", count_char_n_grams_numpy(sample, n))
+    packed = count_char_n_grams_numpy(sample, n, as_dict=False)
+    print("Vocab:", repr(packed.vocab))
+    print("Codes:", packed.codes.tolist())
+    print("Counts:", packed.counts.tolist())
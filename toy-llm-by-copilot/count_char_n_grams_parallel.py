@@ -0,0 +1,116 @@
+"""Multiprocess character n-gram counter
+
+Provides `count_char_n_grams_parallel(text, n, workers)`, which splits the
+text into overlapping shards, counts each shard with `count_char_n_grams`
+in a process pool and merges the partial dictionaries pairwise (a tree
+reduction). The result is identical to `count_char_n_grams(text, n)`.
+"""
+
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import List, Optional
+
+from count_char_n_grams import count_char_n_grams
+
+
+def shard_text(text: str, n: int, shards: int) -> List[str]:
+    """Split `text` into `shards` pieces that overlap by `n-1` characters.
+
+    Shard `i` holds the n-grams starting in its own slice of positions, plus
+    the `n-1` following characters needed to complete the last of them, so
+    every n-gram of `text` appears in exactly one shard.
+    """
+
+    length = len(text)
+    bounds = [length * i // shards for i in range(shards + 1)]
+    return [text[bounds[i]:bounds[i + 1] + n - 1] for i in range(shards)]
+
+
+def merge_counts(left: dict[str, int], right: dict[str, int]) -> dict[str, int]:
+    """Return the sum of two count dictionaries.
+
+    Keys of `left` come first, followed by keys only present in `right`, so
+    merging shards left to right keeps the first-occurrence order that
+    `count_char_n_grams` produces.
+    """
+
+    merged = dict(left)
+    for ngram, cnt in right.items():
+        merged[ngram] = merged.get(ngram, 0) + cnt
+    return merged
+
+
+def _merge_pair(pair: tuple) -> dict[str, int]:
+    return merge_counts(*pair)
+
+
+def tree_merge(parts: List[dict[str, int]], executor: Optional[Executor] = None) -> dict[str, int]:
+    """Merge `parts` in rounds of adjacent pairs until one dictionary is left.
+
+    Each round halves the number of dictionaries; when `executor` is given
+    the merges of a round run concurrently on it.
+    """
+
+    if not parts:
+        return {}
+    while len(parts) > 1:
+        pairs = [(parts[i], parts[i + 1]) for i in range(0, len(parts) - 1, 2)]
+        leftover = [parts[-1]] if len(parts) % 2 else []
+        if executor is not None and len(pairs) > 1:
+            merged = list(executor.map(_merge_pair, pairs))
+        else:
+            merged = [_merge_pair(pair) for pair in pairs]
+        parts = merged + leftover
+    return parts[0]
+
+
+def _count_shard(args: tuple) -> dict[str, int]:
+    shard, n = args
+    return count_char_n_grams(shard, n)
+
+
+def count_char_n_grams_parallel(text: str, n: int = 3, workers: Optional[int] = None) -> dict[str, int]:
+    """Count character n-grams of `text` using several processes.
+
+    Parameters
+    - text (str): The input string in which to count n-grams.
+    - n (int): The length of each n-gram. Defaults to 3.
+    - workers (int, optional): Number of worker processes. Defaults to
+      `os.cpu_count()`. With one worker the text is counted in-process.
+
+    Returns
+    - dict[str, int]: Exactly what `count_char_n_grams(text, n)` returns,
+      including key order.
+
+    Behavior
+    - Splits `text` into `workers` shards overlapping by `n-1` characters
+      (see `shard_text`), counts them in a `ProcessPoolExecutor`, then
+      combines the partial counts with `tree_merge` on the same pool.
+    - Raises the same `TypeError`/`ValueError` as `count_char_n_grams` for
+      invalid `n`, and `ValueError` if `workers` is not positive.
+    """
+
+    if not isinstance(n, int):
+        raise TypeError("n must be an integer")
+    if n <= 0:
+        raise ValueError("n must be a positive integer")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 0:
+        raise ValueError("workers must be a positive integer")
+
+    if workers == 1 or len(text) < n * workers:
+        return count_char_n_grams(text, n)
+
+    shards = shard_text(text, n, workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        parts = list(executor.map(_count_shard, [(shard, n) for shard in shards]))
+        return tree_merge(parts, executor)
+
+
+if __name__ == "__main__":
+    sample = "KocseaKocsea" * 3
+    n = 4
+    print("Sample:", sample)
+    print("n:", n, "workers:", 2)
+    print("Counts:", count_char_n_grams_parallel(sample, n, workers=2))
@@ -0,0 +1,105 @@
+"""Streaming character n-gram counter
+
+Provides `count_char_n_grams_stream(source, n, chunk_size)`, which counts
+the same n-grams as `count_char_n_grams` but reads its input from a path or
+a text file object in fixed-size chunks. Only the n-gram table and one
+chunk are held in memory, so the corpus can be far larger than RAM.
+"""
+
+import os
+from typing import IO, Iterator, Union
+
+from count_char_n_grams import count_char_n_grams
+
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+Source = Union[str, "os.PathLike[str]", IO[str]]
+
+
+def iter_text_chunks(source: Source, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Yield the text of `source` in chunks of at most `chunk_size` characters.
+
+    Parameters
+    - source: A path (opened as UTF-8 text, like `load_text` in `main.py`)
+      or an already-open text file object.
+    - chunk_size (int): Maximum number of characters per chunk.
+    """
+
+    if not isinstance(chunk_size, int):
+        raise TypeError("chunk_size must be an integer")
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be a positive integer")
+
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "r", encoding="utf-8") as f:
+            yield from iter_text_chunks(f, chunk_size)
+        return
+
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_overlapping_chunks(source: Source, n: int, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Yield chunks of `source` that each start with the previous chunk's
+    last `n-1` characters.
+
+    Every n-gram of the full text lies entirely inside exactly one yielded
+    chunk, so counting each chunk independently and summing the results
+    gives the same counts as counting the whole text at once.
+    """
+
+    carry = ""
+    for chunk in iter_text_chunks(source, chunk_size):
+        buf = carry + chunk
+        yield buf
+        carry = buf[-(n - 1):] if n > 1 else ""
+
+
+def count_char_n_grams_stream(source: Source, n: int = 3, chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict[str, int]:
+    """Count character n-grams of a file without loading it whole.
+
+    Parameters
+    - source: A path to a UTF-8 text file, or an open text file object.
+    - n (int): The length of each n-gram. Defaults to 3.
+    - chunk_size (int): Number of characters read per chunk. Defaults to
+      1 MiB worth of characters.
+
+    Returns
+    - dict[str, int]: The same dictionary `count_char_n_grams` returns for
+      the full text, with keys in the same (first occurrence) order.
+
+    Behavior
+    - Reads `chunk_size` characters at a time and prepends the last `n-1`
+      characters of the previous chunk, so n-grams spanning a chunk
+      boundary are counted exactly once.
+    - Peak memory is the n-gram table plus one chunk, independent of the
+      size of the input.
+    - Raises the same `TypeError`/`ValueError` as `count_char_n_grams` for
+      invalid `n`.
+    """
+
+    if not isinstance(n, int):
+        raise TypeError("n must be an integer")
+    if n <= 0:
+        raise ValueError("n must be a positive integer")
+
+    counts: dict[str, int] = {}
+    for buf in iter_overlapping_chunks(source, n, chunk_size):
+        for ngram, cnt in count_char_n_grams(buf, n).items():
+            counts[ngram] = counts.get(ngram, 0) + cnt
+
+    return counts
+
+
+if __name__ == "__main__":
+    import io
+
+    sample = "KocseaKocsea"
+    n = 4
+    print("Sample:", sample)
+    print("n:", n, "chunk_size:", 5)
+    print("Counts:", count_char_n_grams_stream(io.StringIO(sample), n, chunk_size=5))
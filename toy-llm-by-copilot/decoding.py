@@ -0,0 +1,89 @@
+"""Temperature, top-k and top-p (nucleus) decoding
+
+Provides `DecodingModel`, which wraps any character model (`NGramModel`,
+`BackoffModel`, `MappedModel`, ...) so that `generation.generate` and
+`main.generate_from_model` draw through a `TruncatedSampler` instead of
+the model's plain frequency-weighted sampler.
+
+Each context's distribution is sorted, temperature-adjusted, cut and
+cumulative-summed once, the first time the context is reached, and cached
+like `NGramModel`'s own samplers; every later draw from that context is a
+single binary search, O(log k), with no re-sorting per character.
+"""
+
+import random
+from typing import Dict, Optional
+
+from sampler import TruncatedSampler, check_decoding
+
+
+class DecodingModel:
+    """A model whose `sampler(prompt)` applies decoding settings.
+
+    Parameters
+    - model: The wrapped model; needs `n`, `random_context(rng)` and
+      `next_letter_frequency(prompt)`.
+    - temperature (float): See `TruncatedSampler`. Defaults to 1.
+    - top_k (int, optional): Keep the `top_k` most frequent next characters.
+    - top_p (float, optional): Keep the most frequent next characters up to
+      this cumulative probability.
+
+    Behavior
+    - Raises `ValueError` for invalid settings.
+    - Contexts with no continuation return None, as the wrapped model does.
+    """
+
+    def __init__(
+        self,
+        model,
+        temperature: float = 1.0,
+        top_k: Optional[int] = None,
+        top_p: Optional[float] = None,
+    ) -> None:
+        check_decoding(temperature, top_k, top_p)
+        self.model = model
+        self.n = model.n
+        self.temperature = temperature
+        self.top_k = top_k
+        self.top_p = top_p
+        self._samplers: Dict[str, TruncatedSampler] = {}
+
+    def random_context(self, rng=random) -> Optional[str]:
+        return self.model.random_context(rng)
+
+    def next_letter_frequency(self, prompt: str) -> Dict[str, int]:
+        return self.model.next_letter_frequency(prompt)
+
+    def sampler(self, prompt: str) -> Optional[TruncatedSampler]:
+        sampler = self._samplers.get(prompt)
+        if sampler is not None:
+            return sampler
+        table = getattr(self.model, "table", None)
+        if isinstance(table, dict) and len(prompt) == self.n - 1:
+            dist = table.get(prompt)
+        else:
+            dist = self.model.next_letter_frequency(prompt)
+        if not dist:
+            return None
+        sampler = self._samplers[prompt] = TruncatedSampler(dist, self.temperature, self.top_k, self.top_p)
+        return sampler
+
+
+def with_decoding(model, temperature: float = 1.0, top_k: Optional[int] = None, top_p: Optional[float] = None):
+    """Return `model` unchanged for default settings, else wrapped in a
+    `DecodingModel`."""
+
+    if temperature == 1 and top_k is None and top_p is None:
+        return model
+    return DecodingModel(model, temperature, top_k, top_p)
+
+
+if __name__ == "__main__":
+    from generation import MaxChars, generate
+    from ngram_model import NGramModel
+
+    text = "Lee has a dog. Jane has a dog. Soomi has a cat."
+    model = NGramModel.from_text(text, n=3)
+    random.seed(0)
+    for settings in ({"temperature": 0}, {"temperature": 2.0}, {"top_k": 1}, {"top_p": 0.5}):
+        print(settings, repr(generate(DecodingModel(model, **settings), "Le", stop=[MaxChars(40)])))
@@ -3,24 +3,32 @@
 This module provides `generate_next_char(prompt, counts)` which uses
 `next_letter_frequency` to obtain possible next characters given a
 `prompt` (the previous n-1 characters) and an n-gram counts dictionary.
-It then returns a random next character (uniformly chosen).
+It then returns a random next character, drawn in proportion to its
+frequency, exactly as a model built from the same counts would draw it.
 """
 
-from typing import Dict
+from collections.abc import Mapping
+from typing import Union
 import random
 import string
 
+from backoff_model import BackoffModel
+from ngram_model import NGramModel
 from next_letter_frequency import next_letter_frequency
+from sampler import AliasSampler
 
 
-def generate_next_char(prompt: str, counts: Dict[str, int]) -> str:
+def generate_next_char(prompt: str, counts: Union[Mapping, NGramModel, BackoffModel]) -> str:
     """Return a randomly chosen next character following `prompt`.
 
     Parameters
     - prompt (str): The previous `n-1` characters used to look up possible
       continuations in `counts`.
     - counts (dict[str, int]): A dictionary mapping n-grams to their
-      frequencies (as returned by `count_char_n_grams`).
+      frequencies (as returned by `count_char_n_grams`), any other n-gram
+      counts mapping (such as `CompactCounts`), or a model built from
+      such counts (`NGramModel`, `BackoffModel`, or anything with
+      `sampler(prompt)` or `next_letter_frequency(prompt)`).
 
     Returns
     - str: A single character string representing the chosen next character.
@@ -30,21 +38,36 @@ def generate_next_char(prompt: str, counts: Dict[str, int]) -> str:
       candidate next characters mapped to their observed frequencies.
     - If the returned dictionary is empty, returns a random lowercase letter
       from `a` to `z`.
-    - Otherwise, selects and returns a random key from the dictionary
-      (uniform selection among possible next characters).
+    - Otherwise, draws a key weighted by its frequency, with the
+      `AliasSampler` over the sorted characters that `NGramModel.sampler`
+      builds, so a counts dict and the `NGramModel` built from it return
+      the same character for the same random state.
+    - When `counts` is a model with `sampler(prompt)` (`NGramModel`,
+      `BackoffModel`, `MappedModel`, ...), the draw comes from the model's
+      precomputed per-context sampler instead, which for an `NGramModel`
+      costs O(1) with no per-call allocation.
+    - A `BackoffModel` answers unseen prompts from the longest seen suffix,
+      so the random-letter fallback only fires if it was trained on
+      empty text.
     """
 
     if not isinstance(prompt, str):
         raise TypeError("prompt must be a string")
-    if not isinstance(counts, dict):
+    if not isinstance(counts, Mapping) and not hasattr(counts, "next_letter_frequency"):
         raise TypeError("counts must be a dict mapping n-grams to integers")
 
+    if not isinstance(counts, Mapping) and hasattr(counts, "sampler"):
+        sampler = counts.sampler(prompt)
+        if sampler is None:
+            return random.choice(string.ascii_lowercase)
+        return sampler.sample()
+
     options = next_letter_frequency(prompt, counts)
 
     if not options:
         return random.choice(string.ascii_lowercase)
 
-    return random.choice(list(options.keys()))
+    return AliasSampler({ch: options[ch] for ch in sorted(options)}).sample()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,203 @@
+"""Linear-time generation engine
+
+Provides `iter_generate(model, ...)`, a generator that yields characters as
+they are produced, and `generate(model, ...)`, which joins them. Unlike a
+loop that grows `result += ch` and re-inspects the whole output to decide
+when to stop, every step here costs O(1) in the output length:
+
+- the sliding prompt lives in a `deque(maxlen=n-1)` ring buffer,
+- output is collected in a list and joined once,
+- stop conditions see one character at a time and keep their own state:
+  `MaxChars`, `MaxWords`, `SentenceEnd` and `StopString` (a KMP automaton
+  with a precomputed transition table).
+"""
+
+from collections import deque
+import random
+import string
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+FALLBACK_CHARS = string.ascii_lowercase
+SENTENCE_ENDS = ".!?"
+
+
+class MaxChars:
+    """Stop once `limit` characters have been produced."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.count = 0
+
+    def reset(self) -> None:
+        self.count = 0
+
+    def update(self, ch: str) -> bool:
+        self.count += 1
+        return self.count >= self.limit
+
+
+class MaxWords:
+    """Stop once `limit` whitespace-separated words have been completed
+    (the character ending the last word is the last one produced)."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.reset()
+
+    def reset(self) -> None:
+        self.words = 0
+        self._in_word = False
+
+    def update(self, ch: str) -> bool:
+        if ch.isspace():
+            if self._in_word:
+                self._in_word = False
+                self.words += 1
+                return self.words >= self.limit
+        else:
+            self._in_word = True
+        return False
+
+
+class SentenceEnd:
+    """Stop after `count` sentence-ending characters (`.`, `!`, `?`)."""
+
+    def __init__(self, count: int = 1, ends: str = SENTENCE_ENDS) -> None:
+        self.limit = count
+        self.ends = frozenset(ends)
+        self.count = 0
+
+    def reset(self) -> None:
+        self.count = 0
+
+    def update(self, ch: str) -> bool:
+        if ch in self.ends:
+            self.count += 1
+            return self.count >= self.limit
+        return False
+
+
+class StopString:
+    """Stop as soon as the output ends with `text`.
+
+    The KMP failure function is expanded into a transition table
+    (`state -> {char: next state}`, only for characters of `text`), so each
+    character is one dict lookup; characters not in `text` reset to 0.
+    """
+
+    def __init__(self, text: str) -> None:
+        if not text:
+            raise ValueError("stop string must not be empty")
+        self.text = text
+        failure = [0] * len(text)
+        k = 0
+        for i in range(1, len(text)):
+            while k and text[i] != text[k]:
+                k = failure[k - 1]
+            if text[i] == text[k]:
+                k += 1
+            failure[i] = k
+        self._table: List[Dict[str, int]] = []
+        for state in range(len(text)):
+            row = dict(self._table[failure[state - 1]]) if state else {}
+            row[text[state]] = state + 1
+            self._table.append(row)
+        self.state = 0
+
+    def reset(self) -> None:
+        self.state = 0
+
+    def update(self, ch: str) -> bool:
+        self.state = self._table[self.state].get(ch, 0)
+        return self.state == len(self.text)
+
+
+def iter_generate(
+    model,
+    prompt: Optional[str] = None,
+    stop: Iterable = (),
+    rng=random,
+    stats: Optional[Dict[str, int]] = None,
+) -> Iterator[str]:
+    """Yield generated characters one at a time.
+
+    Parameters
+    - model: Any model with `n`, `random_context(rng)` and `sampler(prompt)`.
+    - prompt (str, optional): The starting text; its last `n-1` characters
+      are the first context. Defaults to a context drawn from the model (or
+      random letters for an empty model).
+    - stop: Stop conditions, each with `reset()` and `update(ch) -> bool`;
+      generation ends after the first character any of them accepts.
+      Without any, the generator is infinite.
+    - rng: Source of randomness (`random` module or `random.Random`).
+    - stats (dict, optional): Receives `generated_chars` (sampled after the
+      prompt) and `fallbacks` (random letters for unseen contexts), kept up
+      to date as characters are yielded.
+
+    Behavior
+    - The prompt's characters are yielded first and count towards the stop
+      conditions, like the output of `main.generate_from_model`.
+    """
+
+    n = model.n
+    if prompt is None:
+        prompt = model.random_context(rng)
+        if prompt is None:
+            prompt = "".join(rng.choice(FALLBACK_CHARS) for _ in range(n - 1))
+    stop = list(stop)
+    for condition in stop:
+        condition.reset()
+    if stats is None:
+        stats = {}
+    stats["generated_chars"] = stats["fallbacks"] = 0
+
+    window = deque(prompt[-(n - 1):] if n > 1 else "", maxlen=max(n - 1, 0))
+    for ch in prompt:
+        yield ch
+        # a list, not a generator: every condition must see every character
+        if any([condition.update(ch) for condition in stop]):
+            return
+
+    sampler_for = model.sampler
+    while True:
+        sampler = sampler_for("".join(window))
+        if sampler is not None:
+            ch = sampler.sample(rng)
+        else:
+            ch = rng.choice(FALLBACK_CHARS)
+            stats["fallbacks"] += 1
+        stats["generated_chars"] += 1
+        if n > 1:
+            window.append(ch)
+        yield ch
+        if any([condition.update(ch) for condition in stop]):
+            return
+
+
+def generate(
+    model,
+    prompt: Optional[str] = None,
+    stop: Iterable = (),
+    rng=random,
+    stats: Optional[Dict[str, int]] = None,
+) -> str:
+    """Return the text `iter_generate` produces; `stop` must not be empty."""
+
+    stop = list(stop)
+    if not stop:
+        raise ValueError("generate needs at least one stop condition")
+    return "".join(iter_generate(model, prompt, stop, rng=rng, stats=stats))
+
+
+if __name__ == "__main__":
+    from ngram_model import NGramModel
+
+    text = "Lee has a dog. Jane has a dog. Soomi has a cat."
+    model = NGramModel.from_text(text, n=4)
+    random.seed(0)
+    print(repr(generate(model, "Lee", stop=[SentenceEnd(2), MaxChars(200)])))
+    print(repr(generate(model, stop=[StopString("cat"), MaxWords(30)])))
+    for ch in iter_generate(model, "Jan", stop=[MaxWords(3)]):
+        print(ch, end="", flush=True)
+    print()
@@ -6,13 +6,28 @@ by repeatedly sampling next characters using `generate_next_char`.
 """
 
 import argparse
+import io
 import os
 import random
-from typing import Optional
+import shutil
+import sys
+import tempfile
+from typing import Dict, Iterable, Optional
 
+from backoff_model import BackoffModel
 from count_char_n_grams import count_char_n_grams
+from count_char_n_grams_parallel import count_char_n_grams_parallel
+from count_char_n_grams_stream import DEFAULT_CHUNK_SIZE, count_char_n_grams_stream
+from decoding import with_decoding
 from generate_next_char import generate_next_char
-from next_letter_frequency import next_letter_frequency
+from generation import MaxChars, MaxWords, SentenceEnd, StopString, generate
+from model_io import load_model, save_model
+from ngram_model import NGramModel
+from profiler import Profiler, unique_ngrams
+from sketch_model import SketchModel, parse_memory_budget
+from tokenizer import NORMALIZATIONS
+from training_cache import DEFAULT_MAX_BYTES, TrainingCache, cache_key, corpus_digest, file_digest
+from word_model import WordModel
 
 
 SAMPLE_TEXT = (
@@ -38,41 +53,158 @@ def load_text(path: Optional[str]) -> str:
     return SAMPLE_TEXT
 
 
-def generate_text(text: str, n: int = 4, min_len: int = 40, max_len: int = 60) -> str:
-    counts = count_char_n_grams(text, n)
+BACKENDS = ("python", "numpy", "bytes")
 
-    # Determine starting prompt (n-1 chars)
-    prompt = ""
-    if counts:
-        # pick a random starting n-gram weighted by frequency
-        start_ngram = random.choices(list(counts.keys()), weights=list(counts.values()), k=1)[0]
-        prompt = start_ngram[: n - 1]
-    else:
+
+def count_n_grams(text: str, n: int = 4, workers: int = 1, backend: str = "python") -> Dict[str, int]:
+    """Count the n-grams of `text` with the selected backend.
+
+    `backend="python"` uses `count_char_n_grams` (in `workers` processes
+    when `workers > 1`); `backend="numpy"` uses the vectorized
+    `count_char_n_grams_numpy`, and `backend="bytes"` counts the UTF-8
+    encoding with `count_char_n_grams_bytes`; both are imported only when
+    requested. When their packed codes cannot hold the n-grams
+    (`len(vocab) ** n` over 64 bits), the text is counted with the python
+    backend instead, with a note on stderr.
+    """
+
+    if backend in ("numpy", "bytes"):
+        from count_char_n_grams_numpy import packed_codes_fit
+
+        vocab_size = len(set(text))
+        if not packed_codes_fit(vocab_size, n):
+            print(
+                f"{n}-grams over {vocab_size} characters do not fit in 64-bit codes; counting with --backend python",
+                file=sys.stderr,
+            )
+            backend = "python"
+    if backend == "numpy":
+        from count_char_n_grams_numpy import count_char_n_grams_numpy
+
+        return count_char_n_grams_numpy(text, n)
+    if backend == "bytes":
+        from count_char_n_grams_bytes import count_char_n_grams_bytes
+
+        return count_char_n_grams_bytes(text.encode("utf-8"), n)
+    if backend != "python":
+        raise ValueError(f"unknown backend: {backend!r}")
+    if workers > 1:
+        return count_char_n_grams_parallel(text, n, workers=workers)
+    return count_char_n_grams(text, n)
+
+
+def count_file_n_grams(path: str, n: int = 4) -> Dict[str, int]:
+    """Count the n-grams of the UTF-8 file at `path` with
+    `count_char_n_grams_bytes`, which memory-maps it instead of decoding it
+    to a `str` (imported only when used)."""
+
+    from count_char_n_grams_bytes import count_char_n_grams_bytes
+
+    return count_char_n_grams_bytes(path, n)
+
+
+def train_model(
+    text: str,
+    n: int = 4,
+    workers: int = 1,
+    backend: str = "python",
+    backoff: bool = False,
+    suffix_array: bool = False,
+):
+    """Count the n-grams of `text` and index them for generation.
+
+    With `suffix_array=True`, `n` is ignored and the whole corpus is indexed
+    for longest-match prediction instead.
+    """
+
+    if suffix_array:
+        from suffix_array_model import SuffixArrayModel
+
+        return SuffixArrayModel.from_text(text)
+    if backoff:
+        # one pass counts orders 1..n; unseen contexts back off to shorter ones
+        return BackoffModel.from_text(text, n)
+    # index contexts once so each step is a dict lookup, not a scan of counts
+    return NGramModel.from_counts(count_n_grams(text, n, workers=workers, backend=backend), n, tail=text)
+
+
+def generate_text(
+    text: str,
+    n: int = 4,
+    min_len: int = 40,
+    max_len: int = 60,
+    workers: int = 1,
+    backend: str = "python",
+    backoff: bool = False,
+    temperature: float = 1.0,
+    top_k: Optional[int] = None,
+    top_p: Optional[float] = None,
+) -> str:
+    """Train on `text` and generate `min_len..max_len` characters.
+
+    `temperature`, `top_k` and `top_p` select the decoding mode (see
+    `decoding.DecodingModel`); the defaults sample by plain frequency.
+    """
+
+    model = train_model(text, n, workers=workers, backend=backend, backoff=backoff)
+    model = with_decoding(model, temperature, top_k, top_p)
+    return generate_from_model(model, min_len=min_len, max_len=max_len)
+
+
+def generate_from_counts(counts: Dict[str, int], n: int = 4, min_len: int = 40, max_len: int = 60) -> str:
+    model = NGramModel.from_counts(counts, n)
+    return generate_from_model(model, min_len=min_len, max_len=max_len)
+
+
+def generate_from_model(
+    model,
+    min_len: int = 40,
+    max_len: int = 60,
+    stats: Optional[Dict[str, int]] = None,
+    stop: Iterable = (),
+) -> str:
+    """Generate text from any model exposing `n`, `random_context()` and
+    `sampler(prompt)` (`NGramModel`, `BackoffModel`, `MappedModel`,
+    `SuffixArrayModel`, `SketchModel`).
+
+    Generation ends at a length drawn from `min_len..max_len`, or earlier
+    when one of the extra `stop` conditions (see `generation`) fires.
+
+    When a `stats` dict is given, it receives `generated_chars` (characters
+    sampled after the starting context) and `fallbacks` (how many of them
+    were random letters because the context was never seen).
+    """
+
+    n = model.n
+
+    # Determine starting prompt (n-1 chars), weighted by frequency
+    prompt = model.random_context()
+    if prompt is None:
         # fallback to random letters
         prompt = "".join(random.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(n - 1))
 
     target_len = random.randint(min_len, max_len)
-    result = prompt
-
-    while len(result) < target_len:
-        # Prefer weighted selection from observed continuations
-        options = next_letter_frequency(prompt, counts)
-        if options:
-            chars = list(options.keys())
-            weights = [options[c] for c in chars]
-            next_ch = random.choices(chars, weights=weights, k=1)[0]
-        else:
-            # fallback to random lowercase letter
-            next_ch = random.choice("abcdefghijklmnopqrstuvwxyz")
+    if target_len <= 0:
+        return ""
+    # ring-buffer context and list output: linear in target_len
+    return generate(model, prompt, stop=[MaxChars(target_len), *stop], stats=stats)
+
+
+def generate_samples(model_path: str, num_samples: int, **kwargs) -> list:
+    """`parallel_generate.parallel_generate`, imported only when used
+    (it needs NumPy)."""
+
+    from parallel_generate import parallel_generate
+
+    return parallel_generate(model_path, num_samples, **kwargs)
 
-        result += next_ch
-        # slide window
-        if n - 1 > 0:
-            prompt = (prompt + next_ch)[- (n - 1) :]
-        else:
-            prompt = ""
 
-    return result[:target_len]
+def format_samples(samples: list) -> str:
+    """Join `samples` for output, each under a `--- sample i ---` header
+    (numbered from 1): samples may themselves contain newlines and blank
+    lines, so no plain separator can mark where one ends."""
+
+    return "\n".join(f"--- sample {i} ---\n{sample}" for i, sample in enumerate(samples, 1))
 
 
 def main() -> None:
@@ -83,13 +215,260 @@ def main() -> None:
     parser.add_argument("--max", type=int, default=60, help="Maximum generated length (default: 60)")
     parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible output")
     parser.add_argument("--out", "-o", help="Write generated text to this file (optional)")
+    parser.add_argument("--stream", action="store_true", help="Count --file in chunks instead of reading it whole")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Characters per chunk with --stream")
+    parser.add_argument("--workers", type=int, default=1, help="Count n-grams in this many processes (default: 1)")
+    parser.add_argument("--backend", choices=BACKENDS, default="python", help="n-gram counting backend (default: python)")
+    parser.add_argument("--backoff", action="store_true", help="Back off to shorter contexts instead of random letters")
+    parser.add_argument(
+        "--suffix-array", action="store_true", help="Match the longest seen context of any length (ignores --n)"
+    )
+    parser.add_argument("--model", "-m", help="Generate from a model file written by --save-model instead of training")
+    parser.add_argument("--save-model", help="Write the trained model to this file")
+    parser.add_argument(
+        "--memory-budget",
+        type=parse_memory_budget,
+        help="Train an approximate model within this much memory, e.g. 256MB (count-min sketch + top-K per context)",
+    )
+    parser.add_argument(
+        "--words", action="store_true", help="Generate words instead of characters (--n, --min and --max count words)"
+    )
+    parser.add_argument(
+        "--normalize", choices=NORMALIZATIONS, default="lower", help="Word normalization with --words (default: lower)"
+    )
+    parser.add_argument("--max-words", type=int, help="Also stop after this many words")
+    parser.add_argument("--sentences", type=int, help="Also stop after this many sentences (. ! ?)")
+    parser.add_argument("--stop", help="Also stop as soon as the output ends with this string")
+    parser.add_argument(
+        "--temperature", type=float, default=1.0, help="Sharpen (<1) or flatten (>1) next-char odds; 0 is greedy"
+    )
+    parser.add_argument("--top-k", type=int, help="Sample only from the K most frequent next characters")
+    parser.add_argument("--top-p", type=float, help="Sample only from the most frequent next characters up to this mass")
+    parser.add_argument(
+        "--samples", type=int, help="Generate this many samples, each with its own random stream derived from --seed"
+    )
+    parser.add_argument(
+        "--sample-workers", type=int, default=1, help="Generate --samples in this many processes (default: 1)"
+    )
+    parser.add_argument(
+        "--cache-dir", help="Reuse models trained on the same corpus and n from here (default: ~/.cache/toy-llm)"
+    )
+    parser.add_argument(
+        "--cache-max-bytes",
+        type=parse_memory_budget,
+        default=DEFAULT_MAX_BYTES,
+        help="Evict least recently used cached models beyond this size, e.g. 500MB (default: 1GB)",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Always train, and do not store the model")
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="-",
+        metavar="PATH",
+        help="Write per-stage timings and memory as JSON to PATH (default: stderr)",
+    )
     args = parser.parse_args()
 
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.stream and args.workers > 1:
+        parser.error("--workers cannot be combined with --stream")
+    if args.backend != "python" and (args.stream or args.workers > 1):
+        parser.error("--stream and --workers require --backend python")
+    if args.backoff and (args.stream or args.workers > 1 or args.backend != "python"):
+        parser.error("--backoff cannot be combined with --stream, --workers or --backend")
+    if args.suffix_array and (args.stream or args.workers > 1 or args.backend != "python" or args.backoff):
+        parser.error("--suffix-array cannot be combined with --stream, --workers, --backend or --backoff")
+    if args.model and (args.file or args.stream or args.save_model or args.backoff or args.suffix_array):
+        parser.error("--model cannot be combined with training options")
+    if args.save_model and args.backoff:
+        parser.error("--save-model does not support --backoff models")
+    if args.memory_budget and (
+        args.model or args.save_model or args.workers > 1 or args.backend != "python" or args.backoff or args.suffix_array
+    ):
+        parser.error("--memory-budget can only be combined with --file, --stream and --chunk-size")
+    if args.words and (
+        args.model
+        or args.save_model
+        or args.workers > 1
+        or args.backend != "python"
+        or args.backoff
+        or args.suffix_array
+        or args.memory_budget
+    ):
+        parser.error("--words can only be combined with --file, --stream, --chunk-size and --normalize")
+    if args.words and (args.max_words or args.sentences or args.stop):
+        parser.error("--max-words, --sentences and --stop apply to character generation only")
+    if args.stop == "":
+        parser.error("--stop must not be empty")
+    if args.samples is not None and args.samples < 1:
+        parser.error("--samples must be at least 1")
+    if args.sample_workers < 1:
+        parser.error("--sample-workers must be at least 1")
+    if args.sample_workers > 1 and args.samples is None:
+        parser.error("--sample-workers requires --samples")
+    if args.samples and (args.words or args.backoff or args.memory_budget):
+        parser.error("--samples cannot be combined with --words, --backoff or --memory-budget")
+    if args.words and (args.temperature != 1 or args.top_k is not None or args.top_p is not None):
+        parser.error("--temperature, --top-k and --top-p apply to character generation only")
+    if args.temperature < 0:
+        parser.error("--temperature must be non-negative")
+    if args.top_k is not None and args.top_k < 1:
+        parser.error("--top-k must be at least 1")
+    if args.top_p is not None and not 0 < args.top_p <= 1:
+        parser.error("--top-p must be in (0, 1]")
+
     if args.seed is not None:
         random.seed(args.seed)
 
-    text = load_text(args.file)
-    generated = generate_text(text, n=args.n, min_len=args.min, max_len=args.max)
+    profiler = Profiler(enabled=args.profile is not None)
+    text = None
+    # only models with a model_io file format are cached
+    cache = cache_key_ = cached_path = None
+    if not (args.no_cache or args.words or args.model or args.memory_budget or args.backoff):
+        cache = TrainingCache(args.cache_dir, args.cache_max_bytes)
+    model = None
+    if args.words:
+        if args.stream and not args.file:
+            parser.error("--stream requires --file")
+        if args.stream:
+            if not os.path.exists(args.file):
+                raise FileNotFoundError(f"Input file not found: {args.file}")
+            with profiler.stage("train"):
+                model = WordModel.from_stream(args.file, args.n, normalize=args.normalize, chunk_size=args.chunk_size)
+        else:
+            with profiler.stage("load"):
+                text = load_text(args.file)
+            with profiler.stage("train"):
+                model = WordModel.from_text(text, args.n, normalize=args.normalize)
+    elif args.model:
+        with profiler.stage("load"):
+            model = load_model(args.model)
+    elif args.memory_budget:
+        if args.stream and not args.file:
+            parser.error("--stream requires --file")
+        if args.stream:
+            if not os.path.exists(args.file):
+                raise FileNotFoundError(f"Input file not found: {args.file}")
+            source = args.file
+        else:
+            with profiler.stage("load"):
+                text = load_text(args.file)
+            source = io.StringIO(text)
+        with profiler.stage("train"):
+            model = SketchModel.from_stream(source, args.n, memory_budget=args.memory_budget, chunk_size=args.chunk_size)
+        bounds = model.error_bounds()
+        print(
+            f"Sketch: {len(model)} contexts kept of {bounds['total']} n-grams; "
+            f"counts overestimate by at most {bounds['sketch_max_error']:.1f} "
+            f"(probability {1 - bounds['sketch_delta']:.3f}), "
+            f"contexts by {bounds['context_max_error']}, next chars by {bounds['next_char_max_error']}"
+        )
+    elif args.stream:
+        if not args.file:
+            parser.error("--stream requires --file")
+        if not os.path.exists(args.file):
+            raise FileNotFoundError(f"Input file not found: {args.file}")
+        if cache is not None:
+            with profiler.stage("hash"):
+                cache_key_ = cache_key(corpus_digest(source=args.file, chunk_size=args.chunk_size), args.n)
+            with profiler.stage("cache_lookup"):
+                model = cache.get(cache_key_)
+        if model is None:
+            with profiler.stage("count"):
+                counts = count_char_n_grams_stream(args.file, args.n, chunk_size=args.chunk_size)
+            with profiler.stage("index"):
+                model = NGramModel.from_counts(counts, args.n)
+    elif args.backend == "bytes" and args.file:
+        # counted straight from the mapped file: never decoded to a str
+        if not os.path.exists(args.file):
+            raise FileNotFoundError(f"Input file not found: {args.file}")
+        if cache is not None:
+            with profiler.stage("hash"):
+                cache_key_ = cache_key(file_digest(args.file), args.n)
+            with profiler.stage("cache_lookup"):
+                model = cache.get(cache_key_)
+        if model is None:
+            with profiler.stage("count"):
+                try:
+                    counts = count_file_n_grams(args.file, args.n)
+                except ValueError as exc:
+                    parser.error(f"--backend bytes: {exc}")
+            with profiler.stage("index"):
+                model = NGramModel.from_counts(counts, args.n)
+    else:
+        with profiler.stage("load"):
+            text = load_text(args.file)
+        if cache is not None:
+            kind = "suffix-array" if args.suffix_array else "chars"
+            with profiler.stage("hash"):
+                cache_key_ = cache_key(corpus_digest(text), 0 if args.suffix_array else args.n, kind)
+            with profiler.stage("cache_lookup"):
+                model = cache.get(cache_key_)
+        if model is None and (args.backoff or args.suffix_array):
+            with profiler.stage("train"):
+                model = train_model(text, n=args.n, backoff=args.backoff, suffix_array=args.suffix_array)
+        elif model is None:
+            # the two steps of train_model, timed separately
+            with profiler.stage("count"):
+                counts = count_n_grams(text, args.n, workers=args.workers, backend=args.backend)
+            with profiler.stage("index"):
+                model = NGramModel.from_counts(counts, args.n, tail=text)
+
+    if cache is not None:
+        if cache.hits:
+            cached_path = cache.path(cache_key_)
+            print(f"Training cache hit: {cached_path}", file=sys.stderr)
+        else:
+            with profiler.stage("cache_store"):
+                cached_path = cache.put(cache_key_, model)
+                # generate from the mapped file, exactly as a later hit will
+                model = load_model(cached_path)
+            print(f"Training cache miss, model stored: {cached_path}", file=sys.stderr)
+
+    if args.save_model:
+        with profiler.stage("save"):
+            if cached_path is not None:
+                shutil.copyfile(cached_path, args.save_model)
+            else:
+                save_model(model, args.save_model)
+        print(f"Model written to: {args.save_model}")
+
+    stop = []
+    if args.max_words:
+        stop.append(MaxWords(args.max_words))
+    if args.sentences:
+        stop.append(SentenceEnd(args.sentences))
+    if args.stop:
+        stop.append(StopString(args.stop))
+    stats: Dict[str, int] = {}
+    with profiler.stage("generate"):
+        if args.words:
+            generated = model.generate(args.min, args.max)
+        elif args.samples:
+            # workers map the model file instead of receiving the model
+            with tempfile.TemporaryDirectory() as tmp:
+                model_path = args.model or cached_path or args.save_model
+                if model_path is None:
+                    model_path = os.path.join(tmp, "model.tllm")
+                    save_model(model, model_path)
+                samples = generate_samples(
+                    model_path,
+                    args.samples,
+                    min_len=args.min,
+                    max_len=args.max,
+                    seed=args.seed,
+                    workers=args.sample_workers,
+                    stop=stop,
+                    temperature=args.temperature,
+                    top_k=args.top_k,
+                    top_p=args.top_p,
+                )
+            generated = format_samples(samples)
+            stats["generated_chars"] = sum(len(sample) for sample in samples)
+        else:
+            decoder = with_decoding(model, args.temperature, args.top_k, args.top_p)
+            generated = generate_from_model(decoder, min_len=args.min, max_len=args.max, stats=stats, stop=stop)
 
     if args.out:
         with open(args.out, "w", encoding="utf-8") as f:
@@ -98,6 +477,21 @@ def main() -> None:
     else:
         print(generated)
 
+    if args.profile is not None:
+        seconds = profiler.seconds("generate")
+        produced = stats.get("generated_chars", len(generated))
+        profiler.metrics.update(
+            n=model.n,
+            corpus_chars=len(text) if text is not None else None,
+            unique_ngrams=unique_ngrams(model),
+            generated_chars=produced,
+            chars_per_second=round(produced / seconds, 1) if seconds else None,
+            fallbacks=stats.get("fallbacks"),
+            fallback_rate=round(stats["fallbacks"] / produced, 6) if "fallbacks" in stats and produced else None,
+            training_cache=None if cache is None else ("hit" if cache.hits else "miss"),
+        )
+        profiler.write(args.profile)
+
 
 if __name__ == "__main__":
     main()
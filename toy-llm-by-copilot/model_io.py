@@ -0,0 +1,387 @@
+"""Persisted, memory-mappable n-gram model files
+
+Provides `save_model(model, path)` and `load_model(path)`. The file holds
+the trained counts in a flat binary layout that `load_model` maps straight
+into memory with `mmap`: there is no parse step, loading takes
+milliseconds whatever the model size, and processes that load the same file
+share one page-cached copy.
+
+File layout (all arrays in the byte order recorded in the header):
+
+    header          32 bytes: magic b"TLLM", version (u16), flags (u16),
+                    n (u32), number of contexts C (u64), entries E (u64),
+                    4 bytes padding
+    offsets         (C + 1) x u64: entries of context i are
+                    offsets[i]..offsets[i+1]-1
+    cumulative      E x u64: running total of the entry counts, in entry
+                    order (a count is the difference of neighbours)
+    next chars      E x u32: code point of each entry's next character
+    contexts        C x (n-1) x 4 bytes: contexts as UTF-32-BE, sorted
+
+Contexts are sorted, and next characters are sorted within each context, so
+saving the same counts always produces the same bytes. UTF-32-BE keeps the
+byte order of the context keys equal to their string order, which lets
+lookups binary-search the raw bytes.
+"""
+
+from array import array
+from bisect import bisect_right
+from collections.abc import Mapping
+import mmap
+import os
+import random
+import shutil
+import struct
+import sys
+import tempfile
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from ngram_model import NGramModel
+from sampler import AliasSampler
+
+
+MAGIC = b"TLLM"
+VERSION = 1
+FLAG_BIG_ENDIAN = 1
+HEADER = struct.Struct("<4sHHIQQ4x")
+
+
+def iter_sorted_entries(model: NGramModel) -> Iterator[Tuple[str, str, int]]:
+    """Yield `(context, next_char, count)` in file order."""
+
+    for context in sorted(model.table):
+        dist = model.table[context]
+        for ch in sorted(dist):
+            yield context, ch, dist[ch]
+
+
+def write_model_file(f, n: int, entries: Iterable[Tuple[str, str, int]]) -> None:
+    """Write a model file to the binary file object `f`.
+
+    `entries` must yield `(context, next_char, count)` sorted by context
+    and then by next character, with `len(context) == n - 1`.
+    """
+
+    offsets = array("Q", [0])
+    cumulative = array("Q")
+    next_chars = array("I")
+    contexts = bytearray()
+    running = 0
+    previous = None
+    for context, ch, cnt in entries:
+        if context != previous:
+            if previous is not None:
+                offsets.append(len(next_chars))
+            contexts += context.encode("utf-32-be")
+            previous = context
+        running += cnt
+        cumulative.append(running)
+        next_chars.append(ord(ch))
+    if previous is not None:
+        offsets.append(len(next_chars))
+
+    flags = FLAG_BIG_ENDIAN if sys.byteorder == "big" else 0
+    f.write(HEADER.pack(MAGIC, VERSION, flags, n, len(offsets) - 1, len(next_chars)))
+    f.write(offsets.tobytes())
+    f.write(cumulative.tobytes())
+    f.write(next_chars.tobytes())
+    f.write(bytes(contexts))
+
+
+def write_model_file_bounded(
+    f, n: int, entries: Iterable[Tuple[str, str, int]], buffer_entries: int = 1 << 16, tmp_dir: Optional[str] = None
+) -> None:
+    """Like `write_model_file`, in bounded memory.
+
+    The header needs the number of contexts and entries before any array,
+    so the four arrays are appended to temporary files (in `tmp_dir`) in
+    batches of at most `buffer_entries` entries, then copied after the
+    header. The bytes written are identical to `write_model_file`.
+    """
+
+    if buffer_entries <= 0:
+        raise ValueError("buffer_entries must be a positive integer")
+    sections = [tempfile.TemporaryFile(dir=tmp_dir) for _ in range(4)]
+    try:
+        offsets, cumulative, next_chars, contexts = array("Q", [0]), array("Q"), array("I"), bytearray()
+        num_contexts = num_entries = running = 0
+        previous = None
+
+        def flush() -> None:
+            for section, data in zip(sections, (offsets, cumulative, next_chars, contexts)):
+                section.write(data if isinstance(data, bytearray) else data.tobytes())
+                del data[:]
+
+        for context, ch, cnt in entries:
+            if context != previous:
+                if previous is not None:
+                    offsets.append(num_entries)
+                contexts += context.encode("utf-32-be")
+                num_contexts += 1
+                previous = context
+            running += cnt
+            cumulative.append(running)
+            next_chars.append(ord(ch))
+            num_entries += 1
+            if len(next_chars) >= buffer_entries:
+                flush()
+        if previous is not None:
+            offsets.append(num_entries)
+        flush()
+
+        flags = FLAG_BIG_ENDIAN if sys.byteorder == "big" else 0
+        f.write(HEADER.pack(MAGIC, VERSION, flags, n, num_contexts, num_entries))
+        for section in sections:
+            section.seek(0)
+            shutil.copyfileobj(section, f)
+    finally:
+        for section in sections:
+            section.close()
+
+
+def save_model(model: Union[NGramModel, Dict[str, int]], path: str) -> None:
+    """Write `model` (or an n-gram counts dict) to `path`.
+
+    Parameters
+    - model (NGramModel | dict[str, int]): The trained model, or the output
+      of `count_char_n_grams` (any n-gram counts mapping, such as
+      `CompactCounts`). Models with their own `save(path)` method
+      (`SuffixArrayModel`) write their own format.
+    - path (str): Destination file; overwritten if it exists.
+    """
+
+    if isinstance(model, Mapping):
+        model = NGramModel.from_counts(model)
+    if hasattr(model, "save"):
+        # models with their own index format (e.g. SuffixArrayModel)
+        model.save(path)
+        return
+    if not isinstance(model, NGramModel):
+        raise TypeError("model must be an NGramModel or a dict of n-gram counts")
+    with open(path, "wb") as f:
+        write_model_file(f, model.n, iter_sorted_entries(model))
+
+
+class MappedModel:
+    """A model file mapped into memory; a read-only `NGramModel` stand-in.
+
+    Parameters
+    - path (str): A file written by `save_model`.
+
+    Behavior
+    - Lookups binary-search the sorted contexts in the mapped file, so each
+      costs O(log C) with no up-front parse.
+    - Provides `n`, `len()`, `in`, `next_letter_frequency`, `sampler` and
+      `random_context` with the same meaning as on `NGramModel`, and draws
+      exactly what the `NGramModel` the file was saved from draws for the
+      same `rng`: `random_context` bisects the mapped cumulative counts
+      (contexts in sorted order), and `sampler` builds the same
+      `AliasSampler`, from the mapped counts of the prompt.
+    - `num_entries` is the number of distinct n-grams, from the header.
+    - Raises `ValueError` for files that are not model files or were
+      written by an unsupported version.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER.size:
+                raise ValueError(f"{path} is not a model file")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, flags, n, num_contexts, num_entries = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} is not a model file")
+        if version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} has unsupported model file version {version}")
+
+        self.n = n
+        self.num_entries = num_entries
+        self._num_contexts = num_contexts
+        self._width = 4 * (n - 1)
+        expected = HEADER.size + 8 * (num_contexts + 1) + 12 * num_entries + num_contexts * self._width
+        if n < 1 or expected != size:
+            self._mm.close()
+            raise ValueError(f"{path} is truncated or corrupt")
+        view = memoryview(self._mm)
+        self._views = [view]
+        pos = HEADER.size
+        sections = []
+        for length, fmt in ((num_contexts + 1, "Q"), (num_entries, "Q"), (num_entries, "I")):
+            nbytes = length * struct.calcsize(fmt)
+            section = view[pos:pos + nbytes]
+            if (flags & FLAG_BIG_ENDIAN) != (sys.byteorder == "big"):
+                # foreign byte order: pay for one copy instead of failing
+                swapped = array(fmt, section.tobytes())
+                swapped.byteswap()
+                sections.append(swapped)
+            else:
+                section = section.cast(fmt)
+                self._views.append(section)
+                sections.append(section)
+            pos += nbytes
+        self._offsets, self._cumulative, self._next_chars = sections
+        self._contexts_at = pos
+        self._samplers: Dict[str, AliasSampler] = {}
+
+    def close(self) -> None:
+        self._samplers.clear()
+        self._offsets = self._cumulative = self._next_chars = None
+        # the mapping can only be closed once no views export it
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mm.close()
+
+    def __enter__(self) -> "MappedModel":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._num_contexts
+
+    def __contains__(self, context: object) -> bool:
+        return isinstance(context, str) and self._find(context) is not None
+
+    def _context_key(self, i: int) -> bytes:
+        start = self._contexts_at + i * self._width
+        return self._mm[start:start + self._width]
+
+    def context(self, i: int) -> str:
+        """Return the `i`-th context in sorted order."""
+
+        return self._context_key(i).decode("utf-32-be")
+
+    def _lower_bound(self, key: bytes, lo: int = 0) -> int:
+        # first context index whose leading len(key) bytes are >= key
+        hi = self._num_contexts
+        width = len(key)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = self._contexts_at + mid * self._width
+            if self._mm[start:start + width] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _prefix_range(self, prompt: str) -> Tuple[int, int]:
+        key = prompt.encode("utf-32-be")
+        lo = self._lower_bound(key)
+        if not key:
+            return lo, self._num_contexts
+        # bump the last code point to get the first key past the prefix
+        last = int.from_bytes(key[-4:], "big") + 1
+        return lo, self._lower_bound(key[:-4] + last.to_bytes(4, "big"), lo)
+
+    def _find(self, context: str) -> Optional[int]:
+        if len(context) != self.n - 1:
+            return None
+        key = context.encode("utf-32-be")
+        i = self._lower_bound(key)
+        if i < self._num_contexts and self._context_key(i) == key:
+            return i
+        return None
+
+    def _count(self, entry: int) -> int:
+        return self._cumulative[entry] - (self._cumulative[entry - 1] if entry else 0)
+
+    def next_letter_frequency(self, prompt: str) -> Dict[str, int]:
+        """Return the next-character frequencies following `prompt`, with
+        the same semantics as `NGramModel.next_letter_frequency`."""
+
+        plen = len(prompt)
+        if plen >= self.n:
+            return {}
+        lo, hi = self._prefix_range(prompt)
+        next_freq: Dict[str, int] = {}
+        for i in range(lo, hi):
+            first, last = self._offsets[i], self._offsets[i + 1]
+            if plen == self.n - 1 or plen == 0:
+                for entry in range(first, last):
+                    ch = chr(self._next_chars[entry])
+                    next_freq[ch] = next_freq.get(ch, 0) + self._count(entry)
+            else:
+                ch = self.context(i)[plen]
+                total = self._cumulative[last - 1] - (self._cumulative[first - 1] if first else 0)
+                next_freq[ch] = next_freq.get(ch, 0) + total
+        return next_freq
+
+    def sampler(self, prompt: str) -> Optional[AliasSampler]:
+        """Return a cached sampler over the continuations of `prompt`, or
+        None if it has none."""
+
+        sampler = self._samplers.get(prompt)
+        if sampler is not None:
+            return sampler
+        if len(prompt) == self.n - 1:
+            i = self._find(prompt)
+            if i is None:
+                return None
+            # entries are stored in character order
+            entries = range(self._offsets[i], self._offsets[i + 1])
+            dist = {chr(self._next_chars[entry]): self._count(entry) for entry in entries}
+        else:
+            dist = self.next_letter_frequency(prompt)
+            dist = {ch: dist[ch] for ch in sorted(dist)}
+        if not dist:
+            return None
+        sampler = self._samplers[prompt] = AliasSampler(dist)
+        return sampler
+
+    def random_context(self, rng=random) -> Optional[str]:
+        """Return a context drawn in proportion to its total count, or None
+        if the model is empty."""
+
+        if not self._num_contexts:
+            return None
+        entry = bisect_right(self._cumulative, rng.random() * self._cumulative[-1])
+        return self.context(bisect_right(self._offsets, entry) - 1)
+
+    def to_counts(self) -> Dict[str, int]:
+        """Rebuild the n-gram counts dictionary (in sorted key order)."""
+
+        counts: Dict[str, int] = {}
+        for i in range(self._num_contexts):
+            context = self.context(i)
+            for entry in range(self._offsets[i], self._offsets[i + 1]):
+                counts[context + chr(self._next_chars[entry])] = self._count(entry)
+        return counts
+
+
+def load_model(path: str):
+    """Map the model file at `path` into memory and return it.
+
+    Returns a `MappedModel` for files written from n-gram counts, or a
+    `SuffixArrayModel` for suffix array indexes.
+    """
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Model file not found: {path}")
+    with open(path, "rb") as f:
+        magic = f.read(len(MAGIC))
+    if magic == b"TLSA":
+        from suffix_array_model import SuffixArrayModel
+
+        return SuffixArrayModel.load(path)
+    return MappedModel(path)
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    from count_char_n_grams import count_char_n_grams
+
+    text = "Lee has a dog. Jane has a dog. Soomi has a cat."
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.tllm")
+        save_model(count_char_n_grams(text, 4), path)
+        print("Saved:", os.path.getsize(path), "bytes")
+        with load_model(path) as model:
+            print("Contexts:", len(model))
+            print("Next-letter frequencies:", model.next_letter_frequency(" a "))
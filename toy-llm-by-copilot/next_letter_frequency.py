@@ -6,10 +6,12 @@ by `count_char_n_grams`, returns a mapping of possible next characters to
 their observed frequencies.
 """
 
-from typing import Dict
+from typing import Dict, Union
 
+from ngram_model import NGramModel
 
-def next_letter_frequency(prompt: str, counts: Dict[str, int]) -> Dict[str, int]:
+
+def next_letter_frequency(prompt: str, counts: Union[Dict[str, int], NGramModel]) -> Dict[str, int]:
     """Compute frequencies of next characters following `prompt`.
 
     Parameters
@@ -18,7 +20,9 @@ def next_letter_frequency(prompt: str, counts: Dict[str, int]) -> Dict[str, int]
       `prompt`.
     - counts (dict[str, int]): A dictionary mapping n-grams (strings of
       length `n`) to their counts; typically produced by
-      `count_char_n_grams(text, n)`.
+      `count_char_n_grams(text, n)`. An `NGramModel` built from such a
+      dictionary, or a `CompactCounts`, is also accepted and answered from
+      its own index.
 
     Returns
     - dict[str, int]: A dictionary mapping each possible next character
@@ -33,10 +37,15 @@ def next_letter_frequency(prompt: str, counts: Dict[str, int]) -> Dict[str, int]
       character of every n-gram.
     - The function does not assume a global `n` value other than what is
       implied by the n-gram key lengths in `counts`.
+    - Scanning a dictionary costs O(len(counts)) per call; pass an
+      `NGramModel` when calling repeatedly (e.g. during generation).
     """
 
     if not isinstance(prompt, str):
         raise TypeError("prompt must be a string")
+    if hasattr(counts, "next_letter_frequency"):
+        # NGramModel, CompactCounts: answered from their own index
+        return counts.next_letter_frequency(prompt)
     if not isinstance(counts, dict):
         raise TypeError("counts must be a dict mapping n-grams to integers")
 
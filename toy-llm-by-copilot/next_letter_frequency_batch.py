@@ -0,0 +1,254 @@
+"""Next-letter frequencies for many prompts at once
+
+Provides `next_letter_frequency_batch(prompts, model)`, the bulk form of
+`next_letter_frequency`: the same counts for every prompt, computed with a
+few vectorized NumPy passes instead of one dictionary scan per prompt.
+
+The model is compiled into a `CompactCounts` index (sorted packed codes,
+first character most significant). For prompts of length `p`, the index
+is collapsed once into the distinct `(p+1)`-character prefixes and their
+summed counts; every prompt's continuations are then one contiguous range
+of those prefixes, found with two `np.searchsorted` calls over all
+prompts of that length together. An empty prompt counts the last
+character of every n-gram, as `next_letter_frequency` does.
+
+Results come back as a dense prompts x vocabulary matrix
+(`FrequencyMatrix`) or in CSR form (`SparseFrequencies`).
+
+Packed codes hold `vocab ** n` values in 64 bits (e.g. 13-grams over 30
+characters, but not 14-grams over the ~80 of a novel). Larger models are
+answered one prompt at a time from the model's own index (an `NGramModel`
+is built for a counts dict), into the same result types.
+"""
+
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from compact_counts import CompactCounts
+from count_char_n_grams_numpy import packed_codes_fit
+from ngram_model import NGramModel
+
+
+class FrequencyMatrix(NamedTuple):
+    """Dense next-letter counts.
+
+    Fields
+    - vocab (str): The character of each column.
+    - counts (np.ndarray[int64]): `(prompts, len(vocab))` counts.
+    """
+
+    vocab: str
+    counts: np.ndarray
+
+    def row(self, i: int) -> Dict[str, int]:
+        """Return prompt `i`'s counts as `next_letter_frequency` would."""
+
+        row = self.counts[i]
+        return {self.vocab[j]: int(row[j]) for j in np.flatnonzero(row)}
+
+
+class SparseFrequencies(NamedTuple):
+    """Next-letter counts in CSR form.
+
+    Fields
+    - vocab (str): The character of each column index.
+    - indptr (np.ndarray[int64]): Prompt `i`'s entries are
+      `indptr[i]..indptr[i+1]-1`.
+    - indices (np.ndarray[int64]): Column (vocab index) of each entry,
+      ascending within a prompt.
+    - data (np.ndarray[int64]): Count of each entry.
+    """
+
+    vocab: str
+    indptr: np.ndarray
+    indices: np.ndarray
+    data: np.ndarray
+
+    def row(self, i: int) -> Dict[str, int]:
+        """Return prompt `i`'s counts as `next_letter_frequency` would."""
+
+        lo, hi = self.indptr[i], self.indptr[i + 1]
+        return {self.vocab[j]: cnt for j, cnt in zip(self.indices[lo:hi].tolist(), self.data[lo:hi].tolist())}
+
+    def to_dense(self) -> FrequencyMatrix:
+        counts = np.zeros((len(self.indptr) - 1, len(self.vocab)), dtype=np.int64)
+        rows = np.repeat(np.arange(len(self.indptr) - 1), np.diff(self.indptr))
+        counts[rows, self.indices] = self.data
+        return FrequencyMatrix(self.vocab, counts)
+
+
+def _ngram_counts(model) -> Tuple[Dict[str, int], int]:
+    """Return the n-gram counts of `model` and its `n` (1 for an empty
+    dict, which has no n-grams of any length)."""
+
+    if isinstance(model, NGramModel):
+        counts = {context + ch: cnt for context, dist in model.table.items() for ch, cnt in dist.items()}
+        return counts, model.n
+    if hasattr(model, "to_counts"):
+        return model.to_counts(), model.n
+    if isinstance(model, dict):
+        return model, len(next(iter(model))) if model else 1
+    raise TypeError("model must be an NGramModel, a MappedModel or a dict of n-gram counts")
+
+
+def compile_counts(model) -> CompactCounts:
+    """Return `model` as a `CompactCounts`: an `NGramModel`, a model with
+    `to_counts()` (`MappedModel`), or an n-gram counts mapping (empty
+    included).
+
+    Raises `ValueError` when `vocab ** n` does not fit in 64 bits; see
+    `NextLetterIndex` for answering such models."""
+
+    if isinstance(model, CompactCounts):
+        return model
+    return CompactCounts.from_counts(*_ngram_counts(model))
+
+
+class NextLetterIndex:
+    """A compiled model answering batches of prompts.
+
+    Parameters
+    - model: Anything `compile_counts` accepts.
+
+    Behavior
+    - The per-prompt-length prefix tables are built on first use and kept,
+      so reuse one index across calls.
+    - When `vocab ** n` does not fit in 64 bits, `counts` is None and
+      prompts are answered one at a time by `model.next_letter_frequency`
+      (by an `NGramModel` built from a counts dict).
+    """
+
+    def __init__(self, model) -> None:
+        self.counts: Optional[CompactCounts] = None
+        self._model = None
+        if isinstance(model, CompactCounts):
+            self.counts = model
+        else:
+            counts, n = _ngram_counts(model)
+            vocab = "".join(sorted(set().union(*counts)))
+            if packed_codes_fit(len(vocab), n):
+                self.counts = CompactCounts.from_counts(counts, n)
+            else:
+                self._model = model if hasattr(model, "next_letter_frequency") else NGramModel.from_counts(counts, n)
+                self.vocab, self.n = vocab, n
+        if self.counts is not None:
+            self.vocab = self.counts.vocab
+            self.n = self.counts.n
+        self._base = max(len(self.vocab), 1)
+        self._code_points = np.array([ord(ch) for ch in self.vocab], dtype=np.uint32)
+        self._levels: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def _level(self, p: int) -> Tuple[np.ndarray, np.ndarray]:
+        # distinct codes of the first p+1 characters (the last character
+        # alone for p == 0) and their summed counts
+        level = self._levels.get(p)
+        if level is None:
+            base = np.uint64(self._base)
+            codes, counts = self.counts.codes, self.counts.counts.astype(np.int64)
+            if p == 0:
+                sums = np.bincount((codes % base).astype(np.intp), weights=counts, minlength=self._base)
+                keys = np.flatnonzero(sums)
+                level = (keys.astype(np.uint64), sums[keys].astype(np.int64))
+            else:
+                prefix = codes // np.uint64(self._base ** (self.n - p - 1))
+                starts = np.flatnonzero(np.r_[True, prefix[1:] != prefix[:-1]])
+                level = (prefix[starts], np.add.reduceat(counts, starts))
+            self._levels[p] = level
+        return level
+
+    def query(self, prompts: Iterable[str], sparse: bool = False):
+        """Return the next-letter counts of every prompt (see
+        `next_letter_frequency_batch`)."""
+
+        prompts = list(prompts)
+        for prompt in prompts:
+            if not isinstance(prompt, str):
+                raise TypeError("prompt must be a string")
+        if self.counts is None:
+            result = self._query_each(prompts)
+            return result if sparse else result.to_dense()
+        lengths = np.array([len(prompt) for prompt in prompts], dtype=np.int64)
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+        points = np.frombuffer("".join(prompts).encode("utf-32-le"), dtype="<u4")
+        ids = np.searchsorted(self._code_points, points)
+        if len(self.vocab):
+            ids = np.minimum(ids, len(self.vocab) - 1)
+            known = self._code_points[ids] == points
+        else:
+            known = np.zeros(len(points), dtype=bool)
+        ids = ids.astype(np.uint64)
+
+        lo = np.zeros(len(prompts), dtype=np.int64)
+        hi = np.zeros(len(prompts), dtype=np.int64)
+        base = np.uint64(self._base)
+        for p in np.unique(lengths).tolist():
+            if p >= self.n or not len(self.counts.codes):
+                continue
+            rows = np.flatnonzero(lengths == p)
+            positions = offsets[rows, None] + np.arange(p)
+            rows = rows[known[positions].all(axis=1)]
+            code = np.zeros(len(rows), dtype=np.uint64)
+            for j in range(p):
+                code = code * base + ids[offsets[rows] + j]
+            keys, _ = self._level(p)
+            first = code * base
+            lo[rows] = np.searchsorted(keys, first, side="left")
+            hi[rows] = np.searchsorted(keys, first + (base - np.uint64(1)), side="right")
+
+        indptr = np.concatenate(([0], np.cumsum(hi - lo)))
+        entries = np.arange(indptr[-1]) - np.repeat(indptr[:-1] - lo, hi - lo)
+        entry_lengths = np.repeat(lengths, hi - lo)
+        indices = np.empty(len(entries), dtype=np.int64)
+        data = np.empty(len(entries), dtype=np.int64)
+        for p in np.unique(entry_lengths).tolist():
+            mine = np.flatnonzero(entry_lengths == p)
+            keys, sums = self._level(p)
+            indices[mine] = (keys[entries[mine]] % base).astype(np.int64)
+            data[mine] = sums[entries[mine]]
+        result = SparseFrequencies(self.vocab, indptr, indices, data)
+        return result if sparse else result.to_dense()
+
+    def _query_each(self, prompts: list) -> SparseFrequencies:
+        # models too wide for packed codes: one model query per prompt
+        column = {ch: j for j, ch in enumerate(self.vocab)}
+        rows = [sorted((column[ch], cnt) for ch, cnt in self._model.next_letter_frequency(p).items()) for p in prompts]
+        indptr = np.concatenate(([0], np.cumsum([len(row) for row in rows]))).astype(np.int64)
+        indices = np.array([j for row in rows for j, _ in row], dtype=np.int64)
+        data = np.array([cnt for row in rows for _, cnt in row], dtype=np.int64)
+        return SparseFrequencies(self.vocab, indptr, indices, data)
+
+
+def next_letter_frequency_batch(prompts: Iterable[str], model, sparse: bool = False):
+    """Compute `next_letter_frequency(prompt, model)` for many prompts.
+
+    Parameters
+    - prompts (Iterable[str]): The prompts, of any lengths (including empty).
+    - model: An `NextLetterIndex` (reused as is), or anything
+      `compile_counts` accepts (compiled for this call).
+    - sparse (bool): Return `SparseFrequencies` instead of a dense
+      `FrequencyMatrix`.
+
+    Returns
+    - FrequencyMatrix | SparseFrequencies: Row `i` holds the counts of
+      `prompts[i]`; `.row(i)` equals `next_letter_frequency(prompts[i],
+      model)`. Prompts with unseen characters, or of `n` or more
+      characters, get empty rows, as do all prompts of an empty model.
+    - Models whose `vocab ** n` exceeds 64 bits are answered per prompt
+      (see `NextLetterIndex`): same results, without the batch speedup.
+    """
+
+    index = model if isinstance(model, NextLetterIndex) else NextLetterIndex(model)
+    return index.query(prompts, sparse)
+
+
+if __name__ == "__main__":
+    from count_char_n_grams import count_char_n_grams
+
+    text = "Lee has a dog. Jane has a dog. Soomi has a cat."
+    counts = count_char_n_grams(text, 4)
+    prompts = [" a ", "has", "", "S", "xyz"]
+    result = next_letter_frequency_batch(prompts, counts)
+    print("Vocab:", repr(result.vocab))
+    for i, prompt in enumerate(prompts):
+        print(repr(prompt), result.row(i))
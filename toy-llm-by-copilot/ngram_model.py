@@ -0,0 +1,245 @@
+"""Prefix-indexed n-gram model
+
+Provides `NGramModel`, built once from the output of `count_char_n_grams`,
+which maps every (n-1)-character context straight to its next-character
+distribution. Looking up the continuations of a prompt is a single dict
+access instead of a scan over every n-gram key.
+"""
+
+from typing import Dict, Optional
+import random
+
+from sampler import AliasSampler, FenwickSampler
+
+
+class NGramModel:
+    """Next-character distributions indexed by their (n-1)-character context.
+
+    Parameters
+    - n (int): The n-gram length the model was trained with. Contexts are
+      `n-1` characters long.
+
+    Attributes
+    - n (int): The n-gram length.
+    - table (dict[str, dict[str, int]]): Maps each context to a dictionary of
+      next characters and their counts.
+
+    Behavior
+    - `next_letter_frequency(prompt)` returns the same result as
+      `next_letter_frequency(prompt, counts)` on the counts the model was
+      built from. Prompts of exactly `n-1` characters are answered with one
+      dict lookup; shorter prompts (including the empty prompt) are resolved
+      once from the table and then memoized.
+    - `sampler(prompt)` returns an `AliasSampler` over the same
+      distribution, built on first use and cached per prompt, so repeated
+      draws from a context allocate nothing.
+    - `random_context()` draws a context weighted by how often it occurs,
+      which is how generation picks its starting prompt.
+    - Both samplers lay out their candidates in sorted order, so a seeded
+      draw depends only on the counts: not on the order they were counted
+      in (which differs between counting backends), and not on whether the
+      model is in memory or a `MappedModel` of its saved file.
+    - `update(new_text)` adds the n-grams of text appended to the training
+      corpus, including those spanning the join with the previous `tail`,
+      and drops only the cached lookups and samplers they affect.
+    """
+
+    def __init__(self, n: int) -> None:
+        if not isinstance(n, int):
+            raise TypeError("n must be an integer")
+        if n <= 0:
+            raise ValueError("n must be a positive integer")
+        self.n = n
+        self.table: Dict[str, Dict[str, int]] = {}
+        self._prefix_cache: Dict[str, Dict[str, int]] = {}
+        self._samplers: Dict[str, AliasSampler] = {}
+        self._context_sampler: Optional[FenwickSampler] = None
+        # last n-1 characters of the text trained on so far; None when
+        # unknown (a model built from counts alone)
+        self.tail: Optional[str] = ""
+
+    @classmethod
+    def from_counts(cls, counts: Dict[str, int], n: Optional[int] = None, tail: Optional[str] = None) -> "NGramModel":
+        """Build a model from an n-gram counts dictionary.
+
+        Parameters
+        - counts (dict[str, int]): n-gram counts, as returned by
+          `count_char_n_grams`. All keys must have the same length.
+        - n (int, optional): The n-gram length. Inferred from the keys of
+          `counts` when omitted; required when `counts` is empty.
+        - tail (str, optional): The end of the text `counts` came from.
+          Only its last `n-1` characters are kept, so that `update` can
+          count the n-grams spanning the join with appended text. Without
+          it (and `n > 1`), `update` raises `ValueError`.
+
+        Returns
+        - NGramModel: The indexed model.
+        """
+
+        if n is None:
+            if not counts:
+                raise ValueError("n is required when counts is empty")
+            n = len(next(iter(counts)))
+
+        model = cls(n)
+        model.tail = _tail(tail, n) if tail is not None or n == 1 else None
+        table = model.table
+        for ngram, cnt in counts.items():
+            if len(ngram) != n:
+                raise ValueError(f"n-gram {ngram!r} does not have length {n}")
+            context = ngram[:-1]
+            next_char = ngram[-1]
+            dist = table.get(context)
+            if dist is None:
+                dist = table[context] = {}
+            dist[next_char] = dist.get(next_char, 0) + int(cnt)
+        return model
+
+    @classmethod
+    def from_text(cls, text: str, n: int = 3) -> "NGramModel":
+        """Count the n-grams of `text` and build a model from them."""
+
+        from count_char_n_grams import count_char_n_grams
+
+        return cls.from_counts(count_char_n_grams(text, n), n, tail=text)
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def __contains__(self, context: object) -> bool:
+        return context in self.table
+
+    def next_letter_frequency(self, prompt: str) -> Dict[str, int]:
+        """Return the next-character frequencies following `prompt`.
+
+        Parameters
+        - prompt (str): The previous characters, normally `n-1` of them.
+
+        Returns
+        - dict[str, int]: A new dictionary mapping each possible next
+          character to its frequency. Empty when `prompt` was never seen or
+          is `n` characters or longer.
+        """
+
+        plen = len(prompt)
+        if plen == self.n - 1:
+            return dict(self.table.get(prompt, {}))
+        if plen >= self.n:
+            return {}
+
+        cached = self._prefix_cache.get(prompt)
+        if cached is None:
+            cached = self._prefix_cache[prompt] = self._resolve_prefix(prompt)
+        return dict(cached)
+
+    def sampler(self, prompt: str) -> Optional[AliasSampler]:
+        """Return the cached sampler for `prompt`, or None if it has no
+        observed continuations."""
+
+        sampler = self._samplers.get(prompt)
+        if sampler is not None:
+            return sampler
+        if len(prompt) == self.n - 1:
+            dist = self.table.get(prompt)
+        else:
+            dist = self.next_letter_frequency(prompt)
+        if not dist:
+            # unseen prompts are not cached: they are cheap to re-check and
+            # fallback characters can produce an unbounded number of them
+            return None
+        sampler = self._samplers[prompt] = AliasSampler({ch: dist[ch] for ch in sorted(dist)})
+        return sampler
+
+    def random_context(self, rng=random) -> Optional[str]:
+        """Return a context drawn in proportion to its total count, or None
+        if the model is empty."""
+
+        if not self.table:
+            return None
+        if self._context_sampler is None:
+            table = self.table
+            totals = {context: sum(table[context].values()) for context in sorted(table)}
+            self._context_sampler = FenwickSampler(totals)
+        return self._context_sampler.sample(rng)
+
+    def update(self, new_text: str) -> Dict[str, int]:
+        """Add the n-grams of `new_text`, appended after the text trained on
+        so far, and return the counts that were added.
+
+        Cost is proportional to `len(new_text)`: the n-grams of
+        `tail + new_text` are counted and merged into the table, then the
+        memoized lookups and samplers of every touched context (and of its
+        shorter prefixes) are dropped to be rebuilt on next use. The
+        weighted start-context sampler, once built, is patched in place:
+        touched contexts gain weight and new ones are appended.
+
+        Raises `ValueError` when the model was built from counts without
+        the `tail` of their text (and `n > 1`): the n-grams spanning the
+        join could not be counted.
+        """
+
+        from count_char_n_grams import count_char_n_grams
+
+        n = self.n
+        if self.tail is None:
+            raise ValueError("update needs the end of the training text: build the model with from_counts(..., tail=text)")
+        delta = count_char_n_grams(self.tail + new_text, n)
+        table = self.table
+        touched = set()
+        for ngram, cnt in delta.items():
+            context = ngram[:-1]
+            dist = table.get(context)
+            if dist is None:
+                dist = table[context] = {}
+            dist[ngram[-1]] = dist.get(ngram[-1], 0) + cnt
+            touched.add(context)
+            if self._context_sampler is not None:
+                self._context_sampler.add(context, cnt)
+
+        for context in touched:
+            for k in range(len(context) + 1):
+                prefix = context[:k]
+                self._prefix_cache.pop(prefix, None)
+                self._samplers.pop(prefix, None)
+        self.tail = _tail(self.tail + new_text, n)
+        return delta
+
+    def _resolve_prefix(self, prompt: str) -> Dict[str, int]:
+        # Mirrors the dict-based semantics for prompts shorter than n-1:
+        # an empty prompt yields the last character of every n-gram, any
+        # other prompt yields the character at position len(prompt).
+        next_freq: Dict[str, int] = {}
+        plen = len(prompt)
+        for context, dist in self.table.items():
+            if plen == 0:
+                for ch, cnt in dist.items():
+                    next_freq[ch] = next_freq.get(ch, 0) + cnt
+            elif context[:plen] == prompt:
+                ch = context[plen]
+                next_freq[ch] = next_freq.get(ch, 0) + sum(dist.values())
+        return next_freq
+
+
+def _tail(text: str, n: int) -> str:
+    return text[-(n - 1):] if n > 1 else ""
+
+
+def update(model, new_text: str) -> Dict[str, int]:
+    """Grow `model` (an `NGramModel` or `BackoffModel`) with text appended
+    to its training corpus; see `NGramModel.update`."""
+
+    if not hasattr(model, "update"):
+        raise TypeError(f"{type(model).__name__} cannot be updated in place")
+    return model.update(new_text)
+
+
+if __name__ == "__main__":
+    text = "Lee has a dog. Jane has a dog. Soomi has a cat."
+    model = NGramModel.from_text(text, n=4)
+    prompt = " a "
+
+    print("Contexts:", len(model))
+    print("Prompt:", repr(prompt))
+    print("Next-letter frequencies:", model.next_letter_frequency(prompt))
+    update(model, " Lee has a cow.")
+    print("After update:", model.next_letter_frequency(prompt))
@@ -0,0 +1,125 @@
+"""Reproducible parallel generation of many samples
+
+Provides `parallel_generate(model_path, num_samples, ...)`, which fans
+samples out over a process pool:
+
+- every sample has its own `random.Random` stream, seeded from a child
+  of `numpy.random.SeedSequence(seed).spawn(num_samples)`, so sample `i`
+  depends only on `seed` and `i` and the output is identical for any
+  number of workers (or none),
+- nothing reads or reseeds the global `random` state,
+- each worker maps the saved model file (`model_io.load_model`) once, in
+  the pool initializer; the mapping is read-only, so all workers share
+  the operating system's single page-cached copy of the model.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import random
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from decoding import with_decoding
+from generation import MaxChars, generate
+from model_io import load_model
+
+
+_worker_model = None
+_worker_stop: Sequence = ()
+
+
+def sample_seeds(seed: Optional[int], num_samples: int) -> List[int]:
+    """Return an independent 128-bit seed for each of `num_samples`
+    samples; `seed=None` draws fresh entropy from the OS."""
+
+    children = np.random.SeedSequence(seed).spawn(num_samples)
+    return [int.from_bytes(child.generate_state(4).tobytes(), "little") for child in children]
+
+
+def _init_worker(model_path: str, stop: Sequence, decoding: dict) -> None:
+    global _worker_model, _worker_stop
+    _worker_model = with_decoding(load_model(model_path), **decoding)
+    _worker_stop = stop
+
+
+def _sample(model, stop: Sequence, args: tuple) -> str:
+    sample_seed, min_len, max_len = args
+    rng = random.Random(sample_seed)
+    target_len = rng.randint(min_len, max_len)
+    if target_len <= 0:
+        return ""
+    return generate(model, stop=[MaxChars(target_len), *stop], rng=rng)
+
+
+def _generate_one(args: tuple) -> str:
+    return _sample(_worker_model, _worker_stop, args)
+
+
+def parallel_generate(
+    model_path: str,
+    num_samples: int,
+    min_len: int = 40,
+    max_len: int = 60,
+    seed: Optional[int] = None,
+    workers: int = 1,
+    stop: Iterable = (),
+    temperature: float = 1.0,
+    top_k: Optional[int] = None,
+    top_p: Optional[float] = None,
+) -> List[str]:
+    """Generate `num_samples` texts from the model file at `model_path`.
+
+    Parameters
+    - model_path (str): A file written by `save_model` (or the training
+      cache).
+    - num_samples (int): Number of samples.
+    - min_len, max_len (int): Each sample's length is drawn from this range
+      by its own stream, as in `main.generate_from_model`.
+    - seed (int, optional): Root seed; None for a non-reproducible run.
+    - workers (int): Processes to use; 1 generates in this process.
+    - stop: Extra stop conditions (see `generation`), applied to every
+      sample.
+    - temperature, top_k, top_p: Decoding settings (see `decoding`).
+
+    Returns
+    - list[str]: The samples, in sample order.
+
+    Behavior
+    - Raises `ValueError` when `num_samples` is negative or `workers` is
+      not positive.
+    """
+
+    if num_samples < 0:
+        raise ValueError("num_samples must be non-negative")
+    if workers <= 0:
+        raise ValueError("workers must be a positive integer")
+    stop = list(stop)
+    decoding = {"temperature": temperature, "top_k": top_k, "top_p": top_p}
+    tasks = [(s, min_len, max_len) for s in sample_seeds(seed, num_samples)]
+    if workers == 1 or num_samples <= 1:
+        # in this process: a local model, unmapped again before returning
+        mapped = load_model(model_path)
+        try:
+            model = with_decoding(mapped, **decoding)
+            return [_sample(model, stop, task) for task in tasks]
+        finally:
+            if hasattr(mapped, "close"):
+                mapped.close()
+    chunksize = max(1, num_samples // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_path, stop, decoding)) as executor:
+        return list(executor.map(_generate_one, tasks, chunksize=chunksize))
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    from model_io import save_model
+    from ngram_model import NGramModel
+
+    text = "Lee has a dog. Jane has a dog. Soomi has a cat."
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.tllm")
+        save_model(NGramModel.from_text(text, 4), path)
+        for sample in parallel_generate(path, 4, 20, 30, seed=1, workers=2):
+            print(repr(sample))
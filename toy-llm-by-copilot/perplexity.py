@@ -0,0 +1,335 @@
+"""Held-out scoring of character models: log-probability and perplexity
+
+Provides `Scorer`, which turns training counts into sorted packed-code
+arrays (one pair per order, as in `CompactCounts`), and scores a test text
+with a handful of vectorized NumPy passes instead of a loop per character:
+
+1. the test text is encoded over the training vocabulary (characters never
+   seen in training share one extra out-of-vocabulary symbol),
+2. the code of every context and every n-gram of the text is computed with
+   shifted array arithmetic (`pack_n_grams`),
+3. all counts are looked up at once with `np.searchsorted`.
+
+Smoothing is either add-k on the full `n-1` character context
+(`"addk"`), or add-k on the longest context suffix seen in training
+(`"backoff"`), so unseen contexts fall back to shorter ones instead of
+the uniform distribution. Both give normalized probabilities over the
+vocabulary plus the out-of-vocabulary symbol.
+
+`score_stream` reads large evaluation files chunk by chunk, and
+`score_parallel` scores those chunks in a process pool. Run as a script
+for a command-line report:
+
+    python perplexity.py --train frankenstein.txt --eval my_way.txt -n 5
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import copy
+import math
+import os
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from count_char_n_grams_numpy import MAX_CODE, decode_codes, encode_text, pack_n_grams
+from count_char_n_grams_stream import DEFAULT_CHUNK_SIZE, Source, iter_overlapping_chunks
+
+
+SMOOTHINGS = ("addk", "backoff")
+
+
+class ScoreResult(NamedTuple):
+    """Totals over the scored characters.
+
+    Fields
+    - chars (int): Characters scored (every character after the first
+      `n-1`, which only serve as context).
+    - log_prob (float): Sum of their natural-log probabilities.
+    - oov (int): Scored characters that never occurred in training.
+    """
+
+    chars: int
+    log_prob: float
+    oov: int
+
+    def __add__(self, other: "ScoreResult") -> "ScoreResult":
+        return ScoreResult(self.chars + other.chars, self.log_prob + other.log_prob, self.oov + other.oov)
+
+    @property
+    def cross_entropy(self) -> float:
+        """Bits per character."""
+
+        return -self.log_prob / (self.chars * math.log(2)) if self.chars else 0.0
+
+    @property
+    def perplexity(self) -> float:
+        return math.exp(-self.log_prob / self.chars) if self.chars else 1.0
+
+
+def _lookup(keys: np.ndarray, values: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    # values[i] where keys[i] == query, else 0
+    if not len(keys):
+        return np.zeros(len(queries))
+    idx = np.minimum(np.searchsorted(keys, queries), len(keys) - 1)
+    return np.where(keys[idx] == queries, values[idx], 0.0)
+
+
+def _aggregate(codes: np.ndarray, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    uniq, inverse = np.unique(codes, return_inverse=True)
+    return uniq, np.bincount(inverse.ravel(), weights=counts, minlength=len(uniq))
+
+
+class Scorer:
+    """Vectorized next-character probabilities from training counts.
+
+    Parameters
+    - vocab (str): The sorted training characters; digit `len(vocab)` is the
+      out-of-vocabulary symbol, so codes use base `len(vocab) + 1`.
+    - grams (list[tuple[np.ndarray, np.ndarray]]): For each length
+      `1..n`, the sorted distinct n-gram codes and their counts.
+
+    Behavior
+    - The total of a context is the summed count of the n-grams extending
+      it, as in `NGramModel`.
+    - Raises `ValueError` when `(len(vocab) + 1) ** n` exceeds 64 bits.
+    """
+
+    def __init__(self, vocab: str, grams: List[Tuple[np.ndarray, np.ndarray]]) -> None:
+        self.vocab = vocab
+        self.n = len(grams)
+        self.base = len(vocab) + 1
+        if self.base ** self.n > MAX_CODE:
+            raise ValueError(f"{self.n}-grams over {self.base} symbols do not fit in 64-bit codes")
+        self._code_points = np.array([ord(ch) for ch in vocab], dtype=np.uint32)
+        self.grams = [(codes.astype(np.uint64), counts.astype(np.float64)) for codes, counts in grams]
+        # contexts[j]: codes and totals of the length-j contexts
+        self.contexts = [_aggregate(codes // np.uint64(self.base), counts) for codes, counts in self.grams]
+
+    @classmethod
+    def from_text(cls, text: str, n: int = 3) -> "Scorer":
+        """Count every order `1..n` of `text` exactly."""
+
+        if not isinstance(n, int):
+            raise TypeError("n must be an integer")
+        if n <= 0:
+            raise ValueError("n must be a positive integer")
+        vocab, ids = encode_text(text)
+        base = len(vocab) + 1
+        grams = []
+        for k in range(1, n + 1):
+            uniq, counts = np.unique(pack_n_grams(ids, k, base), return_counts=True)
+            grams.append((uniq, counts))
+        return cls(vocab, grams)
+
+    @classmethod
+    def from_counts(cls, counts: Dict[str, int], n: Optional[int] = None) -> "Scorer":
+        """Build from n-gram counts (a dict, `CompactCounts`, or the
+        `to_counts()` of a loaded model).
+
+        Lower orders are the counts of the n-grams' suffixes, so they miss
+        the few n-grams at the very start of the training text.
+        """
+
+        if n is None:
+            if not counts:
+                raise ValueError("n is required when counts is empty")
+            n = len(next(iter(counts)))
+        vocab = "".join(sorted(set().union(*counts))) if counts else ""
+        scorer_base = len(vocab) + 1
+        char_id = {ch: i for i, ch in enumerate(vocab)}
+        codes, values = [], []
+        for ngram, cnt in counts.items():
+            code = 0
+            for ch in ngram:
+                code = code * scorer_base + char_id[ch]
+            codes.append(code)
+            values.append(cnt)
+        top = np.array(codes, dtype=np.uint64)
+        weights = np.array(values, dtype=np.float64)
+        grams = []
+        for k in range(1, n + 1):
+            suffix = top if k == n else top % np.uint64(scorer_base ** k)
+            grams.append(_aggregate(suffix, weights))
+        return cls(vocab, grams)
+
+    @classmethod
+    def from_model(cls, model) -> "Scorer":
+        """Build from an `NGramModel` or a model loaded by `load_model`."""
+
+        if hasattr(model, "to_counts"):
+            return cls.from_counts(model.to_counts(), model.n)
+        table = getattr(model, "table", None)
+        if table is None:
+            raise TypeError(f"cannot score with a {type(model).__name__}")
+        counts = {context + ch: cnt for context, dist in table.items() for ch, cnt in dist.items()}
+        return cls.from_counts(counts, model.n)
+
+    def truncated(self, n: int) -> "Scorer":
+        """Return a scorer for order `n <= self.n` sharing these arrays."""
+
+        if not 0 < n <= self.n:
+            raise ValueError(f"n must be between 1 and {self.n}")
+        scorer = copy.copy(self)
+        scorer.n = n
+        scorer.grams = self.grams[:n]
+        scorer.contexts = self.contexts[:n]
+        return scorer
+
+    def ngram_counts(self, n: Optional[int] = None) -> Dict[str, int]:
+        """Return the n-gram counts of order `n` (default: `self.n`) as a
+        dict, e.g. for `NGramModel.from_counts`."""
+
+        codes, counts = self.grams[(n or self.n) - 1]
+        # the out-of-vocabulary digit never occurs in training codes
+        chars = decode_codes(codes, n or self.n, self.vocab + "\uffff")
+        return dict(zip(chars, counts.astype(np.int64).tolist()))
+
+    def encode(self, text: str) -> np.ndarray:
+        """Return the vocab index of each character (`len(vocab)` if unseen)."""
+
+        points = np.frombuffer(text.encode("utf-32-le"), dtype="<u4")
+        ids = np.searchsorted(self._code_points, points)
+        ids = np.minimum(ids, max(len(self.vocab) - 1, 0))
+        known = self._code_points[ids] == points if len(self.vocab) else np.zeros(len(points), dtype=bool)
+        return np.where(known, ids, len(self.vocab)).astype(np.uint64)
+
+    def log_probs(self, text: str, smoothing: str = "backoff", k: float = 1.0) -> np.ndarray:
+        """Return the natural-log probability of each character of `text`
+        after the first `n-1`, given the `n-1` before it.
+
+        Raises `ValueError` for an unknown smoothing or a negative `k`.
+        With `k == 0` unseen events get probability 0 (log -inf).
+        """
+
+        if smoothing not in SMOOTHINGS:
+            raise ValueError(f"smoothing must be one of {SMOOTHINGS}, not {smoothing!r}")
+        if k < 0:
+            raise ValueError("k must be non-negative")
+        ids = self.encode(text)
+        n, base = self.n, self.base
+        m = len(ids) - n + 1
+        if m <= 0:
+            return np.zeros(0)
+
+        orders = range(n - 1, -1, -1) if smoothing == "backoff" else [n - 1]
+        gram_count = np.zeros(m)
+        context_total = np.zeros(m)
+        pending = np.ones(m, dtype=bool)
+        for j in orders:
+            # (j+1)-grams ending at each scored position (n-1 .. len-1)
+            grams = pack_n_grams(ids[n - 1 - j:], j + 1, base)
+            totals = _lookup(*self.contexts[j], grams // np.uint64(base))
+            take = pending & (totals > 0) if smoothing == "backoff" and j else pending
+            context_total[take] = totals[take]
+            gram_count[take] = _lookup(*self.grams[j], grams[take])
+            pending &= ~take
+            if not pending.any():
+                break
+        with np.errstate(divide="ignore"):
+            return np.log((gram_count + k) / (context_total + k * base))
+
+    def score(self, text: str, smoothing: str = "backoff", k: float = 1.0) -> ScoreResult:
+        logp = self.log_probs(text, smoothing, k)
+        oov = int(np.count_nonzero(self.encode(text[self.n - 1:]) == len(self.vocab))) if len(logp) else 0
+        return ScoreResult(len(logp), float(logp.sum()), oov)
+
+
+def score_stream(
+    scorer: Scorer,
+    source: Source,
+    smoothing: str = "backoff",
+    k: float = 1.0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> ScoreResult:
+    """Score a path or text file object one chunk at a time.
+
+    Chunks overlap by `n-1` characters, so the result equals
+    `scorer.score(whole_text)`.
+    """
+
+    total = ScoreResult(0, 0.0, 0)
+    for buf in iter_overlapping_chunks(source, scorer.n, chunk_size):
+        total += scorer.score(buf, smoothing, k)
+    return total
+
+
+_worker_scorer: Optional[Scorer] = None
+
+
+def _init_worker(scorer: Scorer) -> None:
+    global _worker_scorer
+    _worker_scorer = scorer
+
+
+def _score_chunk(args: tuple) -> ScoreResult:
+    buf, smoothing, k = args
+    return _worker_scorer.score(buf, smoothing, k)
+
+
+def score_parallel(
+    scorer: Scorer,
+    source: Source,
+    smoothing: str = "backoff",
+    k: float = 1.0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: Optional[int] = None,
+) -> ScoreResult:
+    """Like `score_stream`, but score the chunks in `workers` processes.
+
+    The scorer is sent to each worker once (pool initializer); at most
+    `2 * workers` chunks are read ahead, so memory stays bounded for
+    evaluation files of any size.
+    """
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 0:
+        raise ValueError("workers must be a positive integer")
+    if workers == 1:
+        return score_stream(scorer, source, smoothing, k, chunk_size)
+
+    total = ScoreResult(0, 0.0, 0)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(scorer,)) as executor:
+        pending = []
+        for buf in iter_overlapping_chunks(source, scorer.n, chunk_size):
+            pending.append(executor.submit(_score_chunk, (buf, smoothing, k)))
+            if len(pending) >= 2 * workers:
+                total += pending.pop(0).result()
+        for future in pending:
+            total += future.result()
+    return total
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Score a held-out text under a character n-gram model")
+    parser.add_argument("--train", "-t", help="Training text file")
+    parser.add_argument("--model", "-m", help="Model file written by main.py --save-model (instead of --train)")
+    parser.add_argument("--eval", "-e", required=True, help="Held-out text file to score")
+    parser.add_argument("--n", "-n", type=int, default=4, help="n for n-grams with --train (default: 4)")
+    parser.add_argument("--smoothing", choices=SMOOTHINGS, default="backoff", help="Smoothing (default: backoff)")
+    parser.add_argument("--k", type=float, default=1.0, help="Add-k pseudo-count (default: 1)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Characters per evaluation chunk")
+    parser.add_argument("--workers", type=int, default=1, help="Score chunks in this many processes (default: 1)")
+    args = parser.parse_args()
+
+    if bool(args.train) == bool(args.model):
+        parser.error("give exactly one of --train and --model")
+    if args.model:
+        from model_io import load_model
+
+        scorer = Scorer.from_model(load_model(args.model))
+    else:
+        with open(args.train, "r", encoding="utf-8") as f:
+            scorer = Scorer.from_text(f.read(), args.n)
+
+    result = score_parallel(scorer, args.eval, args.smoothing, args.k, args.chunk_size, args.workers)
+    print(f"n: {scorer.n}, smoothing: {args.smoothing}, k: {args.k}")
+    print(f"Scored characters: {result.chars} ({result.oov} out of vocabulary)")
+    print(f"Cross-entropy: {result.cross_entropy:.4f} bits/char")
+    print(f"Perplexity: {result.perplexity:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Per-stage wall time and memory instrumentation
+
+Provides `Profiler`, used by `main.py --profile` to time the pipeline stages
+(loading, counting, index building, generation, ...) and record the peak
+memory traced by `tracemalloc` during each, then emit one JSON report.
+
+A disabled profiler's `stage()` is a no-op, so the CLI wraps its stages
+unconditionally. Tracing allocations slows Python code down, so profiled
+wall times are upper bounds for an unprofiled run.
+"""
+
+import contextlib
+import json
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, Iterator, Optional
+
+
+class Profiler:
+    """Records `seconds`, `peak_bytes` and `retained_bytes` per stage.
+
+    Parameters
+    - enabled (bool): When False, `stage()` records nothing and
+      `tracemalloc` is never started.
+
+    Behavior
+    - `peak_bytes` is the highest traced memory while the stage ran,
+      including what earlier stages still hold; `retained_bytes` is how
+      much more is traced after the stage than before it.
+    - `metrics` holds any other figures to include in the report.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.metrics: Dict[str, Any] = {}
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            current, peak = tracemalloc.get_traced_memory()
+            self.stages[name] = {
+                "seconds": round(seconds, 6),
+                "peak_bytes": peak,
+                "retained_bytes": current - before,
+            }
+
+    def seconds(self, name: str) -> Optional[float]:
+        stage = self.stages.get(name)
+        return stage["seconds"] if stage else None
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "stages": self.stages,
+            "total_seconds": round(sum(s["seconds"] for s in self.stages.values()), 6),
+            "peak_bytes": max((s["peak_bytes"] for s in self.stages.values()), default=0),
+            **self.metrics,
+        }
+
+    def write(self, path: Optional[str] = None) -> None:
+        """Write the JSON report to `path`, or to stderr when `path` is
+        None or `"-"` (stdout carries the generated text)."""
+
+        text = json.dumps(self.report(), indent=2)
+        if path in (None, "-"):
+            print(text, file=sys.stderr)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def unique_ngrams(model) -> Optional[int]:
+    """Return the number of distinct n-grams a model holds, if it keeps a
+    table of them (`NGramModel`, `BackoffModel`'s top order, `WordModel`,
+    `SketchModel`) or a count of them (`MappedModel`); None otherwise."""
+
+    if hasattr(model, "models"):
+        model = model.models[model.max_n]
+    elif hasattr(model, "model"):
+        model = model.model
+    if hasattr(model, "num_entries"):
+        return model.num_entries
+    if hasattr(model, "next_chars"):
+        return sum(len(summary) for summary in model.next_chars.values())
+    table = getattr(model, "table", None)
+    if isinstance(table, dict):
+        return sum(len(dist) for dist in table.values())
+    return None
+
+
+if __name__ == "__main__":
+    from ngram_model import NGramModel
+
+    profiler = Profiler()
+    with profiler.stage("count"):
+        model = NGramModel.from_text("Lee has a dog. Jane has a dog. Soomi has a cat." * 100, 4)
+    profiler.metrics["unique_ngrams"] = unique_ngrams(model)
+    profiler.write()
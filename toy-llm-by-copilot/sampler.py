@@ -0,0 +1,284 @@
+"""Precomputed weighted samplers for next-character distributions
+
+Provides four samplers that are built once per context from a mapping of
+characters to counts and then draw repeatedly without allocating:
+
+- `AliasSampler`: Walker/Vose alias table, O(1) per draw.
+- `CumulativeSampler`: cumulative-weight array with binary search,
+  O(log k) per draw.
+- `FenwickSampler`: like `CumulativeSampler`, over a Fenwick tree, so
+  weights can grow and keys can be added in O(log k).
+- `TruncatedSampler`: like `CumulativeSampler`, over the characters sorted
+  by weight, reshaped by a temperature and cut to the top-k / top-p
+  candidates once at construction, so each draw is still O(log k).
+
+All four draw with `sampler.sample(rng)`, where `rng` is anything with a
+`random()` method returning a float in [0, 1) (the `random` module by
+default, so `random.seed` keeps generation reproducible).
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import List, Mapping, Optional
+import random
+
+
+def _check_weights(weights: Mapping[str, int]) -> int:
+    if not weights:
+        raise ValueError("weights must not be empty")
+    total = 0
+    for w in weights.values():
+        if w < 0:
+            raise ValueError("weights must be non-negative")
+        total += w
+    if total <= 0:
+        raise ValueError("weights must have a positive sum")
+    return total
+
+
+class AliasSampler:
+    """Draw keys of `weights` in proportion to their values in O(1).
+
+    Parameters
+    - weights (Mapping[str, int]): Candidate characters mapped to their
+      non-negative counts. At least one count must be positive.
+
+    Behavior
+    - Builds the alias table with Vose's method in O(k) for k candidates.
+    - Each draw uses a single `rng.random()` call: its integer part picks a
+      column and its fractional part decides between the column's own
+      character and its alias.
+    """
+
+    __slots__ = ("chars", "_k", "_prob", "_alias")
+
+    def __init__(self, weights: Mapping[str, int]) -> None:
+        total = _check_weights(weights)
+        chars = list(weights)
+        k = len(chars)
+        scaled = [w * k / total for w in weights.values()]
+        prob = [1.0] * k
+        alias = list(chars)
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = chars[l]
+            scaled[l] = (scaled[l] + scaled[s]) - 1.0
+            if scaled[l] < 1.0:
+                small.append(l)
+            else:
+                large.append(l)
+        # whatever is left is 1.0 up to rounding error and keeps prob 1.0
+
+        self.chars: List[str] = chars
+        self._k = k
+        self._prob = prob
+        self._alias = alias
+
+    def __len__(self) -> int:
+        return self._k
+
+    def sample(self, rng=random) -> str:
+        r = rng.random() * self._k
+        i = int(r)
+        if r - i < self._prob[i]:
+            return self.chars[i]
+        return self._alias[i]
+
+
+class CumulativeSampler:
+    """Draw keys of `weights` in proportion to their values in O(log k).
+
+    Parameters
+    - weights (Mapping[str, int]): Candidate characters mapped to their
+      non-negative counts. At least one count must be positive.
+
+    Behavior
+    - Stores the running totals of the weights and locates each draw with
+      `bisect_right`. Zero-weight characters are never returned.
+    """
+
+    __slots__ = ("chars", "_cum", "_total")
+
+    def __init__(self, weights: Mapping[str, int]) -> None:
+        total = _check_weights(weights)
+        cum = []
+        running = 0
+        for w in weights.values():
+            running += w
+            cum.append(running)
+
+        self.chars: List[str] = list(weights)
+        self._cum = cum
+        self._total = total
+
+    def __len__(self) -> int:
+        return len(self.chars)
+
+    def sample(self, rng=random) -> str:
+        return self.chars[bisect_right(self._cum, rng.random() * self._total)]
+
+
+class FenwickSampler:
+    """Draw keys of `weights` in proportion to their values, with updates.
+
+    Parameters
+    - weights (Mapping[str, int]): Candidate keys mapped to their
+      non-negative counts. At least one count must be positive.
+
+    Behavior
+    - Keeps the weights in a Fenwick (binary indexed) tree: `add(key,
+      delta)` changes a weight, or appends a new key, in O(log k), and
+      each draw descends the tree in O(log k).
+    - Draws exactly what a `CumulativeSampler` over the same weights, in
+      the same key order (new keys last), would draw from the same `rng`.
+    """
+
+    __slots__ = ("chars", "_index", "_weights", "_tree", "_total")
+
+    def __init__(self, weights: Mapping[str, int]) -> None:
+        self._total = _check_weights(weights)
+        self.chars: List[str] = list(weights)
+        self._index = {key: i for i, key in enumerate(self.chars)}
+        self._weights = list(weights.values())
+        tree = [0] + self._weights
+        size = len(tree) - 1
+        for i in range(1, size + 1):
+            parent = i + (i & -i)
+            if parent <= size:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def __len__(self) -> int:
+        return len(self.chars)
+
+    def _prefix(self, i: int) -> int:
+        # sum of the first i weights
+        tree, total = self._tree, 0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def add(self, key: str, delta: int) -> None:
+        """Add `delta` to the weight of `key`, appending `key` if new."""
+
+        i = self._index.get(key)
+        if i is None:
+            i = self._index[key] = len(self.chars)
+            self.chars.append(key)
+            self._weights.append(0)
+            # a new node covers the weights (i+1 - lowbit(i+1), i]
+            pos = i + 1
+            self._tree.append(self._prefix(pos - 1) - self._prefix(pos - (pos & -pos)))
+        if self._weights[i] + delta < 0 or self._total + delta <= 0:
+            raise ValueError("weights must stay non-negative with a positive sum")
+        self._weights[i] += delta
+        self._total += delta
+        tree, size = self._tree, len(self._tree) - 1
+        pos = i + 1
+        while pos <= size:
+            tree[pos] += delta
+            pos += pos & -pos
+
+    def sample(self, rng=random) -> str:
+        # the last key whose preceding total is <= x, as bisect_right on
+        # the running totals; sums stay integers so ties resolve the same
+        x = rng.random() * self._total
+        tree, size = self._tree, len(self._tree) - 1
+        pos = acc = 0
+        step = 1 << size.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= size and acc + tree[nxt] <= x:
+                pos = nxt
+                acc += tree[nxt]
+            step >>= 1
+        return self.chars[pos]
+
+
+class TruncatedSampler:
+    """Draw keys of `weights` after temperature, top-k and top-p shaping.
+
+    Parameters
+    - weights (Mapping[str, int]): Candidate characters mapped to their
+      non-negative counts. At least one count must be positive.
+    - temperature (float): Weights become `w ** (1 / temperature)`; below 1
+      sharpens the distribution, above 1 flattens it. 0 always returns the
+      most frequent character. Defaults to 1 (unchanged).
+    - top_k (int, optional): Keep only the `top_k` most frequent characters.
+    - top_p (float, optional): Keep the smallest set of most frequent
+      characters whose (temperature-adjusted) probability reaches `top_p`.
+
+    Behavior
+    - Characters are sorted by descending weight (ties by character) and
+      cumulative-summed once; the cuts are binary searches over those sums,
+      and each draw bisects only the kept prefix.
+    - Raises `ValueError` for invalid weights or settings (see
+      `check_decoding`).
+    """
+
+    __slots__ = ("chars", "_cum", "_total")
+
+    def __init__(
+        self,
+        weights: Mapping[str, int],
+        temperature: float = 1.0,
+        top_k: Optional[int] = None,
+        top_p: Optional[float] = None,
+    ) -> None:
+        _check_weights(weights)
+        check_decoding(temperature, top_k, top_p)
+        ranked = sorted((item for item in weights.items() if item[1] > 0), key=lambda item: (-item[1], item[0]))
+        if temperature == 0:
+            ranked = ranked[:1]
+        if top_k is not None:
+            ranked = ranked[:top_k]
+
+        # relative to the largest weight, so small temperatures cannot overflow
+        top_weight = ranked[0][1]
+        cum = []
+        running = 0.0
+        for _, w in ranked:
+            running += w if temperature in (0, 1) else (w / top_weight) ** (1.0 / temperature)
+            cum.append(running)
+        keep = len(cum)
+        if top_p is not None and top_p < 1:
+            # rounding must not drop the character that reaches top_p
+            keep = min(bisect_left(cum, top_p * running * (1 - 1e-12)) + 1, keep)
+
+        self.chars: List[str] = [ch for ch, _ in ranked[:keep]]
+        self._cum = cum[:keep]
+        self._total = self._cum[-1]
+
+    def __len__(self) -> int:
+        return len(self.chars)
+
+    def sample(self, rng=random) -> str:
+        return self.chars[bisect_right(self._cum, rng.random() * self._total)]
+
+
+def check_decoding(temperature: float = 1.0, top_k: Optional[int] = None, top_p: Optional[float] = None) -> None:
+    """Raise `ValueError` unless `temperature >= 0`, `top_k` is None or a
+    positive integer and `top_p` is None or in (0, 1]."""
+
+    if temperature < 0:
+        raise ValueError("temperature must be non-negative")
+    if top_k is not None and (not isinstance(top_k, int) or top_k <= 0):
+        raise ValueError("top_k must be a positive integer")
+    if top_p is not None and not 0 < top_p <= 1:
+        raise ValueError("top_p must be in (0, 1]")
+
+
+if __name__ == "__main__":
+    weights = {"d": 2, "c": 1}
+    alias = AliasSampler(weights)
+    cumulative = CumulativeSampler(weights)
+
+    print("Weights:", weights)
+    print("Alias draws:     ", "".join(alias.sample() for _ in range(30)))
+    print("Cumulative draws:", "".join(cumulative.sample() for _ in range(30)))
+    print("Greedy draws:    ", "".join(TruncatedSampler(weights, temperature=0).sample() for _ in range(30)))
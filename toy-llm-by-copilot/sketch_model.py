@@ -0,0 +1,301 @@
+"""Approximate n-gram model with a fixed memory budget
+
+For corpora whose exact n-gram table would not fit in RAM, `SketchModel`
+trades exactness for predictable memory:
+
+- a `CountMinSketch` estimates the frequency of every n-gram,
+- a `SpaceSaving` summary keeps the heaviest contexts, and each kept
+  context has its own small `SpaceSaving` of its top-K next characters.
+
+Both structures are sized from one memory budget (e.g. `"256MB"`) and
+report error bounds; generation samples only from what they keep.
+"""
+
+from array import array
+import hashlib
+import heapq
+import math
+import random
+import re
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from count_char_n_grams_stream import DEFAULT_CHUNK_SIZE, Source, iter_overlapping_chunks
+from sampler import AliasSampler, CumulativeSampler
+
+
+_UNITS = {"": 1, "B": 1, "KB": 1 << 10, "MB": 1 << 20, "GB": 1 << 30, "TB": 1 << 40}
+# rough CPython cost of one kept context: its key, the dict slots and heap
+# entries of the context summary, and an empty per-context summary
+CONTEXT_BYTES = 400
+# rough cost of one tracked next character inside a context summary
+ENTRY_BYTES = 160
+
+
+def parse_memory_budget(text: str) -> int:
+    """Parse a size such as `"256MB"`, `"1.5GB"` or `"65536"` into bytes.
+
+    Units are binary (1 KB = 1024 bytes). Raises `ValueError` for anything
+    else.
+    """
+
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?B?)\s*", text.upper())
+    if not match:
+        raise ValueError(f"invalid memory budget: {text!r}")
+    value, unit = match.groups()
+    if unit and not unit.endswith("B"):
+        unit += "B"
+    size = int(float(value) * _UNITS[unit])
+    if size <= 0:
+        raise ValueError("memory budget must be positive")
+    return size
+
+
+class CountMinSketch:
+    """Frequency estimates for arbitrarily many keys in fixed memory.
+
+    Parameters
+    - width (int): Counters per row; the additive error is about
+      `e / width` times the total count.
+    - depth (int): Number of rows; the error bound fails with probability
+      at most `exp(-depth)`.
+
+    Behavior
+    - `estimate(key)` never underestimates.
+    - Each string key is hashed once with BLAKE2b; the row positions are
+      derived from its two halves (`h1 + row * h2`), so estimates are the
+      same in every process.
+    """
+
+    def __init__(self, width: int, depth: int = 4) -> None:
+        if width <= 0 or depth <= 0:
+            raise ValueError("width and depth must be positive")
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self._rows = [array("Q", bytes(8 * width)) for _ in range(depth)]
+
+    def nbytes(self) -> int:
+        return 8 * self.width * self.depth
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        width = self.width
+        return [(h1 + i * h2) % width for i in range(self.depth)]
+
+    def add(self, key: str, count: int = 1) -> None:
+        self.total += count
+        for row, pos in zip(self._rows, self._positions(key)):
+            row[pos] += count
+
+    def estimate(self, key: str) -> int:
+        return min(row[pos] for row, pos in zip(self._rows, self._positions(key)))
+
+    @property
+    def epsilon(self) -> float:
+        return math.e / self.width
+
+    @property
+    def delta(self) -> float:
+        return math.exp(-self.depth)
+
+
+class SpaceSaving:
+    """Approximate top-`capacity` heavy hitters of a stream (Space-Saving).
+
+    Behavior
+    - Keeps at most `capacity` items. A new item arriving when full
+      replaces the item with the smallest count and inherits that count as
+      its possible overestimate (`errors[item]`), so every kept count is at
+      most `errors[item]` too high and any item with true frequency above
+      `total / capacity` is kept.
+    - The minimum is found with a lazily cleaned heap, O(log capacity)
+      amortized per update.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.total = 0
+        self.counts: Dict[Hashable, int] = {}
+        self.errors: Dict[Hashable, int] = {}
+        self._heap: List[Tuple[int, Hashable]] = []
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def __contains__(self, item: object) -> bool:
+        return item in self.counts
+
+    def add(self, item: Hashable, count: int = 1) -> Optional[Hashable]:
+        """Count `item`; return the item it evicted, if any."""
+
+        self.total += count
+        counts = self.counts
+        evicted = None
+        if item in counts:
+            counts[item] += count
+        elif len(counts) < self.capacity:
+            counts[item] = count
+            self.errors[item] = 0
+        else:
+            heap = self._heap
+            while True:
+                c, candidate = heapq.heappop(heap)
+                if counts.get(candidate) == c:
+                    break
+            del counts[candidate]
+            del self.errors[candidate]
+            counts[item] = c + count
+            self.errors[item] = c
+            evicted = candidate
+        heapq.heappush(self._heap, (counts[item], item))
+        if len(self._heap) > 4 * self.capacity + 64:
+            # drop stale entries left behind by increments
+            self._heap = [(c, key) for key, c in counts.items()]
+            heapq.heapify(self._heap)
+        return evicted
+
+    def max_error(self) -> int:
+        """Upper bound on how much any kept count overestimates."""
+
+        return self.total // self.capacity
+
+
+class SketchModel:
+    """Bounded-memory next-character model built from a stream.
+
+    Parameters
+    - n (int): The n-gram length.
+    - memory_budget (int): Approximate bytes for all counting structures.
+    - top_k (int): Next characters kept per context. Defaults to 16.
+    - depth (int): Count-min sketch rows. Defaults to 4.
+
+    Behavior
+    - Half the budget goes to the count-min sketch, half to the context
+      summaries (using the `CONTEXT_BYTES`/`ENTRY_BYTES` estimates).
+    - `next_letter_frequency`, `sampler` and `random_context` answer from
+      the kept contexts; a next character's weight is the smaller of its
+      Space-Saving count and its count-min estimate, both of which only
+      ever overestimate.
+    """
+
+    def __init__(self, n: int, memory_budget: int, top_k: int = 16, depth: int = 4) -> None:
+        if not isinstance(n, int):
+            raise TypeError("n must be an integer")
+        if n <= 0:
+            raise ValueError("n must be a positive integer")
+        half = memory_budget // 2
+        width = half // (8 * depth)
+        max_contexts = half // (CONTEXT_BYTES + top_k * ENTRY_BYTES)
+        if width <= 0 or max_contexts <= 0:
+            raise ValueError(f"memory budget of {memory_budget} bytes is too small")
+        self.n = n
+        self.top_k = top_k
+        self.sketch = CountMinSketch(width, depth)
+        self.contexts = SpaceSaving(max_contexts)
+        self.next_chars: Dict[str, SpaceSaving] = {}
+        self._samplers: Dict[str, AliasSampler] = {}
+        self._context_sampler: Optional[CumulativeSampler] = None
+
+    def add_text(self, text: str) -> None:
+        """Count every n-gram lying entirely inside `text`."""
+
+        n = self.n
+        sketch, contexts, next_chars = self.sketch, self.contexts, self.next_chars
+        for i in range(len(text) - n + 1):
+            ngram = text[i:i + n]
+            context = ngram[:-1]
+            sketch.add(ngram)
+            evicted = contexts.add(context)
+            if evicted is not None:
+                del next_chars[evicted]
+            summary = next_chars.get(context)
+            if summary is None:
+                summary = next_chars[context] = SpaceSaving(self.top_k)
+            summary.add(ngram[-1])
+        self._samplers.clear()
+        self._context_sampler = None
+
+    @classmethod
+    def from_stream(
+        cls,
+        source: Source,
+        n: int = 3,
+        memory_budget: int = 256 << 20,
+        top_k: int = 16,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> "SketchModel":
+        """Train on a path or text file object, one chunk at a time."""
+
+        model = cls(n, memory_budget, top_k=top_k)
+        for buf in iter_overlapping_chunks(source, n, chunk_size):
+            model.add_text(buf)
+        return model
+
+    def __len__(self) -> int:
+        return len(self.contexts)
+
+    def __contains__(self, context: object) -> bool:
+        return context in self.contexts
+
+    def next_letter_frequency(self, prompt: str) -> Dict[str, int]:
+        """Return estimated next-character counts for a kept context."""
+
+        summary = self.next_chars.get(prompt)
+        if summary is None:
+            return {}
+        sketch = self.sketch
+        return {ch: min(cnt, sketch.estimate(prompt + ch)) for ch, cnt in summary.counts.items()}
+
+    def sampler(self, prompt: str) -> Optional[AliasSampler]:
+        sampler = self._samplers.get(prompt)
+        if sampler is None:
+            dist = self.next_letter_frequency(prompt)
+            if not dist:
+                return None
+            sampler = self._samplers[prompt] = AliasSampler(dist)
+        return sampler
+
+    def random_context(self, rng=random) -> Optional[str]:
+        if not self.contexts.counts:
+            return None
+        if self._context_sampler is None:
+            self._context_sampler = CumulativeSampler(self.contexts.counts)
+        return self._context_sampler.sample(rng)
+
+    def error_bounds(self) -> Dict[str, float]:
+        """Return the guarantees of the current summaries.
+
+        - `total`: n-grams counted.
+        - `sketch_epsilon`, `sketch_delta`: with probability at least
+          `1 - sketch_delta` an n-gram estimate exceeds its true count by
+          at most `sketch_epsilon * total` (`sketch_max_error`).
+        - `context_max_error`: bound on the overestimate of a kept
+          context's count; contexts more frequent than this are kept.
+        - `next_char_max_error`: the largest per-context overestimate of a
+          kept next character's count.
+        """
+
+        total = self.sketch.total
+        next_char_error = max((s.max_error() for s in self.next_chars.values()), default=0)
+        return {
+            "total": total,
+            "sketch_epsilon": self.sketch.epsilon,
+            "sketch_delta": self.sketch.delta,
+            "sketch_max_error": self.sketch.epsilon * total,
+            "context_max_error": self.contexts.max_error(),
+            "next_char_max_error": next_char_error,
+        }
+
+
+if __name__ == "__main__":
+    import io
+
+    text = "Lee has a dog. Jane has a dog. Soomi has a cat. " * 20
+    model = SketchModel.from_stream(io.StringIO(text), n=4, memory_budget=parse_memory_budget("64KB"), top_k=4)
+    print("Kept contexts:", len(model), "of at most", model.contexts.capacity)
+    print("Next-letter frequencies:", model.next_letter_frequency(" a "))
+    print("Error bounds:", model.error_bounds())
@@ -0,0 +1,281 @@
+"""Variable-length (infinity-gram) context model over a suffix array
+
+Provides `SuffixArrayModel`, which indexes the whole training corpus once
+instead of fixing `n` at training time. To predict the next character it
+finds the longest suffix of the current output that occurs in the corpus
+(with something after it) and reads the next-character distribution from
+that suffix's range in the suffix array, located by binary search.
+
+The index is the corpus encoded over its vocabulary, the suffix array and
+an LCP array capped at 255, about 6-7 bytes per corpus character whatever
+the context length. `save(path)` writes it to one file that `load(path)`
+maps back into memory.
+"""
+
+import mmap
+import random
+import struct
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from count_char_n_grams_numpy import encode_text
+from sampler import CumulativeSampler
+
+
+MAGIC = b"TLSA"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIQ")
+MAX_LCP = 255
+# continuations a context needs before generation trusts it: a context seen
+# once has one continuation, so always matching it copies the corpus
+MIN_COUNT = 2
+# characters of corpus text that start generation
+SEED_LENGTH = 3
+
+
+def build_suffix_array(ids: np.ndarray) -> np.ndarray:
+    """Return the suffix array of `ids` by prefix doubling.
+
+    Each round sorts the suffixes by the pair (rank of the first k
+    symbols, rank of the next k symbols) packed into one integer, so the
+    number of rounds is logarithmic in the longest repeated substring.
+    """
+
+    length = len(ids)
+    index_dtype = np.int32 if length < 2 ** 31 else np.int64
+    if length == 0:
+        return np.zeros(0, dtype=index_dtype)
+    rank = ids.astype(np.int64)
+    k = 1
+    while True:
+        second = np.zeros(length, dtype=np.int64)
+        second[:length - k] = rank[k:] + 1
+        key = rank * (length + 1) + second
+        sa = np.argsort(key, kind="stable")
+        sorted_key = key[sa]
+        new_rank = np.empty(length, dtype=np.int64)
+        new_rank[sa] = np.concatenate(([0], np.cumsum(sorted_key[1:] != sorted_key[:-1])))
+        rank = new_rank
+        if rank.max() == length - 1 or k >= length:
+            return sa.astype(index_dtype)
+        k *= 2
+
+
+def build_lcp(ids: np.ndarray, sa: np.ndarray, cap: int = MAX_LCP) -> np.ndarray:
+    """Return `lcp[i]`, the common prefix length of suffixes `sa[i-1]` and
+    `sa[i]` (0 for `i == 0`), capped at `cap`.
+
+    Compares all adjacent pairs one offset at a time, dropping pairs as
+    soon as they differ, so the work is proportional to the summed LCPs.
+    """
+
+    length = len(ids)
+    lcp = np.zeros(length, dtype=np.uint8 if cap <= 255 else np.uint32)
+    active = np.arange(1, length)
+    left = sa[:-1].astype(np.int64)
+    right = sa[1:].astype(np.int64)
+    for offset in range(cap):
+        a = left + offset
+        b = right + offset
+        inside = (a < length) & (b < length)
+        same = np.zeros(len(active), dtype=bool)
+        same[inside] = ids[a[inside]] == ids[b[inside]]
+        if not same.any():
+            break
+        active, left, right = active[same], left[same], right[same]
+        lcp[active] += 1
+    return lcp
+
+
+class SuffixArrayModel:
+    """Longest-match next-character model over a suffix array.
+
+    Parameters
+    - vocab (str): The sorted corpus vocabulary.
+    - ids (np.ndarray): The corpus as indices into `vocab`.
+    - sa (np.ndarray): The suffix array of `ids`.
+    - lcp (np.ndarray): The capped LCP array of `sa`.
+
+    Attributes
+    - max_context (int): The longest context worth matching: one more than
+      the longest repeated substring (capped at 255). Any longer match
+      occurs at most once and continues the same way.
+    - n (int): `max_context + 1`, so generation code that keeps the last
+      `n-1` characters keeps every character a match can use.
+    - min_count (int): Fewest continuations a context must have for
+      `next_letter_frequency` and `sampler` to use it. With the default
+      of 2, generation backs off from contexts seen only once instead of
+      reproducing the corpus verbatim.
+
+    Behavior
+    - `lookup(history)` binary-searches on the match length; each probe
+      locates the suffix-array range of one candidate suffix of `history`
+      by binary search over the corpus, comparing ids (their order is the
+      character order), so the corpus is never decoded to a `str`.
+    - `next_letter_frequency`, `sampler` and `random_context` make it usable
+      wherever an `NGramModel` is expected.
+    """
+
+    def __init__(self, vocab: str, ids: np.ndarray, sa: np.ndarray, lcp: np.ndarray) -> None:
+        self.vocab = vocab
+        self.ids = ids
+        self.sa = sa
+        self.lcp = lcp
+        self._ids_of = {ch: i for i, ch in enumerate(vocab)}
+        longest_repeat = int(lcp.max()) if len(lcp) else 0
+        self.max_context = min(longest_repeat + 1, MAX_LCP)
+        self.n = self.max_context + 1
+        self.min_count = MIN_COUNT
+        self._mm: Optional[mmap.mmap] = None
+        self._unigrams: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_text(cls, text: str) -> "SuffixArrayModel":
+        """Encode `text` and build its suffix and LCP arrays."""
+
+        vocab, ids = encode_text(text)
+        ids = ids.astype(np.uint8 if len(vocab) <= 256 else np.uint16 if len(vocab) <= 65536 else np.uint32)
+        sa = build_suffix_array(ids)
+        return cls(vocab, ids, sa, build_lcp(ids, sa))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def nbytes(self) -> int:
+        """Return the size of the index arrays in bytes."""
+
+        return self.ids.nbytes + self.sa.nbytes + self.lcp.nbytes
+
+    def _bound(self, pattern: list, strict: bool) -> int:
+        # first suffix whose leading len(pattern) ids are >= pattern
+        # (> pattern when strict)
+        ids, sa, k = self.ids, self.sa, len(pattern)
+        lo, hi = 0, len(sa)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = int(sa[mid])
+            head = ids[start:start + k].tolist()
+            if head < pattern or (strict and head == pattern):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def suffix_range(self, pattern: str) -> Tuple[int, int]:
+        """Return the range `[lo, hi)` of suffix-array rows starting with
+        `pattern`."""
+
+        encoded = [self._ids_of.get(ch) for ch in pattern]
+        if None in encoded:
+            # a character the corpus lacks: nothing starts with it
+            return 0, 0
+        lo = self._bound(encoded, strict=False)
+        return lo, self._bound(encoded, strict=True)
+
+    def _continuations(self, k: int, lo: int, hi: int) -> np.ndarray:
+        following = self.sa[lo:hi].astype(np.int64) + k
+        following = following[following < len(self.ids)]
+        return np.bincount(self.ids[following], minlength=len(self.vocab))
+
+    def lookup(self, history: str, min_count: int = 1) -> Tuple[str, Dict[str, int]]:
+        """Return `(context, distribution)` for the longest suffix of
+        `history` that occurs in the corpus followed by another character
+        at least `min_count` times.
+
+        The context is empty (and the distribution is the corpus character
+        frequencies) when not even the last character of `history` matches.
+        """
+
+        if self._unigrams is None:
+            self._unigrams = np.bincount(self.ids, minlength=len(self.vocab))
+        best = ("", self._unigrams)
+        lo_k, hi_k = 1, min(len(history), self.max_context)
+        while lo_k <= hi_k:
+            k = (lo_k + hi_k) // 2
+            context = history[len(history) - k:]
+            lo, hi = self.suffix_range(context)
+            counts = self._continuations(k, lo, hi) if lo < hi else None
+            if counts is not None and counts.sum() >= min_count:
+                best = (context, counts)
+                lo_k = k + 1
+            else:
+                hi_k = k - 1
+        context, counts = best
+        nonzero = np.flatnonzero(counts)
+        return context, {self.vocab[i]: int(counts[i]) for i in nonzero.tolist()}
+
+    def next_letter_frequency(self, prompt: str) -> Dict[str, int]:
+        """Return the next-character frequencies after the longest match
+        with at least `min_count` continuations."""
+
+        return self.lookup(prompt, self.min_count)[1]
+
+    def sampler(self, prompt: str) -> Optional[CumulativeSampler]:
+        """Return a sampler over the longest match's continuations."""
+
+        dist = self.next_letter_frequency(prompt)
+        return CumulativeSampler(dist) if dist else None
+
+    def random_context(self, rng=random) -> Optional[str]:
+        """Return `SEED_LENGTH` corpus characters from a random position.
+
+        The seed is short on purpose: the context then grows from the
+        generated text, up to `max_context` characters.
+        """
+
+        if not len(self.ids):
+            return None
+        length = min(SEED_LENGTH, self.max_context)
+        start = int(rng.random() * max(len(self.ids) - length, 1))
+        return "".join(self.vocab[i] for i in self.ids[start:start + length].tolist())
+
+    def save(self, path: str) -> None:
+        """Write the index to `path` for `SuffixArrayModel.load`."""
+
+        vocab = self.vocab.encode("utf-32-le")
+        header = HEADER.pack(MAGIC, VERSION, self.ids.itemsize, len(self.vocab), len(self.ids))
+        with open(path, "wb") as f:
+            f.write(header)
+            f.write(vocab)
+            f.write(np.ascontiguousarray(self.ids, dtype=self.ids.dtype.newbyteorder("<")).tobytes())
+            f.write(np.ascontiguousarray(self.sa, dtype="<i8" if self.sa.itemsize == 8 else "<i4").tobytes())
+            f.write(np.ascontiguousarray(self.lcp, dtype=np.uint8).tobytes())
+
+    @classmethod
+    def load(cls, path: str) -> "SuffixArrayModel":
+        """Map an index written by `save` back into memory."""
+
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, id_size, vocab_len, length = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC:
+            mm.close()
+            raise ValueError(f"{path} is not a suffix array index")
+        if version != VERSION:
+            mm.close()
+            raise ValueError(f"{path} has unsupported index version {version}")
+        sa_size = 4 if length < 2 ** 31 else 8
+        pos = HEADER.size
+        vocab = mm[pos:pos + 4 * vocab_len].decode("utf-32-le")
+        pos += 4 * vocab_len
+        if len(mm) != pos + length * (id_size + sa_size + 1):
+            mm.close()
+            raise ValueError(f"{path} is truncated or corrupt")
+        ids = np.frombuffer(mm, dtype=f"<u{id_size}", count=length, offset=pos)
+        pos += length * id_size
+        sa = np.frombuffer(mm, dtype=f"<i{sa_size}", count=length, offset=pos)
+        pos += length * sa_size
+        lcp = np.frombuffer(mm, dtype=np.uint8, count=length, offset=pos)
+        model = cls(vocab, ids, sa, lcp)
+        model._mm = mm
+        return model
+
+
+if __name__ == "__main__":
+    text = "Lee has a dog. Jane has a dog. Soomi has a cat."
+    model = SuffixArrayModel.from_text(text)
+    print("Corpus:", len(model), "chars,", model.nbytes(), "index bytes, max context", model.max_context)
+    for history in ("Jane has a ", "Soomi has", "xyz"):
+        context, dist = model.lookup(history)
+        print(f"History {history!r}: context {context!r} -> {dist}")
@@ -0,0 +1,160 @@
+"""Sweep n: held-out quality, memory and generation speed per order
+
+Choosing `n` used to mean one training run per candidate. `sweep` instead
+counts every order `1..max_n` of the training text once (one encoding of
+the text, then one vectorized `np.unique` per order, via
+`Scorer.from_text`) and evaluates each order in parallel worker
+processes:
+
+- `perplexity` / `bits_per_char`: held-out score with `Scorer` smoothing,
+- `unique_ngrams`, `packed_kb`: table size, as `CompactCounts` would
+  store it (8-byte code + 4-byte count per n-gram),
+- `index_s`: time to index the shared counts into an `NGramModel`,
+- `us_per_char`: generation latency of that model.
+
+Every worker receives the counts once (pool initializer); a task only
+carries its order. Run from the `toy-llm-by-copilot` directory:
+
+    python sweep.py --file frankenstein.txt --max-n 8 --workers 4
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import os
+import random
+import time
+from typing import Dict, List, Optional
+
+from generation import MaxChars, iter_generate
+from ngram_model import NGramModel
+from perplexity import SMOOTHINGS, Scorer
+
+
+# bytes per distinct n-gram in CompactCounts: uint64 code + uint32 count
+PACKED_ENTRY_BYTES = 12
+
+_worker_scorer: Optional[Scorer] = None
+_worker_heldout = ""
+
+
+def split_heldout(text: str, fraction: float = 0.1):
+    """Return `(train, heldout)`, holding out the last `fraction` of `text`."""
+
+    if not 0 < fraction < 1:
+        raise ValueError("fraction must be between 0 and 1")
+    cut = len(text) - int(len(text) * fraction)
+    return text[:cut], text[cut:]
+
+
+def _init_worker(scorer: Scorer, heldout: str) -> None:
+    global _worker_scorer, _worker_heldout
+    _worker_scorer, _worker_heldout = scorer, heldout
+
+
+def _evaluate(args: tuple) -> Dict[str, float]:
+    n, smoothing, k, chars, seed = args
+    scorer = _worker_scorer.truncated(n)
+    result = scorer.score(_worker_heldout, smoothing, k)
+
+    start = time.perf_counter()
+    model = NGramModel.from_counts(scorer.ngram_counts(), n)
+    index_s = time.perf_counter() - start
+
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    for _ in iter_generate(model, stop=[MaxChars(chars)], rng=rng):
+        pass
+    us_per_char = (time.perf_counter() - start) / chars * 1e6
+
+    unique = len(scorer.grams[-1][0])
+    return {
+        "n": n,
+        "perplexity": result.perplexity,
+        "bits_per_char": result.cross_entropy,
+        "unique_ngrams": unique,
+        "packed_kb": unique * PACKED_ENTRY_BYTES / 1024,
+        "index_s": index_s,
+        "us_per_char": us_per_char,
+    }
+
+
+def sweep(
+    text: str,
+    heldout: str,
+    max_n: int = 8,
+    workers: int = 1,
+    smoothing: str = "backoff",
+    k: float = 1.0,
+    chars: int = 2000,
+    seed: int = 0,
+) -> List[Dict[str, float]]:
+    """Evaluate every order `1..max_n` trained on `text` against `heldout`.
+
+    Returns
+    - list[dict]: One row per n, in order (keys as in the module docstring).
+      The first row also carries `count_s`, the time of the shared count.
+
+    Behavior
+    - Raises the usual `TypeError`/`ValueError` for an invalid `max_n`, and
+      `ValueError` when `workers` is not positive.
+    - Rows do not depend on `workers`, except for the timings.
+    """
+
+    if workers <= 0:
+        raise ValueError("workers must be a positive integer")
+    start = time.perf_counter()
+    scorer = Scorer.from_text(text, max_n)
+    count_s = time.perf_counter() - start
+
+    tasks = [(n, smoothing, k, chars, seed) for n in range(1, max_n + 1)]
+    if workers == 1:
+        _init_worker(scorer, heldout)
+        rows = [_evaluate(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(scorer, heldout)) as executor:
+            rows = list(executor.map(_evaluate, tasks))
+    rows[0]["count_s"] = count_s
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare n-gram orders on held-out text")
+    parser.add_argument("--file", "-f", default="frankenstein.txt", help="Training text (default: frankenstein.txt)")
+    parser.add_argument("--eval", "-e", help="Held-out text file (default: the last --holdout of --file)")
+    parser.add_argument("--holdout", type=float, default=0.1, help="Fraction held out without --eval (default: 0.1)")
+    parser.add_argument("--max-n", type=int, default=8, help="Largest n to evaluate (default: 8)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (default: all CPUs)")
+    parser.add_argument("--smoothing", choices=SMOOTHINGS, default="backoff", help="Smoothing (default: backoff)")
+    parser.add_argument("--k", type=float, default=1.0, help="Add-k pseudo-count (default: 1)")
+    parser.add_argument("--chars", type=int, default=2000, help="Characters generated per n (default: 2000)")
+    parser.add_argument("--seed", type=int, default=0, help="Generation seed (default: 0)")
+    args = parser.parse_args()
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    with open(args.file, "r", encoding="utf-8") as f:
+        text = f.read()
+    if args.eval:
+        with open(args.eval, "r", encoding="utf-8") as f:
+            heldout = f.read()
+    else:
+        text, heldout = split_heldout(text, args.holdout)
+
+    start = time.perf_counter()
+    rows = sweep(text, heldout, args.max_n, args.workers, args.smoothing, args.k, args.chars, args.seed)
+    total_s = time.perf_counter() - start
+
+    print(f"Train: {len(text)} chars, held out: {len(heldout)} chars, smoothing: {args.smoothing}, k: {args.k}")
+    print(f"{'n':>3}{'perplexity':>12}{'bits/char':>11}{'n-grams':>10}{'packed KB':>11}{'index ms':>10}{'us/char':>9}")
+    for row in rows:
+        print(
+            f"{row['n']:>3}{row['perplexity']:>12.3f}{row['bits_per_char']:>11.3f}{row['unique_ngrams']:>10}"
+            f"{row['packed_kb']:>11.1f}{row['index_s'] * 1e3:>10.1f}{row['us_per_char']:>9.2f}"
+        )
+    best = min(rows, key=lambda row: row["perplexity"])
+    print(f"Best n: {best['n']} (perplexity {best['perplexity']:.3f})")
+    print(f"Shared count of orders 1..{args.max_n}: {rows[0]['count_s']:.3f}s, whole sweep: {total_s:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import unittest
+
+from backoff_model import BackoffModel, count_char_n_grams_multi
+from count_char_n_grams import count_char_n_grams
+from generate_next_char import generate_next_char
+
+
+TEXT = "Lee has a dog. Jane has a dog. Soomi has a cat."
+
+
+class TestCountCharNGramsMulti(unittest.TestCase):
+    def test_matches_per_order_counts(self):
+        multi = count_char_n_grams_multi(TEXT, 6)
+        self.assertEqual(sorted(multi), [1, 2, 3, 4, 5, 6])
+        for k, counts in multi.items():
+            expected = count_char_n_grams(TEXT, k)
+            self.assertEqual(counts, expected, msg=k)
+            self.assertEqual(list(counts), list(expected), msg=k)
+
+    def test_invalid_max_n(self):
+        with self.assertRaises(ValueError):
+            count_char_n_grams_multi(TEXT, 0)
+
+
+class TestBackoffModel(unittest.TestCase):
+    def setUp(self):
+        self.model = BackoffModel.from_text(TEXT, max_n=6)
+
+    def test_full_context(self):
+        order, context, _ = self.model.lookup("has a ")
+        self.assertEqual((order, context), (6, "as a "))
+        self.assertEqual(self.model.next_letter_frequency("has a "), {"d": 2, "c": 1})
+
+    def test_backs_off_to_longest_seen_suffix(self):
+        order, context, _ = self.model.lookup("zzz a ")
+        self.assertEqual((order, context), (4, " a "))
+        self.assertEqual(self.model.next_letter_frequency("zzz a "), {"d": 2, "c": 1})
+
+    def test_unseen_everything_uses_unigrams(self):
+        order, context, dist = self.model.lookup("zzzzz")
+        self.assertEqual((order, context), (1, ""))
+        self.assertEqual(dist, count_char_n_grams(TEXT, 1))
+        self.assertIn(generate_next_char("zzzzz", self.model), dist)
+
+    def test_stupid_backoff_score(self):
+        self.assertAlmostEqual(self.model.score("has a ", "d"), 2 / 3)
+        self.assertAlmostEqual(self.model.score("zzz a ", "d"), 0.4 * 0.4 * 2 / 3)
+        self.assertEqual(self.model.score("zzzzz", "#"), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
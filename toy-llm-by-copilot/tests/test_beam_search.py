@@ -0,0 +1,99 @@
+import math
+import unittest
+
+from beam_search import ContextCache, beam_search, most_likely
+from ngram_model import NGramModel
+
+
+TEXT = "Lee has a dog. Jane has a dog. Soomi has a cat."
+
+
+def exhaustive(model, prompt, length):
+    """Every continuation of `length` characters with its log-probability."""
+
+    beams = [("", 0.0)]
+    for _ in range(length):
+        step = []
+        for text, lp in beams:
+            dist = model.next_letter_frequency((prompt + text)[-(model.n - 1):])
+            total = sum(dist.values())
+            step.extend((text + ch, lp + math.log(cnt / total)) for ch, cnt in dist.items())
+        beams = step
+    return sorted(beams, key=lambda beam: -beam[1])
+
+
+class TestBeamSearch(unittest.TestCase):
+    def setUp(self):
+        self.model = NGramModel.from_text(TEXT, n=3)
+
+    def test_wide_beam_is_exhaustive(self):
+        expected = exhaustive(self.model, "ha", 6)
+        beams = beam_search(self.model, "ha", 6, beam_width=len(expected))
+        self.assertEqual(len(beams), len(expected))
+        for beam, (text, lp) in zip(beams, expected):
+            self.assertAlmostEqual(beam.log_prob, lp)
+        self.assertEqual({b.text for b in beams}, {text for text, _ in expected})
+
+    def test_beam_finds_best(self):
+        best_text, best_lp = exhaustive(self.model, "Ja", 5)[0]
+        beam = beam_search(self.model, "Ja", 5, beam_width=8)[0]
+        self.assertEqual(beam.text, best_text)
+        self.assertAlmostEqual(beam.log_prob, best_lp)
+
+    def test_short_prompt(self):
+        # shorter than n-1: the whole history is the context
+        model = NGramModel.from_text("abz qbz qby qbx", n=4)
+        self.assertEqual(model.next_letter_frequency("ab"), {"z": 1})
+        self.assertEqual([b.text for b in beam_search(model, "ab", 1, 2)], ["z"])
+        self.assertEqual(most_likely(model, "a", 2), "bz")
+
+    def test_most_likely(self):
+        self.assertEqual(most_likely(self.model, "Ja", 10), "ne has a d")
+        self.assertEqual(most_likely(self.model, "Ja", 20, stop_chars="."), "ne has a dog.")
+        self.assertEqual(most_likely(self.model, "Ja", 0), "")
+
+    def test_stop_chars_and_dead_ends(self):
+        beams = beam_search(self.model, "a ", 12, beam_width=4, stop_chars=".")
+        for beam in beams:
+            self.assertTrue(beam.finished)
+            self.assertTrue(beam.text.endswith("."))
+        # the end of the corpus has no continuation
+        model = NGramModel.from_text("abcd", n=2)
+        beams = beam_search(model, "b", 5)
+        self.assertEqual(beams, [("cd", 0.0, True)])
+
+    def test_shared_cache(self):
+        cache = ContextCache(self.model)
+        stats = {}
+        beam_search(self.model, "ha", 8, beam_width=4, cache=cache, stats=stats)
+        self.assertEqual(cache.hits + cache.misses, stats["expanded"])
+        misses = cache.misses
+        beam_search(self.model, "ha", 8, beam_width=4, cache=cache)
+        self.assertEqual(cache.misses, misses)
+        # the second search is answered from the cache alone
+        self.assertGreaterEqual(cache.hit_rate, 0.5)
+
+    def test_lru_eviction(self):
+        cache = ContextCache(self.model, maxsize=2)
+        cache.get("ha")
+        cache.get("as")
+        cache.get("ha")
+        cache.get("s ")
+        self.assertEqual(len(cache), 2)
+        cache.get("ha")
+        self.assertEqual((cache.hits, cache.misses), (2, 3))
+        cache.get("as")
+        self.assertEqual(cache.misses, 4)
+        self.assertEqual(cache.get("zz"), ((), ()))
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            beam_search(self.model, "ha", -1)
+        with self.assertRaises(ValueError):
+            beam_search(self.model, "ha", 3, beam_width=0)
+        with self.assertRaises(ValueError):
+            ContextCache(self.model, maxsize=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+
+from compact_counts import CompactCounts
+from count_char_n_grams import count_char_n_grams
+from generate_next_char import generate_next_char
+from model_io import load_model, save_model
+from next_letter_frequency import next_letter_frequency
+from ngram_model import NGramModel
+
+
+TEXT = "Lee has a dog. Jane has a dog. Soomi has a cat."
+
+
+class TestCompactCounts(unittest.TestCase):
+    def test_mapping_matches_dict(self):
+        for n in (1, 2, 4, 7):
+            expected = count_char_n_grams(TEXT, n)
+            compact = CompactCounts.from_text(TEXT, n)
+            self.assertEqual(len(compact), len(expected))
+            self.assertEqual(compact, expected)
+            self.assertEqual(list(compact), sorted(expected))
+            self.assertEqual(dict(compact.items()), expected)
+            self.assertEqual(sum(compact.values()), len(TEXT) - n + 1)
+            for ngram, count in expected.items():
+                self.assertIn(ngram, compact)
+                self.assertEqual(compact[ngram], count)
+
+    def test_missing_keys(self):
+        compact = CompactCounts.from_text(TEXT, 3)
+        for key in ("zzz", "Lee ", "Le", "", 3):
+            self.assertNotIn(key, compact)
+        self.assertIsNone(compact.get("xyz"))
+        with self.assertRaises(KeyError):
+            compact["a q"]
+
+    def test_from_counts(self):
+        expected = count_char_n_grams(TEXT, 4)
+        compact = CompactCounts.from_counts(expected)
+        self.assertEqual(compact, expected)
+        self.assertEqual(compact.nbytes(), 12 * len(expected))
+        with self.assertRaises(ValueError):
+            CompactCounts.from_counts({"ab": 1, "abc": 2})
+
+    def test_next_letter_frequency(self):
+        for n in (1, 3, 4, 5):
+            counts = count_char_n_grams(TEXT, n)
+            compact = CompactCounts.from_counts(counts)
+            for prompt in ("", "a", " a", " a ", "has ", "q", "zz", "Soomi"):
+                self.assertEqual(
+                    next_letter_frequency(prompt, compact), next_letter_frequency(prompt, counts), msg=(n, prompt)
+                )
+
+    def test_existing_callers(self):
+        counts = count_char_n_grams(TEXT, 4)
+        compact = CompactCounts.from_counts(counts)
+        self.assertEqual(NGramModel.from_counts(compact).table, NGramModel.from_counts(counts).table)
+        with tempfile.TemporaryDirectory() as tmp:
+            a, b = os.path.join(tmp, "a"), os.path.join(tmp, "b")
+            save_model(counts, a)
+            save_model(compact, b)
+            with open(a, "rb") as fa, open(b, "rb") as fb:
+                self.assertEqual(fa.read(), fb.read())
+            with load_model(a) as mapped:
+                self.assertEqual(generate_next_char("s a", mapped), " ")
+        for _ in range(20):
+            self.assertIn(generate_next_char(" a ", compact), "dc")
+            self.assertIn(generate_next_char("Le", compact), "e")
+        with self.assertRaises(TypeError):
+            generate_next_char("Le", ["Lee "])
+
+
+if __name__ == "__main__":
+    unittest.main()
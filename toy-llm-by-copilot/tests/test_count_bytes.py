@@ -0,0 +1,67 @@
+import mmap
+import os
+import tempfile
+import unittest
+
+from count_char_n_grams import count_char_n_grams
+from count_char_n_grams_bytes import count_char_n_grams_bytes, encode_utf8
+from count_char_n_grams_numpy import encode_text
+
+
+TEXT = "Lee has a dog. Jane has a dog. Soomi has a cat."
+UNICODE = "Jürgen hat einen Hund — 犬 🐕, Soomi a un chat. ¿Qué? €5"
+
+
+class TestCountBytes(unittest.TestCase):
+    def test_matches_slicing_loop(self):
+        for text in (TEXT, UNICODE, UNICODE * 3 + TEXT):
+            data = text.encode("utf-8")
+            for n in (1, 2, 3, 5):
+                expected = count_char_n_grams(text, n)
+                for buffer in (data, bytearray(data), memoryview(data)):
+                    self.assertEqual(count_char_n_grams_bytes(buffer, n), expected)
+
+    def test_encode_utf8_matches_encode_text(self):
+        for text in (TEXT, UNICODE):
+            vocab, ids = encode_utf8(text.encode("utf-8"))
+            expected_vocab, expected_ids = encode_text(text)
+            self.assertEqual(vocab, expected_vocab)
+            self.assertEqual(ids.tolist(), expected_ids.tolist())
+
+    def test_path_and_mmap(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "corpus.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(UNICODE)
+            self.assertEqual(count_char_n_grams_bytes(path, 3), count_char_n_grams(UNICODE, 3))
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                self.assertEqual(count_char_n_grams_bytes(mm, 2), count_char_n_grams(UNICODE, 2))
+            empty = os.path.join(tmp, "empty.txt")
+            open(empty, "wb").close()
+            self.assertEqual(count_char_n_grams_bytes(empty, 2), {})
+            invalid = os.path.join(tmp, "invalid.txt")
+            with open(invalid, "wb") as f:
+                f.write(b"ab\x80cd")
+            with self.assertRaises(ValueError):
+                count_char_n_grams_bytes(invalid, 2)
+
+    def test_short_input(self):
+        self.assertEqual(count_char_n_grams_bytes(b"", 3), {})
+        self.assertEqual(count_char_n_grams_bytes("é".encode("utf-8"), 2), {})
+
+    def test_packed(self):
+        packed = count_char_n_grams_bytes(UNICODE.encode("utf-8"), 3, as_dict=False)
+        self.assertEqual(packed.to_dict(), count_char_n_grams(UNICODE, 3))
+
+    def test_invalid(self):
+        with self.assertRaises(TypeError):
+            count_char_n_grams_bytes(b"abc", 2.0)
+        with self.assertRaises(ValueError):
+            count_char_n_grams_bytes(b"abc", 0)
+        for bad in (b"\x80", b"\x80\xbf", b"\x80abc", b"ab\xc3", b"\xc0\x80", b"a\xffb", b"\xe2\x82a", "é".encode("utf-8") + b"\xa9"):
+            with self.assertRaises(ValueError, msg=bad):
+                count_char_n_grams_bytes(bad, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
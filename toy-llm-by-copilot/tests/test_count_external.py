@@ -0,0 +1,86 @@
+import io
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+from count_char_n_grams import count_char_n_grams
+from count_char_n_grams_external import count_char_n_grams_external
+from model_io import load_model, save_model
+
+
+TEXT = "Lee has a dog. Jane has a dog. Soomi has a cat."
+UNICODE = "Jürgen hat einen Hund — 犬 🐕, Soomi a un chat. ¿Qué? €5 \0"
+
+
+class TestCountExternal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.expected = os.path.join(self.tmp.name, "expected.tllm")
+        self.path = os.path.join(self.tmp.name, "model.tllm")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def assertSameFile(self, text, n, **kwargs):
+        save_model(count_char_n_grams(text, n), self.expected)
+        stats = count_char_n_grams_external(io.StringIO(text), self.path, n, tmp_dir=self.tmp.name, **kwargs)
+        with open(self.expected, "rb") as f, open(self.path, "rb") as g:
+            self.assertEqual(g.read(), f.read(), msg=(n, kwargs))
+        return stats
+
+    def test_byte_identical(self):
+        for text in (TEXT, UNICODE, (UNICODE + TEXT) * 20):
+            for n in (1, 2, 4):
+                self.assertSameFile(text, n)
+
+    def test_many_runs_and_passes(self):
+        text = (UNICODE + TEXT) * 40
+        stats = self.assertSameFile(text, 3, memory_limit=16 << 10)
+        self.assertGreater(stats.runs, 10)
+        self.assertGreater(stats.merge_passes, 1)
+        self.assertEqual(stats.total, len(text) - 2)
+        self.assertEqual(stats.ngrams, len(count_char_n_grams(text, 3)))
+
+    def test_keys_wider_than_64_bits(self):
+        # vocab ** n does not fit in a packed code
+        self.assertSameFile((UNICODE + TEXT) * 5, 14, memory_limit=64 << 10)
+
+    def test_path_source_and_load(self):
+        corpus = os.path.join(self.tmp.name, "corpus.txt")
+        with open(corpus, "w", encoding="utf-8") as f:
+            f.write(UNICODE * 3)
+        count_char_n_grams_external(corpus, self.path, 3)
+        with load_model(self.path) as model:
+            self.assertEqual(model.to_counts(), count_char_n_grams(UNICODE * 3, 3))
+
+    def test_memory_limit(self):
+        text = (UNICODE + TEXT) * 3000
+        source = io.StringIO(text)
+        limit = 2 << 20
+        tracemalloc.start()
+        try:
+            stats = count_char_n_grams_external(source, self.path, 5, limit, self.tmp.name)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertGreater(stats.runs, 1)
+        self.assertLess(peak, limit)
+
+    def test_short_and_empty(self):
+        count_char_n_grams_external(io.StringIO("ab"), self.path, 3)
+        with load_model(self.path) as model:
+            self.assertEqual((model.n, len(model)), (3, 0))
+        self.assertEqual(count_char_n_grams_external(io.StringIO(""), self.path, 2).ngrams, 0)
+
+    def test_invalid(self):
+        with self.assertRaises(TypeError):
+            count_char_n_grams_external(io.StringIO(TEXT), self.path, 2.0)
+        with self.assertRaises(ValueError):
+            count_char_n_grams_external(io.StringIO(TEXT), self.path, 0)
+        with self.assertRaises(ValueError):
+            count_char_n_grams_external(io.StringIO(TEXT), self.path, 2, memory_limit=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
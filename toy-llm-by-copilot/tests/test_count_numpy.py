@@ -0,0 +1,55 @@
+import contextlib
+import io
+import unittest
+
+from count_char_n_grams import count_char_n_grams
+from count_char_n_grams_numpy import count_char_n_grams_numpy, packed_codes_fit
+from main import count_n_grams
+
+
+TEXT = "Lee has a dog.\nJane has a dog.\nSoomi has a cat. KocseaKocsea ü€😀\0 end"
+
+
+class TestCountCharNGramsNumpy(unittest.TestCase):
+    def test_matches_slicing_loop(self):
+        for n in range(1, 9):
+            self.assertEqual(count_char_n_grams_numpy(TEXT, n), count_char_n_grams(TEXT, n), msg=n)
+
+    def test_example_kocsea(self):
+        expected = {"Kocs": 2, "ocse": 2, "csea": 2, "seaK": 1, "eaKo": 1, "aKoc": 1}
+        self.assertEqual(count_char_n_grams_numpy("KocseaKocsea", n=4), expected)
+
+    def test_packed_form(self):
+        packed = count_char_n_grams_numpy("aaaa", as_dict=False)
+        self.assertEqual(packed.vocab, "a")
+        self.assertEqual(packed.counts.tolist(), [2])
+        self.assertEqual(packed.to_dict(), {"aaa": 2})
+
+    def test_short_and_empty_text(self):
+        self.assertEqual(count_char_n_grams_numpy("hi", n=3), {})
+        self.assertEqual(count_char_n_grams_numpy("", n=1), {})
+
+    def test_invalid_n(self):
+        with self.assertRaises(TypeError):
+            count_char_n_grams_numpy("abc", n="3")
+        with self.assertRaises(ValueError):
+            count_char_n_grams_numpy("abc", n=0)
+
+    def test_code_overflow(self):
+        text = "".join(chr(0x4E00 + i) for i in range(300))
+        with self.assertRaises(ValueError):
+            count_char_n_grams_numpy(text, n=8)
+        self.assertFalse(packed_codes_fit(300, 8))
+        self.assertTrue(packed_codes_fit(256, 8))
+
+    def test_main_backend_falls_back(self):
+        text = "".join(chr(0x4E00 + i) for i in range(300)) * 2
+        for backend in ("numpy", "bytes"):
+            with contextlib.redirect_stderr(io.StringIO()) as err:
+                self.assertEqual(count_n_grams(text, 8, backend=backend), count_char_n_grams(text, 8))
+            self.assertIn("--backend python", err.getvalue())
+            self.assertEqual(count_n_grams(TEXT, 4, backend=backend), count_char_n_grams(TEXT, 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
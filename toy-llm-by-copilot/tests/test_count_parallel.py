@@ -0,0 +1,41 @@
+import unittest
+
+from count_char_n_grams import count_char_n_grams
+from count_char_n_grams_parallel import count_char_n_grams_parallel, merge_counts, shard_text, tree_merge
+
+
+TEXT = "Lee has a dog. Jane has a dog. Soomi has a cat. KocseaKocsea"
+
+
+class TestShardAndMerge(unittest.TestCase):
+    def test_shards_cover_every_n_gram_once(self):
+        for n in (1, 2, 4, 7):
+            for shards in (1, 2, 3, 5, 8):
+                parts = [count_char_n_grams(s, n) for s in shard_text(TEXT, n, shards)]
+                merged = tree_merge(parts)
+                expected = count_char_n_grams(TEXT, n)
+                self.assertEqual(merged, expected, msg=(n, shards))
+                self.assertEqual(list(merged), list(expected), msg=(n, shards))
+
+    def test_merge_counts(self):
+        self.assertEqual(merge_counts({"ab": 1}, {"ab": 2, "bc": 1}), {"ab": 3, "bc": 1})
+        self.assertEqual(tree_merge([]), {})
+
+
+class TestCountCharNGramsParallel(unittest.TestCase):
+    def test_matches_serial(self):
+        text = TEXT * 20
+        result = count_char_n_grams_parallel(text, 4, workers=3)
+        expected = count_char_n_grams(text, 4)
+        self.assertEqual(result, expected)
+        self.assertEqual(list(result), list(expected))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(TypeError):
+            count_char_n_grams_parallel("abc", "3")
+        with self.assertRaises(ValueError):
+            count_char_n_grams_parallel("abc", 2, workers=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import io
+import os
+import tempfile
+import unittest
+
+from count_char_n_grams import count_char_n_grams
+from count_char_n_grams_stream import count_char_n_grams_stream
+
+
+TEXT = "Lee has a dog.\nJane has a dog.\nSoomi has a cat. KocseaKocsea ü€😀 end"
+
+
+class TestCountCharNGramsStream(unittest.TestCase):
+    def test_matches_in_memory_across_chunk_sizes(self):
+        for n in range(1, 7):
+            expected = count_char_n_grams(TEXT, n)
+            for chunk_size in (1, 2, 3, 5, 7, 64, 1 << 20):
+                result = count_char_n_grams_stream(io.StringIO(TEXT), n, chunk_size=chunk_size)
+                self.assertEqual(result, expected, msg=(n, chunk_size))
+                self.assertEqual(list(result), list(expected), msg=(n, chunk_size))
+
+    def test_reads_path(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "corpus.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(TEXT)
+            self.assertEqual(count_char_n_grams_stream(path, 4, chunk_size=8), count_char_n_grams(TEXT, 4))
+
+    def test_short_input(self):
+        self.assertEqual(count_char_n_grams_stream(io.StringIO("hi"), 3, chunk_size=1), {})
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(TypeError):
+            count_char_n_grams_stream(io.StringIO("abc"), "3")
+        with self.assertRaises(ValueError):
+            count_char_n_grams_stream(io.StringIO("abc"), 0)
+        with self.assertRaises(ValueError):
+            count_char_n_grams_stream(io.StringIO("abc"), 2, chunk_size=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+from count_char_n_grams import count_char_n_grams
+from generate_batch import compile_model, generate_batch
+from ngram_model import NGramModel
+
+
+TEXT = "Lee has a dog. Jane has a dog. Soomi has a cat."
+
+
+class TestGenerateBatch(unittest.TestCase):
+    def setUp(self):
+        self.model = NGramModel.from_text(TEXT, n=4)
+
+    def test_shape_and_reproducibility(self):
+        samples = generate_batch(self.model, num_samples=50, length=30, seed=5)
+        self.assertEqual(len(samples), 50)
+        self.assertTrue(all(len(s) == 30 for s in samples))
+        self.assertEqual(samples, generate_batch(self.model, num_samples=50, length=30, seed=5))
+
+    def test_samples_follow_observed_transitions(self):
+        samples = generate_batch(self.model, num_samples=200, length=12, seed=1)
+        for sample in samples:
+            self.assertIn(sample[:3], self.model)
+            for i in range(3, len(sample)):
+                context = sample[i - 3:i]
+                if context in self.model:
+                    self.assertIn(sample[i], self.model.table[context])
+
+    def test_every_sampled_ngram_was_seen(self):
+        counts = count_char_n_grams(TEXT, 4)
+        restarts = 0
+        for sample in generate_batch(self.model, num_samples=200, length=60, seed=3):
+            i = 3
+            while i < len(sample):
+                context = sample[i - 3:i]
+                if not self.model.table.get(context):
+                    # the corpus ended here: a whole new context follows
+                    restarts += 1
+                    if i + 3 <= len(sample):
+                        self.assertIn(sample[i:i + 3], self.model.table)
+                    i += 3
+                    continue
+                self.assertIn(sample[i - 3:i + 1], counts, msg=sample)
+                i += 1
+        self.assertGreater(restarts, 0)
+
+    def test_next_char_distribution(self):
+        compiled = compile_model(self.model)
+        samples = generate_batch(compiled, num_samples=30000, length=4, seed=2)
+        after = [s[3] for s in samples if s[:3] == " a "]
+        self.assertAlmostEqual(after.count("d") / len(after), 2 / 3, delta=0.05)
+
+    def test_empty_batch(self):
+        self.assertEqual(generate_batch(self.model, 0, 10, seed=0), [])
+        self.assertEqual(generate_batch(self.model, 2, 0, seed=0), ["", ""])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import random
+import unittest
+
+from generation import MaxChars, MaxWords, SentenceEnd, StopString, generate, iter_generate
+from ngram_model import NGramModel
+
+
+TEXT = "Lee has a dog. Jane has a dog. Soomi has a cat."
+
+
+def first_stop(condition, text):
+    """Index of the character after which `condition` fires, or None."""
+
+    condition.reset()
+    for i, ch in enumerate(text):
+        if condition.update(ch):
+            return i
+    return None
+
+
+class TestStopConditions(unittest.TestCase):
+    def test_stop_string_matches_endswith(self):
+        rng = random.Random(0)
+        for pattern in ("aab", "abab", "aaa", "abcab", "x", "a a."):
+            condition = StopString(pattern)
+            for _ in range(200):
+                text = "".join(rng.choice("ab c.") for _ in range(30)) + pattern
+                expected = next(i for i in range(len(text)) if text[: i + 1].endswith(pattern))
+                self.assertEqual(first_stop(condition, text), expected, msg=(pattern, text))
+        with self.assertRaises(ValueError):
+            StopString("")
+
+    def test_word_and_sentence_counts(self):
+        text = "Lee  has\na dog. Jane? yes"
+        self.assertEqual(first_stop(MaxWords(2), text), text.index("\n"))
+        self.assertEqual(first_stop(MaxWords(4), text), text.index(". ") + 1)
+        self.assertIsNone(first_stop(MaxWords(6), text))
+        self.assertEqual(first_stop(SentenceEnd(1), text), text.index("."))
+        self.assertEqual(first_stop(SentenceEnd(2), text), text.index("?"))
+        self.assertEqual(first_stop(MaxChars(4), text), 3)
+
+
+class TestGenerate(unittest.TestCase):
+    def setUp(self):
+        self.model = NGramModel.from_text(TEXT, 4)
+
+    def test_streams_characters(self):
+        corpus = (TEXT + " ") * 2
+        model = NGramModel.from_text(corpus, 4)
+        stream = iter_generate(model, "Lee", rng=random.Random(1))
+        text = "".join(next(stream) for _ in range(200))
+        self.assertTrue(text.startswith("Lee"))
+        for i in range(len(text) - 3):
+            self.assertIn(text[i:i + 4], corpus)
+
+    def test_stops_and_stats(self):
+        stats = {}
+        out = generate(self.model, "Jan", stop=[StopString("cat."), MaxChars(10_000)], rng=random.Random(2), stats=stats)
+        self.assertTrue(out.endswith("cat."))
+        self.assertEqual(stats["generated_chars"], len(out) - 3)
+        self.assertEqual(stats["fallbacks"], 0)
+        self.assertEqual(len(generate(self.model, "Lee", stop=[MaxChars(2)])), 2)
+        with self.assertRaises(ValueError):
+            generate(self.model, "Lee")
+
+    def test_fallbacks_for_unseen_contexts(self):
+        stats = {}
+        out = generate(NGramModel(3), stop=[MaxChars(12)], rng=random.Random(3), stats=stats)
+        self.assertEqual(len(out), 12)
+        self.assertEqual(stats["fallbacks"], 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
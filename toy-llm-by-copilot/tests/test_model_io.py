@@ -0,0 +1,83 @@
+import io
+import os
+import random
+import tempfile
+import unittest
+
+from count_char_n_grams import count_char_n_grams
+from model_io import iter_sorted_entries, load_model, save_model, write_model_file, write_model_file_bounded
+from ngram_model import NGramModel
+
+
+TEXT = "Lee has a dog. Jane has a dog. Soomi has a cat. ü€😀"
+
+
+class TestModelFile(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "model.tllm")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_counts(self):
+        for n in (1, 2, 4):
+            counts = count_char_n_grams(TEXT, n)
+            save_model(counts, self.path)
+            with load_model(self.path) as model:
+                self.assertEqual(model.n, n)
+                self.assertEqual(model.to_counts(), counts)
+
+    def test_lookups_match_in_memory_model(self):
+        memory = NGramModel.from_text(TEXT, n=4)
+        save_model(memory, self.path)
+        prompts = {"", "a", " a", " a ", "has", "zzz", "😀", "Lee h"}
+        prompts.update(TEXT[i:i + 3] for i in range(len(TEXT) - 2))
+        with load_model(self.path) as model:
+            self.assertEqual(len(model), len(memory))
+            for prompt in prompts:
+                self.assertEqual(model.next_letter_frequency(prompt), memory.next_letter_frequency(prompt), msg=prompt)
+                self.assertEqual(prompt in model, prompt in memory, msg=prompt)
+
+    def test_sampling(self):
+        save_model(count_char_n_grams(TEXT, 4), self.path)
+        rng = random.Random(3)
+        with load_model(self.path) as model:
+            sampler = model.sampler(" a ")
+            draws = [sampler.sample(rng) for _ in range(3000)]
+            self.assertAlmostEqual(draws.count("d") / len(draws), 2 / 3, delta=0.05)
+            self.assertEqual(set(draws), {"c", "d"})
+            self.assertIsNone(model.sampler("zzz"))
+            for _ in range(50):
+                self.assertIn(model.random_context(rng), model)
+
+    def test_same_counts_same_bytes(self):
+        counts = count_char_n_grams(TEXT, 3)
+        save_model(counts, self.path)
+        with open(self.path, "rb") as f:
+            first = f.read()
+        save_model(dict(reversed(list(counts.items()))), self.path)
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), first)
+
+    def test_bounded_writer_same_bytes(self):
+        for n in (1, 3):
+            model = NGramModel.from_text(TEXT, n)
+            expected = io.BytesIO()
+            write_model_file(expected, n, iter_sorted_entries(model))
+            for buffer_entries in (1, 7, 1 << 16):
+                out = io.BytesIO()
+                write_model_file_bounded(out, n, iter_sorted_entries(model), buffer_entries, self.tmp.name)
+                self.assertEqual(out.getvalue(), expected.getvalue())
+
+    def test_rejects_other_files(self):
+        with open(self.path, "wb") as f:
+            f.write(b"not a model file at all, definitely not")
+        with self.assertRaises(ValueError):
+            load_model(self.path)
+        with self.assertRaises(FileNotFoundError):
+            load_model(os.path.join(self.tmp.name, "missing.tllm"))
+
+
+if __name__ == "__main__":
+    unittest.main()
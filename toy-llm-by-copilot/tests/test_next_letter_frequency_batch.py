@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+
+from compact_counts import CompactCounts
+from count_char_n_grams import count_char_n_grams
+from model_io import load_model, save_model
+from next_letter_frequency import next_letter_frequency
+from next_letter_frequency_batch import NextLetterIndex, compile_counts, next_letter_frequency_batch
+from ngram_model import NGramModel
+
+
+TEXT = "Lee has a dog. Jane has a dog. Soomi has a cat."
+PROMPTS = ["", "a", " a ", "has", "dog.", "S", "xyz", "hax", "é", "og", " "]
+
+
+class TestNextLetterFrequencyBatch(unittest.TestCase):
+    def check(self, model, expected_counts, prompts=PROMPTS):
+        dense = next_letter_frequency_batch(prompts, model)
+        sparse = next_letter_frequency_batch(prompts, model, sparse=True)
+        self.assertEqual(dense.counts.shape, (len(prompts), len(dense.vocab)))
+        for i, prompt in enumerate(prompts):
+            expected = next_letter_frequency(prompt, expected_counts)
+            self.assertEqual(dense.row(i), expected, prompt)
+            self.assertEqual(sparse.row(i), expected, prompt)
+        self.assertEqual(sparse.to_dense().counts.tolist(), dense.counts.tolist())
+
+    def test_matches_per_prompt_dict(self):
+        for n in (1, 2, 3, 4):
+            counts = count_char_n_grams(TEXT, n)
+            self.check(counts, counts)
+            self.check(CompactCounts.from_counts(counts), counts)
+
+    def test_models(self):
+        counts = count_char_n_grams(TEXT, 4)
+        self.check(NGramModel.from_text(TEXT, 4), counts)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "model.tllm")
+            save_model(NGramModel.from_text(TEXT, 4), path)
+            self.check(load_model(path), counts)
+
+    def test_wider_than_packed_codes(self):
+        # 33 characters: 33 ** 14 does not fit in 64 bits
+        text = TEXT + " Quick brown fox jumps over lazy Kiwi!"
+        counts = count_char_n_grams(text, 14)
+        with self.assertRaises(ValueError):
+            compile_counts(counts)
+        prompts = PROMPTS + [text[:13], text[5:13], text[20:33], text[:14]]
+        for model in (counts, NGramModel.from_counts(counts, 14)):
+            index = NextLetterIndex(model)
+            self.assertIsNone(index.counts)
+            self.assertEqual(len(index.vocab), 33)
+            self.check(index, counts, prompts)
+
+    def test_index_reuse(self):
+        counts = count_char_n_grams(TEXT, 3)
+        index = NextLetterIndex(counts)
+        first = next_letter_frequency_batch(["ha", "a"], index)
+        second = next_letter_frequency_batch(["a", "ha"], index)
+        self.assertEqual(first.row(0), second.row(1))
+        self.assertEqual(first.row(0), {"s": 3})
+
+    def test_edge_cases(self):
+        counts = count_char_n_grams(TEXT, 3)
+        result = next_letter_frequency_batch([], counts)
+        self.assertEqual(result.counts.shape, (0, len(result.vocab)))
+        result = next_letter_frequency_batch(["", "a"], CompactCounts.from_counts({}, 3), sparse=True)
+        self.assertEqual((result.row(0), result.row(1)), ({}, {}))
+        for empty in ({}, NGramModel.from_counts({}, 3)):
+            result = next_letter_frequency_batch(["", "a"], empty)
+            self.assertEqual((result.row(0), result.row(1)), ({}, {}))
+        with self.assertRaises(TypeError):
+            next_letter_frequency_batch(["a", 1], counts)
+        with self.assertRaises(TypeError):
+            next_letter_frequency_batch(["a"], "abc")
+
+
+if __name__ == "__main__":
+    unittest.main()
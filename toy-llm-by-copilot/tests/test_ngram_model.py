@@ -0,0 +1,63 @@
+import random
+import unittest
+
+from count_char_n_grams import count_char_n_grams
+from generate_next_char import generate_next_char
+from next_letter_frequency import next_letter_frequency
+from ngram_model import NGramModel
+
+
+TEXT = "Lee has a dog. Jane has a dog. Soomi has a cat."
+
+
+class TestNGramModel(unittest.TestCase):
+    def test_example_prompt(self):
+        model = NGramModel.from_text(TEXT, n=4)
+        self.assertEqual(model.next_letter_frequency(" a "), {"d": 2, "c": 1})
+
+    def test_matches_dict_scan_for_all_prompt_lengths(self):
+        counts = count_char_n_grams(TEXT, n=4)
+        model = NGramModel.from_counts(counts)
+        prompts = {"", " ", "a", "ha", "has", " a ", "xyz", "Lee ", "Lee h"}
+        for i in range(len(TEXT) - 2):
+            prompts.add(TEXT[i:i + 3])
+        for prompt in prompts:
+            self.assertEqual(
+                model.next_letter_frequency(prompt),
+                next_letter_frequency(prompt, counts),
+                msg=repr(prompt),
+            )
+
+    def test_dict_function_accepts_model(self):
+        model = NGramModel.from_text(TEXT, n=4)
+        self.assertEqual(next_letter_frequency(" a ", model), {"d": 2, "c": 1})
+
+    def test_generate_next_char_draws_alike(self):
+        counts = count_char_n_grams(TEXT, n=4)
+        model = NGramModel.from_counts(counts)
+
+        def draws(source):
+            random.seed(0)
+            return [generate_next_char(prompt, source) for prompt in (" a ", "has", " a", "") * 50]
+
+        self.assertEqual(draws(counts), draws(model))
+        after = draws(counts)[::4]
+        self.assertGreater(after.count("d"), after.count("c"))
+
+    def test_result_is_a_copy(self):
+        model = NGramModel.from_text(TEXT, n=4)
+        model.next_letter_frequency(" a ")["d"] = 100
+        self.assertEqual(model.next_letter_frequency(" a ")["d"], 2)
+
+    def test_empty_counts_requires_n(self):
+        with self.assertRaises(ValueError):
+            NGramModel.from_counts({})
+        self.assertEqual(len(NGramModel.from_counts({}, n=3)), 0)
+
+    def test_mixed_key_lengths_rejected(self):
+        with self.assertRaises(ValueError):
+            NGramModel.from_counts({"abc": 1, "ab": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
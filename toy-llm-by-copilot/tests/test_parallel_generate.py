@@ -0,0 +1,81 @@
+import os
+import random
+import tempfile
+import unittest
+
+from generation import SentenceEnd
+from main import format_samples
+from model_io import save_model
+from ngram_model import NGramModel
+import parallel_generate as parallel_generate_module
+from parallel_generate import parallel_generate, sample_seeds
+
+
+TEXT = "Lee has a dog. Jane has a dog. Soomi has a cat."
+
+
+class TestParallelGenerate(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.model = NGramModel.from_text(TEXT * 3, 4)
+        cls.path = os.path.join(cls._tmp.name, "model.tllm")
+        save_model(cls.model, cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._tmp.cleanup()
+
+    def test_independent_of_worker_count(self):
+        expected = parallel_generate(self.path, 12, 20, 40, seed=3)
+        self.assertEqual(len(expected), 12)
+        self.assertTrue(all(20 <= len(s) <= 40 for s in expected))
+        for workers in (2, 3):
+            self.assertEqual(parallel_generate(self.path, 12, 20, 40, seed=3, workers=workers), expected)
+        # sample i depends only on the seed and i
+        self.assertEqual(parallel_generate(self.path, 5, 20, 40, seed=3), expected[:5])
+        self.assertNotEqual(parallel_generate(self.path, 12, 20, 40, seed=4), expected)
+
+    def test_global_random_untouched(self):
+        random.seed(11)
+        state = random.getstate()
+        parallel_generate(self.path, 4, 10, 20, seed=1, top_k=2)
+        parallel_generate(self.path, 4, 10, 20, seed=None)
+        self.assertEqual(random.getstate(), state)
+
+    def test_in_process_leaves_no_worker_model(self):
+        parallel_generate(self.path, 3, 10, 20, seed=1)
+        self.assertIsNone(parallel_generate_module._worker_model)
+
+    def test_samples_follow_model(self):
+        for sample in parallel_generate(self.path, 20, 15, 15, seed=2, stop=[SentenceEnd()]):
+            self.assertLessEqual(len(sample), 15)
+            for i in range(3, len(sample)):
+                context = sample[i - 3:i]
+                if context in self.model and self.model.table[context]:
+                    self.assertIn(sample[i], self.model.table[context])
+
+    def test_seeds(self):
+        seeds = sample_seeds(0, 3)
+        self.assertEqual(seeds, sample_seeds(0, 3))
+        self.assertEqual(len(set(seeds)), 3)
+        self.assertEqual(sample_seeds(0, 5)[:3], seeds)
+
+    def test_format_samples(self):
+        samples = ["a dog.\n\nJane", "", "cat\n"]
+        text = format_samples(samples)
+        self.assertTrue(text.startswith("--- sample 1 ---\n"))
+        parts = text.split("\n--- sample ")
+        self.assertEqual([part.split(" ---\n", 1)[1] for part in parts], samples)
+        self.assertEqual(format_samples([]), "")
+
+    def test_validation(self):
+        self.assertEqual(parallel_generate(self.path, 0, seed=0), [])
+        with self.assertRaises(ValueError):
+            parallel_generate(self.path, -1)
+        with self.assertRaises(ValueError):
+            parallel_generate(self.path, 2, workers=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import io
+import math
+import unittest
+
+from count_char_n_grams import count_char_n_grams
+from ngram_model import NGramModel
+from perplexity import Scorer, score_parallel, score_stream
+
+
+TEXT = "Lee has a dog. Jane has a dog. Soomi has a cat."
+
+
+def reference_log_prob(text, n, k, eval_text, backoff):
+    """Per-character loop over dict counts."""
+
+    vocab = sorted(set(text))
+    size = len(vocab) + 1
+    orders = {j: count_char_n_grams(text, j + 1) for j in range(n)}
+    total = 0.0
+    for i in range(n - 1, len(eval_text)):
+        for j in range(n - 1, -1, -1) if backoff else [n - 1]:
+            context = eval_text[i - j:i]
+            ctx = sum(c for g, c in orders[j].items() if g[:-1] == context)
+            if ctx or j == 0 or not backoff:
+                break
+        total += math.log((orders[j].get(context + eval_text[i], 0) + k) / (ctx + k * size))
+    return total
+
+
+class TestScorer(unittest.TestCase):
+    def test_matches_reference(self):
+        eval_text = "Jane has a cat. Lee has a bird!"
+        for n in (1, 2, 4):
+            scorer = Scorer.from_text(TEXT, n)
+            for smoothing in ("addk", "backoff"):
+                for k in (0.5, 1.0):
+                    result = scorer.score(eval_text, smoothing, k)
+                    self.assertEqual(result.chars, len(eval_text) - n + 1)
+                    expected = reference_log_prob(TEXT, n, k, eval_text, smoothing == "backoff")
+                    self.assertAlmostEqual(result.log_prob, expected, places=9)
+
+    def test_distribution_normalized(self):
+        # every continuation of a context, including the OOV symbol, sums to 1
+        scorer = Scorer.from_text(TEXT, 3)
+        for context in ("ha", "xy", "a "):
+            for smoothing in ("addk", "backoff"):
+                total = sum(
+                    math.exp(scorer.log_probs(context + ch, smoothing)[0]) for ch in scorer.vocab + "\x00"
+                )
+                self.assertAlmostEqual(total, 1.0)
+
+    def test_oov_and_short_text(self):
+        scorer = Scorer.from_text(TEXT, 3)
+        result = scorer.score("has a zebra")
+        self.assertEqual(result.oov, 3)  # z, b, r
+        self.assertTrue(math.isfinite(result.perplexity))
+        self.assertEqual(scorer.score("ha"), (0, 0.0, 0))
+        self.assertEqual(scorer.score("ha").perplexity, 1.0)
+
+    def test_perplexity_and_cross_entropy(self):
+        result = Scorer.from_text(TEXT, 4).score(TEXT)
+        self.assertAlmostEqual(result.perplexity, 2 ** result.cross_entropy)
+        # more context fits the training text better
+        self.assertLess(result.perplexity, Scorer.from_text(TEXT, 2).score(TEXT).perplexity)
+
+    def test_from_counts_and_model(self):
+        eval_text = "Soomi has a dog."
+        exact = Scorer.from_text(TEXT, 4).log_probs(eval_text, "addk")
+        for scorer in (
+            Scorer.from_counts(count_char_n_grams(TEXT, 4)),
+            Scorer.from_model(NGramModel.from_text(TEXT, 4)),
+        ):
+            self.assertEqual(scorer.n, 4)
+            self.assertEqual(scorer.vocab, "".join(sorted(set(TEXT))))
+            self.assertEqual(scorer.log_probs(eval_text, "addk").tolist(), exact.tolist())
+
+    def test_stream_and_parallel_match_whole_text(self):
+        scorer = Scorer.from_text(TEXT, 3)
+        eval_text = TEXT * 7 + "zebra"
+        expected = scorer.score(eval_text)
+        streamed = score_stream(scorer, io.StringIO(eval_text), chunk_size=16)
+        self.assertEqual(streamed.chars, expected.chars)
+        self.assertEqual(streamed.oov, expected.oov)
+        self.assertAlmostEqual(streamed.log_prob, expected.log_prob)
+        parallel = score_parallel(scorer, io.StringIO(eval_text), chunk_size=16, workers=2)
+        self.assertEqual(parallel.chars, expected.chars)
+        self.assertAlmostEqual(parallel.log_prob, expected.log_prob)
+
+    def test_validation(self):
+        with self.assertRaises(TypeError):
+            Scorer.from_text(TEXT, 2.5)
+        with self.assertRaises(ValueError):
+            Scorer.from_text(TEXT, 0)
+        scorer = Scorer.from_text(TEXT, 2)
+        with self.assertRaises(ValueError):
+            scorer.log_probs(TEXT, "kneser-ney")
+        with self.assertRaises(ValueError):
+            scorer.log_probs(TEXT, k=-1)
+        with self.assertRaises(ValueError):
+            score_parallel(scorer, io.StringIO(TEXT), workers=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
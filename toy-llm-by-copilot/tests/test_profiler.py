@@ -0,0 +1,96 @@
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from main import generate_from_model
+from model_io import load_model, save_model
+from ngram_model import NGramModel
+from profiler import Profiler, unique_ngrams
+
+
+TEXT = "Lee has a dog. Jane has a dog. Soomi has a cat."
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_profiled(tmp, *args):
+    """Run main.py on TEXT with `--profile` and return the report."""
+
+    corpus = os.path.join(tmp, "corpus.txt")
+    with open(corpus, "w", encoding="utf-8") as f:
+        f.write(TEXT * 5)
+    path = os.path.join(tmp, "profile.json")
+    command = [sys.executable, os.path.join(ROOT, "main.py"), "--file", corpus, "--seed", "1", "--profile", path, *args]
+    subprocess.run(command, capture_output=True, text=True, check=True, cwd=tmp)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class TestProfiler(unittest.TestCase):
+    def test_records_stages(self):
+        profiler = Profiler()
+        with profiler.stage("count"):
+            blob = [0] * 100_000
+        with profiler.stage("generate"):
+            pass
+        report = profiler.report()
+        self.assertEqual(list(report["stages"]), ["count", "generate"])
+        self.assertGreaterEqual(report["stages"]["count"]["peak_bytes"], 800_000)
+        self.assertGreaterEqual(report["stages"]["count"]["retained_bytes"], 800_000)
+        self.assertGreaterEqual(report["peak_bytes"], report["stages"]["count"]["peak_bytes"])
+        del blob
+
+        profiler.metrics["unique_ngrams"] = 3
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "profile.json")
+            profiler.write(path)
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(json.load(f)["unique_ngrams"], 3)
+
+    def test_disabled_records_nothing(self):
+        profiler = Profiler(enabled=False)
+        with profiler.stage("count"):
+            pass
+        self.assertEqual(profiler.stages, {})
+        self.assertIsNone(profiler.seconds("count"))
+
+    def test_unique_ngrams_and_fallbacks(self):
+        model = NGramModel.from_text(TEXT, 4)
+        self.assertEqual(unique_ngrams(model), 30)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "model.tllm")
+            save_model(model, path)
+            with load_model(path) as mapped:
+                self.assertEqual(unique_ngrams(mapped), 30)
+        stats = {}
+        random.seed(0)
+        generated = generate_from_model(model, 40, 40, stats=stats)
+        self.assertEqual(stats["generated_chars"], len(generated) - 3)
+        self.assertLessEqual(stats["fallbacks"], stats["generated_chars"])
+
+        empty = NGramModel(3)
+        generate_from_model(empty, 10, 10, stats=stats)
+        self.assertEqual(stats["fallbacks"], stats["generated_chars"])
+
+    def test_cli_cached_model(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_dir = os.path.join(tmp, "cache")
+            expected = run_profiled(tmp, "--no-cache")["unique_ngrams"]
+            self.assertEqual(expected, unique_ngrams(NGramModel.from_text(TEXT * 5, 4)))
+            for _ in ("miss", "hit"):
+                self.assertEqual(run_profiled(tmp, "--cache-dir", cache_dir)["unique_ngrams"], expected)
+
+    def test_cli_samples(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            report = run_profiled(tmp, "--samples", "2", "--no-cache")
+        self.assertIn("generate", report["stages"])
+        self.assertGreater(report["generated_chars"], 0)
+        self.assertIsNone(report["fallbacks"])
+        self.assertIsNone(report["fallback_rate"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import random
+import unittest
+
+from ngram_model import NGramModel
+from decoding import DecodingModel, with_decoding
+from generation import MaxChars, generate
+from sampler import AliasSampler, CumulativeSampler, FenwickSampler, TruncatedSampler
+
+
+class TestSamplers(unittest.TestCase):
+    def assert_matches_weights(self, sampler_cls):
+        weights = {"a": 1, "b": 0, "c": 3, "d": 6}
+        sampler = sampler_cls(weights)
+        rng = random.Random(7)
+        draws = 20000
+        seen = {ch: 0 for ch in weights}
+        for _ in range(draws):
+            seen[sampler.sample(rng)] += 1
+        self.assertEqual(seen["b"], 0)
+        for ch, w in weights.items():
+            self.assertAlmostEqual(seen[ch] / draws, w / 10, delta=0.02, msg=ch)
+
+    def test_alias_distribution(self):
+        self.assert_matches_weights(AliasSampler)
+
+    def test_cumulative_distribution(self):
+        self.assert_matches_weights(CumulativeSampler)
+
+    def test_fenwick_draws_like_cumulative(self):
+        weights = {chr(97 + i): (i * 7) % 5 for i in range(13)}
+        sampler = FenwickSampler(weights)
+        self.assert_same_draws(sampler, CumulativeSampler(weights))
+        for key, delta in [("c", 4), ("z", 3), ("a", 1), ("y", 0), ("!", 9), ("b", 2)]:
+            sampler.add(key, delta)
+            weights[key] = weights.get(key, 0) + delta
+            self.assert_same_draws(sampler, CumulativeSampler(weights))
+        self.assertEqual(sampler.chars, list(weights))
+        with self.assertRaises(ValueError):
+            sampler.add("a", -100)
+
+    def assert_same_draws(self, sampler, expected):
+        rng, expected_rng = random.Random(3), random.Random(3)
+        self.assertEqual([sampler.sample(rng) for _ in range(500)], [expected.sample(expected_rng) for _ in range(500)])
+
+    def test_single_candidate(self):
+        for sampler_cls in (AliasSampler, CumulativeSampler, FenwickSampler):
+            self.assertEqual(sampler_cls({"x": 5}).sample(), "x")
+
+    def test_invalid_weights(self):
+        for sampler_cls in (AliasSampler, CumulativeSampler, FenwickSampler):
+            with self.assertRaises(ValueError):
+                sampler_cls({})
+            with self.assertRaises(ValueError):
+                sampler_cls({"a": 0})
+            with self.assertRaises(ValueError):
+                sampler_cls({"a": -1, "b": 2})
+
+
+class TestModelSampler(unittest.TestCase):
+    def test_sampler_is_cached(self):
+        model = NGramModel.from_text("Lee has a dog. Jane has a dog. Soomi has a cat.", n=4)
+        sampler = model.sampler(" a ")
+        self.assertIs(model.sampler(" a "), sampler)
+        self.assertEqual(set(sampler.chars), {"d", "c"})
+        self.assertIsNone(model.sampler("zzz"))
+
+
+class TestTruncatedSampler(unittest.TestCase):
+    WEIGHTS = {"a": 1, "b": 0, "c": 3, "d": 6}
+
+    def frequencies(self, sampler, draws=20000):
+        rng = random.Random(3)
+        seen = {}
+        for _ in range(draws):
+            ch = sampler.sample(rng)
+            seen[ch] = seen.get(ch, 0) + 1
+        return {ch: cnt / draws for ch, cnt in seen.items()}
+
+    def test_default_matches_weights(self):
+        sampler = TruncatedSampler(self.WEIGHTS)
+        self.assertEqual(sampler.chars, ["d", "c", "a"])
+        freq = self.frequencies(sampler)
+        for ch in "acd":
+            self.assertAlmostEqual(freq[ch], self.WEIGHTS[ch] / 10, delta=0.02)
+
+    def test_temperature(self):
+        self.assertEqual(TruncatedSampler(self.WEIGHTS, temperature=0).chars, ["d"])
+        # T = 0.5 squares the weights: 36 : 9 : 1
+        freq = self.frequencies(TruncatedSampler(self.WEIGHTS, temperature=0.5))
+        self.assertAlmostEqual(freq["d"], 36 / 46, delta=0.02)
+        self.assertAlmostEqual(freq["c"], 9 / 46, delta=0.02)
+        # huge counts and a tiny temperature do not overflow
+        sampler = TruncatedSampler({"x": 10**6, "y": 9 * 10**5}, temperature=0.001)
+        self.assertEqual({sampler.sample(random.Random(seed)) for seed in range(20)}, {"x"})
+
+    def test_top_k_and_top_p(self):
+        self.assertEqual(TruncatedSampler(self.WEIGHTS, top_k=2).chars, ["d", "c"])
+        self.assertEqual(TruncatedSampler(self.WEIGHTS, top_p=0.6).chars, ["d"])
+        self.assertEqual(TruncatedSampler(self.WEIGHTS, top_p=0.61).chars, ["d", "c"])
+        self.assertEqual(TruncatedSampler(self.WEIGHTS, top_p=0.9).chars, ["d", "c"])
+        self.assertEqual(TruncatedSampler(self.WEIGHTS, top_p=1.0).chars, ["d", "c", "a"])
+        freq = self.frequencies(TruncatedSampler(self.WEIGHTS, top_k=2))
+        self.assertAlmostEqual(freq["d"], 6 / 9, delta=0.02)
+
+    def test_invalid_settings(self):
+        for settings in ({"temperature": -1}, {"top_k": 0}, {"top_k": 1.5}, {"top_p": 0}, {"top_p": 1.5}):
+            with self.assertRaises(ValueError):
+                TruncatedSampler(self.WEIGHTS, **settings)
+        with self.assertRaises(ValueError):
+            TruncatedSampler({"a": 0})
+
+
+class TestDecodingModel(unittest.TestCase):
+    def test_greedy_generation(self):
+        model = NGramModel.from_text("Lee has a dog. Jane has a dog. Soomi has a cat.", n=4)
+        self.assertIs(with_decoding(model), model)
+        greedy = with_decoding(model, temperature=0)
+        self.assertIsInstance(greedy, DecodingModel)
+        self.assertIs(greedy.sampler(" a "), greedy.sampler(" a "))
+        self.assertEqual(greedy.sampler(" a ").chars, ["d"])
+        self.assertIsNone(greedy.sampler("zzz"))
+        text = generate(greedy, "Jan", stop=[MaxChars(20)], rng=random.Random(1))
+        self.assertEqual(text, "Jane has a dog. Jane")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import io
+import random
+import unittest
+
+from count_char_n_grams import count_char_n_grams
+from sketch_model import CountMinSketch, SketchModel, SpaceSaving, parse_memory_budget
+
+
+TEXT = "Lee has a dog. Jane has a dog. Soomi has a cat. "
+
+
+class TestParseMemoryBudget(unittest.TestCase):
+    def test_units(self):
+        self.assertEqual(parse_memory_budget("256MB"), 256 << 20)
+        self.assertEqual(parse_memory_budget("1.5g"), 3 << 29)
+        self.assertEqual(parse_memory_budget("64 KB"), 64 << 10)
+        self.assertEqual(parse_memory_budget("4096"), 4096)
+
+    def test_invalid(self):
+        for text in ("", "MB", "12XB", "0", "-1MB"):
+            with self.assertRaises(ValueError):
+                parse_memory_budget(text)
+
+
+class TestCountMinSketch(unittest.TestCase):
+    def test_never_underestimates_within_bound(self):
+        text = TEXT * 5
+        exact = count_char_n_grams(text, 3)
+        sketch = CountMinSketch(width=64, depth=4)
+        for ngram, count in exact.items():
+            sketch.add(ngram, count)
+        self.assertEqual(sketch.total, len(text) - 2)
+        for ngram, count in exact.items():
+            self.assertGreaterEqual(sketch.estimate(ngram), count)
+        worst = max(sketch.estimate(k) - c for k, c in exact.items())
+        self.assertLessEqual(worst, sketch.epsilon * sketch.total)
+
+
+class TestSpaceSaving(unittest.TestCase):
+    def test_keeps_heavy_hitters(self):
+        rng = random.Random(0)
+        stream = ["a"] * 300 + ["b"] * 200 + [str(i) for i in range(500)]
+        rng.shuffle(stream)
+        summary = SpaceSaving(10)
+        for item in stream:
+            summary.add(item)
+        self.assertEqual(len(summary), 10)
+        self.assertIn("a", summary)
+        self.assertIn("b", summary)
+        for item in ("a", "b"):
+            true = stream.count(item)
+            self.assertGreaterEqual(summary.counts[item], true)
+            self.assertLessEqual(summary.counts[item] - summary.errors[item], true)
+        self.assertLessEqual(max(summary.errors.values()), summary.max_error())
+
+    def test_reports_evictions(self):
+        summary = SpaceSaving(1)
+        self.assertIsNone(summary.add("x"))
+        self.assertEqual(summary.add("y"), "x")
+        self.assertEqual(summary.counts, {"y": 2})
+
+
+class TestSketchModel(unittest.TestCase):
+    def test_exact_when_budget_is_large(self):
+        model = SketchModel.from_stream(io.StringIO(TEXT), n=4, memory_budget=parse_memory_budget("4MB"), chunk_size=7)
+        exact = count_char_n_grams(TEXT, 4)
+        for ngram, count in exact.items():
+            self.assertEqual(model.next_letter_frequency(ngram[:-1])[ngram[-1]], count)
+        self.assertEqual(model.error_bounds()["total"], len(TEXT) - 3)
+        self.assertEqual(model.error_bounds()["context_max_error"], 0)
+        self.assertIsNone(model.sampler("zzz"))
+
+    def test_memory_stays_bounded(self):
+        budget = parse_memory_budget("16KB")
+        model = SketchModel(n=5, memory_budget=budget, top_k=2)
+        rng = random.Random(1)
+        model.add_text("".join(rng.choice("abcdefghij ") for _ in range(20000)))
+        self.assertLessEqual(len(model), model.contexts.capacity)
+        self.assertEqual(len(model.next_chars), len(model))
+        self.assertTrue(all(len(summary) <= 2 for summary in model.next_chars.values()))
+        self.assertLessEqual(model.sketch.nbytes(), budget // 2)
+
+        context = model.random_context(random.Random(2))
+        self.assertIn(context, model)
+        self.assertIn(model.sampler(context).sample(random.Random(3)), model.next_letter_frequency(context))
+
+    def test_budget_too_small(self):
+        with self.assertRaises(ValueError):
+            SketchModel(n=3, memory_budget=100)
+
+
+if __name__ == "__main__":
+    unittest.main()
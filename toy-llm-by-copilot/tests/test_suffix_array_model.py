@@ -0,0 +1,95 @@
+import os
+import random
+import tempfile
+import unittest
+
+from main import generate_from_model
+from model_io import load_model, save_model
+from suffix_array_model import SuffixArrayModel
+
+
+TEXT = "Lee has a dog. Jane has a dog. Soomi has a cat. banana bandana"
+
+
+def brute_force_lookup(text, history, max_context, min_count=1):
+    for k in range(min(len(history), max_context), 0, -1):
+        context = history[len(history) - k:]
+        dist = {}
+        start = text.find(context)
+        while start != -1:
+            if start + k < len(text):
+                ch = text[start + k]
+                dist[ch] = dist.get(ch, 0) + 1
+            start = text.find(context, start + 1)
+        if sum(dist.values()) >= min_count:
+            return context, dist
+    dist = {}
+    for ch in text:
+        dist[ch] = dist.get(ch, 0) + 1
+    return "", dist
+
+
+class TestSuffixArrayModel(unittest.TestCase):
+    def setUp(self):
+        self.model = SuffixArrayModel.from_text(TEXT)
+
+    def test_suffix_and_lcp_arrays(self):
+        self.assertEqual(self.model.sa.tolist(), sorted(range(len(TEXT)), key=lambda i: TEXT[i:]))
+        suffixes = [TEXT[i:] for i in self.model.sa.tolist()]
+        for i in range(1, len(suffixes)):
+            expected = len(os.path.commonprefix([suffixes[i - 1], suffixes[i]]))
+            self.assertEqual(int(self.model.lcp[i]), expected)
+
+    def test_suffix_range(self):
+        for pattern in ["a", "an", "ana", "has a ", "dog.", "Lee has", "q", "a q", "", TEXT]:
+            lo, hi = self.model.suffix_range(pattern)
+            starts = sorted(self.model.sa[lo:hi].tolist())
+            self.assertEqual(starts, [i for i in range(len(TEXT)) if TEXT.startswith(pattern, i)], msg=pattern)
+
+    def test_lookup_matches_brute_force(self):
+        histories = ["Jane has a ", "Soomi has a d", "xyz", "", "band", "nana", "a cat. b", "qqq a dog"]
+        histories += [TEXT[:i] for i in range(len(TEXT))]
+        for history in histories:
+            self.assertEqual(
+                self.model.lookup(history),
+                brute_force_lookup(TEXT, history, self.model.max_context),
+                msg=repr(history),
+            )
+
+    def test_min_count(self):
+        for history in ["Jane has a ", "Soomi has a d", "band", "nana", "a cat. b", "Lee h"]:
+            for min_count in (2, 3):
+                self.assertEqual(
+                    self.model.lookup(history, min_count),
+                    brute_force_lookup(TEXT, history, self.model.max_context, min_count),
+                    msg=(history, min_count),
+                )
+        # "Lee h" occurs once: sampling backs off to a repeated context
+        self.assertEqual(self.model.next_letter_frequency("Lee h"), self.model.lookup("Lee h", 2)[1])
+
+    def test_generation_leaves_the_corpus(self):
+        text = TEXT + " Lee has a cat and a banana. Jane had a bandana and Soomi has a dog. The dog has a cat."
+        model = SuffixArrayModel.from_text(text)
+        self.assertLessEqual(len(model.random_context(random.Random(0))), 3)
+        for seed in range(10):
+            random.seed(seed)
+            generated = generate_from_model(model)
+            self.assertNotIn(generated, text, msg=seed)
+
+    def test_index_size(self):
+        self.assertLessEqual(self.model.nbytes(), 8 * len(TEXT))
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "corpus.idx")
+            save_model(self.model, path)
+            loaded = load_model(path)
+            self.assertIsInstance(loaded, SuffixArrayModel)
+            self.assertEqual("".join(loaded.vocab[i] for i in loaded.ids.tolist()), TEXT)
+            self.assertEqual(loaded.max_context, self.model.max_context)
+            self.assertEqual(loaded.lookup("has a "), self.model.lookup("has a "))
+            del loaded
+
+
+if __name__ == "__main__":
+    unittest.main()
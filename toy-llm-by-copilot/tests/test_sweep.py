@@ -0,0 +1,50 @@
+import unittest
+
+from count_char_n_grams import count_char_n_grams
+from perplexity import Scorer
+from sweep import split_heldout, sweep
+
+
+TEXT = "Lee has a dog. Jane has a dog. Soomi has a cat. " * 5
+
+
+class TestSweep(unittest.TestCase):
+    def test_rows_match_separate_training(self):
+        train, heldout = split_heldout(TEXT, 0.2)
+        self.assertEqual(train + heldout, TEXT)
+        rows = sweep(train, heldout, max_n=4, chars=50)
+        self.assertEqual([row["n"] for row in rows], [1, 2, 3, 4])
+        self.assertIn("count_s", rows[0])
+        for row in rows:
+            n = row["n"]
+            expected = Scorer.from_text(train, n).score(heldout)
+            self.assertAlmostEqual(row["perplexity"], expected.perplexity)
+            self.assertEqual(row["unique_ngrams"], len(count_char_n_grams(train, n)))
+            self.assertGreater(row["us_per_char"], 0)
+
+    def test_parallel_matches_serial(self):
+        train, heldout = split_heldout(TEXT)
+        serial = sweep(train, heldout, max_n=3, chars=20)
+        parallel = sweep(train, heldout, max_n=3, workers=2, chars=20)
+        for a, b in zip(serial, parallel):
+            self.assertEqual(a["perplexity"], b["perplexity"])
+            self.assertEqual(a["unique_ngrams"], b["unique_ngrams"])
+
+    def test_truncated_scorer_counts(self):
+        scorer = Scorer.from_text(TEXT, 5)
+        for n in (1, 3, 5):
+            self.assertEqual(scorer.truncated(n).ngram_counts(), count_char_n_grams(TEXT, n))
+        with self.assertRaises(ValueError):
+            scorer.truncated(6)
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            split_heldout(TEXT, 1.0)
+        with self.assertRaises(ValueError):
+            sweep(TEXT, TEXT, max_n=2, workers=0)
+        with self.assertRaises(ValueError):
+            sweep(TEXT, TEXT, max_n=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import io
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from count_char_n_grams import count_char_n_grams
+from main import generate_from_model
+from model_io import load_model, save_model
+from ngram_model import NGramModel
+from training_cache import TrainingCache, cache_key, corpus_digest, file_digest
+
+
+TEXT = "Lee has a dog. Jane has a dog. Soomi has a cat."
+
+
+class TestTrainingCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_keys(self):
+        digest = corpus_digest(TEXT)
+        self.assertEqual(digest, corpus_digest(source=io.StringIO(TEXT), chunk_size=5))
+        path = os.path.join(self.dir, "corpus.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(TEXT)
+        self.assertEqual(digest, corpus_digest(source=path))
+        self.assertEqual(digest, file_digest(path, chunk_size=5))
+        keys = {
+            cache_key(digest, 4),
+            cache_key(digest, 3),
+            cache_key(digest, 4, kind="suffix-array"),
+            cache_key(digest, 4, normalize="lower"),
+            cache_key(corpus_digest(TEXT + " "), 4),
+        }
+        self.assertEqual(len(keys), 5)
+        self.assertEqual(cache_key(digest, 4), cache_key(corpus_digest(TEXT), 4))
+
+    def test_miss_then_hit(self):
+        cache = TrainingCache(os.path.join(self.dir, "cache"))
+        key = cache_key(corpus_digest(TEXT), 4)
+        trained = []
+
+        def train():
+            trained.append(1)
+            return NGramModel.from_text(TEXT, 4)
+
+        model, hit = cache.get_or_train(key, train)
+        self.assertFalse(hit)
+        self.assertEqual(model.next_letter_frequency(" a "), {"d": 2, "c": 1})
+        model.close()
+        model, hit = cache.get_or_train(key, train)
+        self.assertTrue(hit)
+        self.assertEqual(model.to_counts(), count_char_n_grams(TEXT, 4))
+        model.close()
+        self.assertEqual(len(trained), 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        # only the entry itself is left behind, no temporary files
+        self.assertEqual(os.listdir(cache.directory), [key + ".tllm"])
+
+    def test_mapped_model_draws_like_trained_model(self):
+        model = NGramModel.from_text(TEXT * 3, 4)
+        path = os.path.join(self.dir, "model.tllm")
+        save_model(model, path)
+        with load_model(path) as mapped:
+            for seed in range(5):
+                random.seed(seed)
+                expected = generate_from_model(model, 60, 80)
+                random.seed(seed)
+                self.assertEqual(generate_from_model(mapped, 60, 80), expected)
+                self.assertEqual(mapped.sampler(" a").sample(random.Random(seed)), model.sampler(" a").sample(random.Random(seed)))
+
+    def test_cached_output_matches_no_cache(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        corpus = os.path.join(self.dir, "corpus.txt")
+        with open(corpus, "w", encoding="utf-8") as f:
+            f.write(TEXT * 5)
+
+        def run(*args):
+            command = [sys.executable, os.path.join(root, "main.py"), "--file", corpus, "--seed", "3", *args]
+            return subprocess.run(command, capture_output=True, text=True, check=True, cwd=self.dir).stdout
+
+        expected = run("--no-cache")
+        cache_dir = os.path.join(self.dir, "cache")
+        self.assertEqual(run("--cache-dir", cache_dir), expected)  # miss
+        self.assertEqual(run("--cache-dir", cache_dir), expected)  # hit
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+        # the bytes backend counts the mapped file and keys it by its bytes
+        self.assertEqual(run("--backend", "bytes", "--no-cache"), expected)
+        self.assertEqual(run("--backend", "bytes", "--cache-dir", cache_dir), expected)
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+    def test_lru_eviction(self):
+        model = NGramModel.from_text(TEXT, 4)
+        cache = TrainingCache(self.dir)
+        paths = [cache.put(str(i), model) for i in range(3)]
+        size = os.path.getsize(paths[0])
+        for age, path in zip((300, 100, 200), paths):
+            os.utime(path, (1000 - age, 1000 - age))
+        # a hit makes an entry the most recently used
+        cache.get("0").close()
+
+        cache.max_bytes = 2 * size
+        self.assertEqual(cache.evict(), 1)
+        self.assertEqual(sorted(os.path.basename(p) for _, _, p in cache.entries()), ["0.tllm", "1.tllm"])
+        # the entry being written survives even when it alone is too big
+        cache.max_bytes = 1
+        path = cache.put("3", model)
+        self.assertEqual([p for _, _, p in cache.entries()], [path])
+
+    def test_corrupt_entry_is_a_miss(self):
+        cache = TrainingCache(self.dir)
+        with open(cache.path("bad"), "wb") as f:
+            f.write(b"not a model")
+        self.assertIsNone(cache.get("bad"))
+        self.assertFalse(os.path.exists(cache.path("bad")))
+        self.assertIsNone(cache.get("missing"))
+        self.assertEqual(cache.misses, 2)
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            TrainingCache(self.dir, max_bytes=0)
+        with self.assertRaises(ValueError):
+            corpus_digest()
+
+
+if __name__ == "__main__":
+    unittest.main()
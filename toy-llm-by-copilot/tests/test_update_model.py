@@ -0,0 +1,73 @@
+import random
+import unittest
+
+from backoff_model import BackoffModel
+from count_char_n_grams import count_char_n_grams
+from ngram_model import NGramModel, update
+from sampler import CumulativeSampler
+
+
+PARTS = ["Lee has a dog. ", "Jane has", " a dog. Soomi", " has a cat.", "", "x", " Lee has a cow."]
+
+
+class TestUpdate(unittest.TestCase):
+    def test_matches_full_recount(self):
+        for n in (1, 2, 4, 6):
+            model = NGramModel.from_text(PARTS[0], n)
+            text = PARTS[0]
+            for part in PARTS[1:]:
+                update(model, part)
+                text += part
+                expected = NGramModel.from_text(text, n)
+                self.assertEqual(model.table, expected.table, msg=(n, text))
+                self.assertEqual(model.tail, expected.tail)
+
+    def test_invalidates_cached_lookups(self):
+        model = NGramModel.from_text("Lee has a dog.", 4)
+        self.assertEqual(model.next_letter_frequency(" a"), {" ": 1})
+        self.assertEqual(set(model.sampler(" a ").chars), {"d"})
+        self.assertEqual(sum(model.next_letter_frequency("").values()), len("Lee has a dog.") - 3)
+        untouched = model.sampler("Lee")
+
+        model.update(" Soomi has a cat.")
+        self.assertEqual(set(model.sampler(" a ").chars), {"d", "c"})
+        self.assertEqual(model.next_letter_frequency(" a"), {" ": 2})
+        self.assertEqual(sum(model.next_letter_frequency("").values()), len("Lee has a dog. Soomi has a cat.") - 3)
+        self.assertIs(model.sampler("Lee"), untouched)
+
+    def test_start_contexts_patched_in_place(self):
+        model = NGramModel.from_text(PARTS[0], 4)
+        model.random_context()
+        context_sampler = model._context_sampler
+        # contexts in sorted order at build time, then new ones as added
+        order = sorted(model.table)
+        for part in PARTS[1:]:
+            update(model, part)
+            self.assertIs(model._context_sampler, context_sampler)
+            order += [context for context in model.table if context not in order]
+            expected = CumulativeSampler({context: sum(model.table[context].values()) for context in order})
+            rng, expected_rng = random.Random(5), random.Random(5)
+            for _ in range(200):
+                self.assertEqual(model.random_context(rng), expected.sample(expected_rng))
+
+    def test_unknown_tail(self):
+        counts = count_char_n_grams("Lee has a dog.", 4)
+        with self.assertRaises(ValueError):
+            NGramModel.from_counts(counts, 4).update(" Jane")
+        model = NGramModel.from_counts(counts, 4, tail="Lee has a dog.")
+        model.update(" Jane")
+        self.assertEqual(model.table, NGramModel.from_text("Lee has a dog. Jane", 4).table)
+        unigrams = NGramModel.from_counts(count_char_n_grams("ab", 1), 1)
+        unigrams.update("c")
+        self.assertEqual(unigrams.table, {"": {"a": 1, "b": 1, "c": 1}})
+
+    def test_backoff_model(self):
+        model = BackoffModel.from_text("Lee has a dog.", 5)
+        update(model, " Jane has a cat.")
+        expected = BackoffModel.from_text("Lee has a dog. Jane has a cat.", 5)
+        for k in range(1, 6):
+            self.assertEqual(model.models[k].table, expected.models[k].table, msg=k)
+
+
+if __name__ == "__main__":
+    unittest.main()
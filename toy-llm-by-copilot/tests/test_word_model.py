@@ -0,0 +1,92 @@
+import io
+import random
+import unittest
+
+from ngram_model import NGramModel
+from tokenizer import Tokenizer, Vocabulary
+from word_model import WordModel
+
+
+TEXT = "Lee has a dog.\nJane  has a dog. Soomi has a cat, don't you?"
+
+
+class TestTokenizer(unittest.TestCase):
+    def test_normalizations(self):
+        self.assertEqual(Tokenizer("none").tokenize(TEXT)[:4], ["Lee", "has", "a", "dog."])
+        self.assertEqual(Tokenizer("lower").tokenize(TEXT), TEXT.lower().split())
+        self.assertEqual(Tokenizer("alpha").tokenize("a Cat, don't 42 !"), ["a", "Cat", "dont"])
+        with self.assertRaises(ValueError):
+            Tokenizer("upper")
+
+    def test_stream_matches_whole_text(self):
+        for normalize in ("none", "lower", "alpha"):
+            tokenizer = Tokenizer(normalize)
+            expected = tokenizer.tokenize(TEXT)
+            for chunk_size in (1, 2, 5, 13, 1000):
+                tokens = list(tokenizer.iter_tokens(io.StringIO(TEXT), chunk_size))
+                self.assertEqual(tokens, expected, msg=(normalize, chunk_size))
+
+    def test_count(self):
+        counts = Tokenizer("alpha").count(io.StringIO(TEXT), chunk_size=3)
+        self.assertEqual(counts["has"], 3)
+        self.assertEqual(counts["dog"], 2)
+
+    def test_vocabulary(self):
+        vocab = Vocabulary()
+        self.assertEqual(vocab.encode(["a", "b", "a", "c"]), [0, 1, 0, 2])
+        self.assertEqual(vocab.decode([2, 0]), ["c", "a"])
+        self.assertIn("b", vocab)
+        self.assertEqual(len(vocab), 3)
+
+
+class TestWordModel(unittest.TestCase):
+    def test_counts_match_whole_text(self):
+        words = Tokenizer().tokenize(TEXT)
+        for n in (1, 2, 3):
+            streamed = WordModel.from_stream(io.StringIO(TEXT), n, chunk_size=4)
+            whole = WordModel.from_text(TEXT, n)
+            self.assertEqual(streamed.vocab.tokens, whole.vocab.tokens)
+            self.assertEqual(streamed.model.table, whole.model.table)
+            expected = NGramModel.from_text(tuple(whole.vocab.encode(words)), n)
+            self.assertEqual(whole.model.table, expected.table)
+
+    def test_next_word_frequency(self):
+        model = WordModel.from_text(TEXT, 3)
+        self.assertEqual(model.next_word_frequency("has a"), {"dog.": 2, "cat,": 1})
+        self.assertEqual(model.next_word_frequency("Jane HAS A"), {"dog.": 2, "cat,": 1})
+        self.assertEqual(model.next_word_frequency("has"), {"a": 3})
+        self.assertEqual(model.next_word_frequency("has zebra"), {})
+
+    def test_generate(self):
+        model = WordModel.from_text(TEXT, 2)
+        rng = random.Random(0)
+        for _ in range(20):
+            words = model.generate(5, 9, rng=rng).split()
+            self.assertTrue(5 <= len(words) <= 9)
+            self.assertTrue(set(words) <= set(model.vocab.tokens))
+        self.assertEqual(WordModel.from_text("", 2).generate(), "")
+
+    def test_every_generated_ngram_was_seen(self):
+        corpus = "a b c d e f"
+        model = WordModel.from_text(corpus, 3)
+        seen = {tuple(corpus.split()[i:i + 3]) for i in range(4)}
+        rng = random.Random(1)
+        restarts = 0
+        for _ in range(50):
+            words = model.generate(8, 12, rng=rng).split()
+            i = 2
+            while i < len(words):
+                if tuple(words[i - 2:i]) == ("e", "f"):
+                    # the corpus ended here: a whole new context follows
+                    restarts += 1
+                    if i + 2 <= len(words):
+                        self.assertIn(" ".join(words[i:i + 2]), corpus)
+                    i += 2
+                    continue
+                self.assertIn(tuple(words[i - 2:i + 1]), seen, msg=words)
+                i += 1
+        self.assertGreater(restarts, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+"""Streaming word tokenizer with an interned vocabulary
+
+The `count_words` variants in this repository each split words their own
+way. `Tokenizer` offers those rules as selectable normalizations, compiled
+once, and applies them to a whole chunk of text per call (one C-level
+`lower`/`sub`/`split` each) instead of per word:
+
+- `"none"`: split on whitespace, keep case and punctuation.
+- `"lower"`: lowercase, then split on whitespace (`toy-llm-by-copilot`).
+- `"alpha"`: split on whitespace and drop every non-ASCII-letter
+  character, skipping words left empty (`toy-llm`).
+
+`iter_tokens` reads a path or file object in chunks, so a corpus never has
+to fit in memory, and `Vocabulary` interns tokens to dense integer IDs.
+"""
+
+import re
+from typing import Dict, Iterable, Iterator, List
+
+from count_char_n_grams_stream import DEFAULT_CHUNK_SIZE, Source, iter_text_chunks
+
+
+NORMALIZATIONS = ("none", "lower", "alpha")
+
+_NON_ALPHA = re.compile(r"[^a-zA-Z\s]+")
+
+
+class Vocabulary:
+    """Bidirectional token <-> integer ID mapping.
+
+    Behavior
+    - `intern(token)` returns the token's ID, assigning the next free ID
+      (0, 1, 2, ...) to tokens seen for the first time.
+    - `tokens[i]` is the token with ID `i`.
+    """
+
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {}
+        self.tokens: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def __contains__(self, token: object) -> bool:
+        return token in self.ids
+
+    def intern(self, token: str) -> int:
+        token_id = self.ids.get(token)
+        if token_id is None:
+            token_id = self.ids[token] = len(self.tokens)
+            self.tokens.append(token)
+        return token_id
+
+    def encode(self, tokens: Iterable[str]) -> List[int]:
+        """Intern every token and return their IDs."""
+
+        intern = self.intern
+        return [intern(token) for token in tokens]
+
+    def decode(self, ids: Iterable[int]) -> List[str]:
+        tokens = self.tokens
+        return [tokens[i] for i in ids]
+
+
+class Tokenizer:
+    """Word tokenizer with a fixed normalization.
+
+    Parameters
+    - normalize (str): One of `NORMALIZATIONS`. Defaults to `"lower"`,
+      the rule of this directory's `count_words`.
+
+    Behavior
+    - `tokenize(text)` returns the words of a string.
+    - `iter_tokens(source)` yields the same words from a path or text file
+      object read in chunks; a word cut by a chunk boundary is carried
+      over to the next chunk, so the result never depends on `chunk_size`.
+    - Raises `ValueError` for an unknown normalization.
+    """
+
+    def __init__(self, normalize: str = "lower") -> None:
+        if normalize not in NORMALIZATIONS:
+            raise ValueError(f"normalize must be one of {NORMALIZATIONS}, not {normalize!r}")
+        self.normalize = normalize
+        if normalize == "lower":
+            self._split = lambda text: text.lower().split()
+        elif normalize == "alpha":
+            self._split = lambda text: _NON_ALPHA.sub("", text).split()
+        else:
+            self._split = str.split
+
+    def tokenize(self, text: str) -> List[str]:
+        return self._split(text)
+
+    def iter_tokens(self, source: Source, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+        """Yield the words of `source`, one chunk at a time."""
+
+        carry = ""
+        for chunk in iter_text_chunks(source, chunk_size):
+            buf = carry + chunk
+            if buf[-1].isspace():
+                carry = ""
+            else:
+                # hold back the last (possibly partial) word
+                parts = buf.rsplit(None, 1)
+                buf, carry = ("", parts[0]) if len(parts) == 1 else parts
+            yield from self._split(buf)
+        if carry:
+            yield from self._split(carry)
+
+    def count(self, source: Source, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, int]:
+        """Count the words of `source` (a streaming `count_words`)."""
+
+        counts: Dict[str, int] = {}
+        for token in self.iter_tokens(source, chunk_size):
+            counts[token] = counts.get(token, 0) + 1
+        return counts
+
+
+if __name__ == "__main__":
+    import io
+
+    text = "Lee has a dog. Jane has a dog. Soomi has a cat."
+    for normalize in NORMALIZATIONS:
+        tokenizer = Tokenizer(normalize)
+        print(f"{normalize}:", tokenizer.count(io.StringIO(text), chunk_size=8))
+    vocab = Vocabulary()
+    print("IDs:", vocab.encode(Tokenizer().iter_tokens(io.StringIO(text))))
@@ -0,0 +1,210 @@
+"""Content-addressed on-disk cache of trained models
+
+Provides `TrainingCache`, used by `main.py` so that repeat runs on an
+unchanged corpus skip counting entirely and map the model saved by an
+earlier run (`model_io.load_model`).
+
+- Keys are SHA-256 digests of the corpus text (as UTF-8 bytes) combined
+  with everything else that changes the trained model: the model kind, `n`
+  and the normalization. Counting backends and worker counts produce the
+  same counts, so they are not part of the key.
+- Entries are written to a temporary file in the cache directory and
+  renamed into place with `os.replace`, so a concurrent reader sees either
+  no entry or a complete one, and concurrent writers of the same key
+  simply replace each other's identical file.
+- The directory is bounded by `max_bytes`: after each write the least
+  recently used entries (oldest modification time; a hit touches its
+  file) are deleted until the rest fit.
+"""
+
+import hashlib
+import os
+import tempfile
+from typing import Callable, Optional, Tuple
+
+from count_char_n_grams_stream import DEFAULT_CHUNK_SIZE, Source, iter_text_chunks
+from model_io import load_model, save_model
+
+
+KEY_VERSION = 1
+DEFAULT_MAX_BYTES = 1 << 30
+SUFFIX = ".tllm"
+
+
+def default_cache_dir() -> str:
+    """`$TOY_LLM_CACHE_DIR`, else `toy-llm` under `$XDG_CACHE_HOME` or
+    `~/.cache`."""
+
+    explicit = os.environ.get("TOY_LLM_CACHE_DIR")
+    if explicit:
+        return explicit
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "toy-llm")
+
+
+def corpus_digest(text: Optional[str] = None, source: Optional[Source] = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> str:
+    """Return the SHA-256 hex digest of a corpus given as `text`, or read
+    from `source` (a path or text file object) in chunks.
+
+    Both forms hash the UTF-8 encoding of the same text, so a file and its
+    contents get the same digest.
+    """
+
+    digest = hashlib.sha256()
+    if text is not None:
+        digest.update(text.encode("utf-8"))
+    elif source is not None:
+        for chunk in iter_text_chunks(source, chunk_size):
+            digest.update(chunk.encode("utf-8"))
+    else:
+        raise ValueError("give text or source")
+    return digest.hexdigest()
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of the raw bytes of the file at
+    `path`: the key of a corpus counted as bytes (without newline
+    translation), equal to `corpus_digest` of its text when they match."""
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(digest: str, n: int, kind: str = "chars", normalize: str = "none") -> str:
+    """Combine a corpus digest with the training settings into one key."""
+
+    settings = f"toy-llm-cache\0{KEY_VERSION}\0{kind}\0{n}\0{normalize}\0{digest}"
+    return hashlib.sha256(settings.encode("utf-8")).hexdigest()
+
+
+class TrainingCache:
+    """A directory of model files named by their key.
+
+    Parameters
+    - directory (str): Created on first write if missing.
+    - max_bytes (int): Size bound of all entries together. The entry just
+      written is never evicted, even if it alone exceeds the bound.
+
+    Behavior
+    - `hits` and `misses` count `get` results.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be a positive integer")
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def get(self, key: str):
+        """Return the cached model for `key`, or None."""
+
+        path = self.path(key)
+        try:
+            model = load_model(path)
+            # the modification time orders entries for eviction
+            os.utime(path)
+        except FileNotFoundError:
+            # missing, or evicted by another process in between
+            self.misses += 1
+            return None
+        except ValueError:
+            # not a readable model file (e.g. a format change): retrain
+            self._remove(path)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return model
+
+    def put(self, key: str, model) -> str:
+        """Atomically store `model` (anything `save_model` accepts) under
+        `key`, evict old entries, and return the entry's path."""
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(key)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-", suffix=SUFFIX)
+        os.close(fd)
+        try:
+            save_model(model, tmp)
+            os.replace(tmp, path)
+        except BaseException:
+            self._remove(tmp)
+            raise
+        self.evict(keep=path)
+        return path
+
+    def get_or_train(self, key: str, train: Callable[[], object]) -> Tuple[object, bool]:
+        """Return `(model, hit)`: the cached model, or `train()`'s model
+        after storing it and mapping it back, so both cases generate from
+        the same kind of model."""
+
+        model = self.get(key)
+        if model is not None:
+            return model, True
+        path = self.put(key, train())
+        return load_model(path), False
+
+    def entries(self):
+        """Return `(mtime, size, path)` of every entry, oldest first."""
+
+        found = []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return found
+        for name in names:
+            if not name.endswith(SUFFIX) or name.startswith(".tmp-"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            found.append((st.st_mtime, st.st_size, path))
+        found.sort()
+        return found
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Delete least recently used entries until the total size fits in
+        `max_bytes`; returns how many were deleted."""
+
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            removed += self._remove(path)
+            total -= size
+        return removed
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        # another process may have removed it first
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+
+if __name__ == "__main__":
+    from ngram_model import NGramModel
+
+    text = "Lee has a dog. Jane has a dog. Soomi has a cat."
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TrainingCache(tmp)
+        key = cache_key(corpus_digest(text), 4)
+        for _ in range(2):
+            model, hit = cache.get_or_train(key, lambda: NGramModel.from_text(text, 4))
+            print("hit" if hit else "miss", model.next_letter_frequency(" a "))
+            model.close()
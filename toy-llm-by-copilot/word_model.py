@@ -0,0 +1,132 @@
+"""Word-level n-gram model
+
+Provides `WordModel`, which tokenizes a corpus with `Tokenizer`, interns the
+words to integer IDs and indexes the ID n-grams with the same `NGramModel`
+used for characters: contexts are tuples of the previous `n-1` word IDs,
+so each generation step is one dict lookup and one alias-table draw.
+"""
+
+import random
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from count_char_n_grams_stream import DEFAULT_CHUNK_SIZE, Source
+from ngram_model import NGramModel
+from tokenizer import Tokenizer, Vocabulary
+
+
+# word IDs are interned in batches of this many tokens while streaming
+TOKEN_BATCH = 1 << 16
+
+
+class WordModel:
+    """Next-word model over interned word IDs.
+
+    Parameters
+    - n (int): The n-gram length in words.
+    - tokenizer (Tokenizer, optional): Defaults to `Tokenizer("lower")`.
+
+    Attributes
+    - vocab (Vocabulary): The interned words.
+    - model (NGramModel): Next-word counts keyed by context ID tuples.
+
+    Behavior
+    - `train(source)` streams a path or text file object through the
+      tokenizer, so the corpus is never held in memory as text or as a
+      token list; training can be repeated to add more text.
+    - `generate(min_words, max_words)` returns space-joined words.
+    """
+
+    def __init__(self, n: int = 2, tokenizer: Optional[Tokenizer] = None) -> None:
+        self.tokenizer = tokenizer or Tokenizer()
+        self.vocab = Vocabulary()
+        self.model = NGramModel(n)
+        self.model.tail = ()
+        self.n = n
+
+    @classmethod
+    def from_stream(
+        cls, source: Source, n: int = 2, normalize: str = "lower", chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> "WordModel":
+        """Tokenize and count `source` in chunks."""
+
+        model = cls(n, Tokenizer(normalize))
+        model.train(source, chunk_size)
+        return model
+
+    @classmethod
+    def from_text(cls, text: str, n: int = 2, normalize: str = "lower") -> "WordModel":
+        model = cls(n, Tokenizer(normalize))
+        model.update(model.tokenizer.tokenize(text))
+        return model
+
+    def __len__(self) -> int:
+        return len(self.model)
+
+    def train(self, source: Source, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        batch: List[str] = []
+        for token in self.tokenizer.iter_tokens(source, chunk_size):
+            batch.append(token)
+            if len(batch) == TOKEN_BATCH:
+                self.update(batch)
+                batch = []
+        if batch:
+            self.update(batch)
+
+    def update(self, tokens: Iterable[str]) -> None:
+        """Add words that follow the text trained on so far."""
+
+        self.model.update(tuple(self.vocab.encode(tokens)))
+
+    def encode(self, words: Iterable[str]) -> Optional[Tuple[int, ...]]:
+        """Return the IDs of known words, or None if any word is unknown."""
+
+        ids = self.vocab.ids
+        try:
+            return tuple(ids[word] for word in words)
+        except KeyError:
+            return None
+
+    def next_word_frequency(self, prompt: str) -> Dict[str, int]:
+        """Return the next-word counts after the last `n-1` words of
+        `prompt` (fewer words match every context starting with them)."""
+
+        words = self.tokenizer.tokenize(prompt)
+        context = self.encode(words[-(self.n - 1):] if self.n > 1 else [])
+        if context is None:
+            return {}
+        return {self.vocab.tokens[i]: cnt for i, cnt in self.model.next_letter_frequency(context).items()}
+
+    def generate(self, min_words: int = 10, max_words: int = 20, rng=random) -> str:
+        """Generate between `min_words` and `max_words` words.
+
+        Starts from a context drawn in proportion to its frequency and
+        restarts from a new one whenever a context has no continuation
+        (the end of the corpus).
+        """
+
+        model, tokens = self.model, self.vocab.tokens
+        target = rng.randint(min_words, max_words)
+        context = model.random_context(rng)
+        if context is None:
+            return ""
+        out = list(context)
+        keep = self.n - 1
+        while len(out) < target:
+            sampler = model.sampler(context)
+            if sampler is None:
+                # the new context's words are part of the output
+                context = model.random_context(rng)
+                out.extend(context)
+                continue
+            out.append(sampler.sample(rng))
+            context = tuple(out[len(out) - keep:]) if keep else ()
+        return " ".join(tokens[i] for i in out[:target])
+
+
+if __name__ == "__main__":
+    text = "Lee has a dog. Jane has a dog. Soomi has a cat."
+    model = WordModel.from_text(text, n=2)
+    print("Vocabulary:", model.vocab.tokens)
+    print("After 'a':", model.next_word_frequency("a"))
+    random.seed(0)
+    print("Generated:", model.generate(8, 12))
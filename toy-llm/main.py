@@ -26,7 +26,11 @@ def main():
     start_index = random.randint(0, len(text) - n)
     prompt = text[start_index : start_index + n - 1]
     
-    generated_text = prompt
+    # Output grows as a list of characters and the word count is kept up to
+    # date per character, so each step costs O(1) instead of re-splitting
+    # the whole text
+    generated_chars = list(prompt)
+    word_count = prompt.count(" ") + 1  # == len(prompt.split(" "))
     print(f"\n--- Generating Text (Start: '{prompt}') ---")
     
     while True:
@@ -34,20 +38,22 @@ def main():
         next_char = generate_next_char(prompt, counts)
         
         # Append to text
-        generated_text += next_char
+        generated_chars.append(next_char)
         
         # Slide prompt
-        # Logic: prompt is always the last n-1 characters of generate_text
-        prompt = generated_text[-(n-1):]
+        # Logic: prompt is always the last n-1 characters of generated text
+        prompt = (prompt + next_char)[-(n-1):]
         
         # Check stopping condition (word count)
         # We roughly estimate words by spaces
-        word_count = len(generated_text.split(" "))
+        if next_char == " ":
+            word_count += 1
         if word_count >= output_word_target:
             break
             
+    generated_text = "".join(generated_chars)
     print("\n" + generated_text)
-    print(f"\n[Generated {len(generated_text.split(' '))} words]")
+    print(f"\n[Generated {word_count} words]")
 
 if __name__ == "__main__":
     main()